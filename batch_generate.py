@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+"""
+批量生成项目。
+
+模板配置只解析一次，随后用进程池并行渲染多组上下文，并通过 ``_no_probe`` 让两个钩子
+跳过环境探测、git初始化以及pyenv/PDM检测。项目先生成到临时文件系统（默认 /dev/shm）中的
+暂存目录，完成后原子地移动到输出目录，输出目录中不会出现生成到一半的项目。
+Jinja2模板的编译结果保存在字节码缓存中，在各工作进程和多次运行之间共享。
+
+使用方法:
+    python batch_generate.py contexts.json [--output-dir projects] [--workers 8]
+    python batch_generate.py --count 100 [--output-dir projects] [--baseline 5]
+
+contexts.json 为上下文列表（JSON数组，或每行一个JSON对象），每项覆盖 cookiecutter.json 中的默认值，
+例如 ``[{"project_name": "Foo", "project_type": "CLI Tool"}, ...]``。
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+TEMPLATE_DIR = Path(__file__).resolve().parent
+
+# 工作进程中的模板状态，由 _init_worker 初始化一次
+_WORKER = {}
+
+
+def print_colored(message, color="reset"):
+    """打印彩色文本"""
+    colors = {
+        "reset": "\033[0m",
+        "red": "\033[91m",
+        "green": "\033[92m",
+        "yellow": "\033[93m",
+        "blue": "\033[94m",
+    }
+    print(f"{colors.get(color, colors['reset'])}{message}{colors['reset']}")
+
+
+def user_cache_dir():
+    """返回本模板使用的用户缓存目录
+
+    复制自 hooks/pre_gen_project.py 的 probe_cache_file：钩子文件会被Jinja渲染，无法直接导入，
+    两处修改时需保持一致。
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "cookiecutter-python-template"
+
+
+def default_staging_root():
+    """优先使用内存文件系统 /dev/shm 作为暂存目录，不可用时使用系统临时目录"""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+def load_contexts(path):
+    """读取上下文列表：JSON数组或JSON Lines"""
+    text = Path(path).read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        contexts = json.loads(text)
+    else:
+        contexts = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not all(isinstance(context, dict) for context in contexts):
+        raise ValueError(f"上下文文件格式无效: {path}")
+    return contexts
+
+
+def load_defaults():
+    """读取模板的 cookiecutter.json，保持键的顺序（派生变量依赖前面的变量）"""
+    with open(TEMPLATE_DIR / "cookiecutter.json", encoding="utf-8") as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def synthetic_contexts(count):
+    """生成用于基准测试的合成上下文"""
+    return [{"project_name": f"Batch Project {i}"} for i in range(count)]
+
+
+@contextlib.contextmanager
+def silence_stdout():
+    """在文件描述符级别屏蔽标准输出，钩子子进程的输出也会被屏蔽"""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(devnull)
+        os.close(saved)
+
+
+def _init_worker(defaults, cache_dir, quiet):
+    """工作进程初始化：保存已解析的模板默认配置，并创建共享的Jinja2字节码缓存"""
+    from jinja2 import FileSystemBytecodeCache
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _WORKER["defaults"] = defaults
+    _WORKER["bytecode_cache"] = FileSystemBytecodeCache(str(cache_dir))
+    if quiet:
+        # 工作进程的结果通过返回值汇报，钩子的输出直接丢弃
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.close(devnull)
+
+
+def build_context(defaults, extra_context, probe):
+    """在已解析的默认配置上应用覆盖值并渲染派生变量（如 project_slug）"""
+    from cookiecutter.generate import apply_overwrites_to_context
+    from cookiecutter.prompt import prompt_for_config
+
+    context = {"cookiecutter": copy.deepcopy(defaults)}
+    apply_overwrites_to_context(context["cookiecutter"], extra_context)
+    cookiecutter_dict = prompt_for_config(context, no_input=True)
+    cookiecutter_dict["_template"] = str(TEMPLATE_DIR)
+    cookiecutter_dict["_no_probe"] = not probe
+    return {"cookiecutter": cookiecutter_dict}
+
+
+def publish(staged, dest, overwrite=False):
+    """把暂存目录中的项目原子地移动到目标位置
+
+    暂存目录与目标不在同一文件系统时（例如 /dev/shm），先复制到目标目录旁的临时目录，
+    再用一次rename放到最终位置；覆盖已有项目时先把旧目录改名移开。
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists() and not overwrite:
+        raise FileExistsError(f"目标目录已存在: {dest}")
+
+    token = uuid.uuid4().hex[:8]
+    tmp = dest.parent / f".{dest.name}.{token}.tmp"
+    try:
+        os.rename(staged, tmp)
+    except OSError:
+        # 跨文件系统，只能复制；复制失败时不在输出目录中留下复制到一半的临时目录
+        try:
+            shutil.copytree(staged, tmp, symlinks=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        shutil.rmtree(staged, ignore_errors=True)
+
+    old = None
+    if dest.exists():
+        old = dest.parent / f".{dest.name}.{token}.old"
+        os.rename(dest, old)
+    try:
+        os.rename(tmp, dest)
+    except OSError:
+        if old is not None:
+            os.rename(old, dest)
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def generate_one(index, extra_context, staging_root, output_dir, probe, overwrite):
+    """在工作进程中生成单个项目，返回名称、路径、耗时和错误信息"""
+    from cookiecutter.generate import generate_files
+
+    start = time.perf_counter()
+    staging = Path(tempfile.mkdtemp(prefix=f"batch-{index}-", dir=staging_root))
+    name = extra_context.get("project_name", f"#{index}")
+    try:
+        context = build_context(_WORKER["defaults"], extra_context, probe)
+        name = context["cookiecutter"]["project_slug"]
+        # 通过 _jinja2_env_vars 把字节码缓存传给cookiecutter创建的Jinja2环境
+        context["cookiecutter"]["_jinja2_env_vars"] = {"bytecode_cache": _WORKER["bytecode_cache"]}
+        context["cookiecutter"]["_output_dir"] = str(staging)
+        project_dir = Path(generate_files(repo_dir=str(TEMPLATE_DIR), context=context,
+                                          output_dir=str(staging)))
+        dest = output_dir / project_dir.name
+        publish(project_dir, dest, overwrite)
+        return {"name": name, "path": str(dest), "elapsed": time.perf_counter() - start, "error": None}
+    except Exception as e:
+        return {"name": name, "path": None, "elapsed": time.perf_counter() - start,
+                "error": f"{type(e).__name__}: {e}"}
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def run_baseline(contexts, quiet):
+    """基线：逐个调用 cookiecutter()，每次重新解析模板并执行完整的环境探测"""
+    from cookiecutter.main import cookiecutter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        for i, extra_context in enumerate(contexts):
+            with silence_stdout() if quiet else contextlib.nullcontext():
+                cookiecutter(str(TEMPLATE_DIR), no_input=True, extra_context=extra_context,
+                             output_dir=str(Path(tmp_dir) / str(i)))
+        return time.perf_counter() - start
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="使用本模板批量生成项目")
+    parser.add_argument("contexts", nargs="?", help="上下文文件（JSON数组或JSON Lines）")
+    parser.add_argument("--count", type=int, help="不指定上下文文件时，生成该数量的合成项目")
+    parser.add_argument("--output-dir", default="projects", help="输出目录")
+    parser.add_argument("--staging-dir", help="暂存目录，默认为 /dev/shm 或系统临时目录")
+    parser.add_argument("--cache-dir", help="Jinja2字节码缓存目录，默认位于用户缓存目录")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument("--probe", action="store_true", help="保留钩子中的环境探测（默认跳过）")
+    parser.add_argument("--overwrite", action="store_true", help="覆盖输出目录中已存在的项目")
+    parser.add_argument("--baseline", type=int, default=0,
+                        help="先用 cookiecutter() 逐个生成前N个项目作为基线，用于对比吞吐量")
+    parser.add_argument("--verbose", "-v", action="store_true", help="显示钩子的输出")
+    args = parser.parse_args()
+
+    try:
+        import cookiecutter  # noqa: F401
+    except ImportError:
+        print_colored("错误: 未安装cookiecutter，请先运行 pip install cookiecutter", "red")
+        return 1
+
+    if args.contexts:
+        contexts = load_contexts(args.contexts)
+    elif args.count:
+        contexts = synthetic_contexts(args.count)
+    else:
+        parser.error("需要指定上下文文件或 --count")
+
+    # 模板配置只解析一次，再传给所有工作进程
+    defaults = load_defaults()
+
+    quiet = not args.verbose
+    if args.baseline:
+        sample = contexts[:args.baseline]
+        elapsed = run_baseline(sample, quiet)
+        print_colored(f"基线 cookiecutter(): {len(sample)} 个项目，耗时 {elapsed:.2f} 秒，"
+                      f"{len(sample) / elapsed * 60:.1f} 个项目/分钟", "blue")
+
+    output_dir = Path(args.output_dir).resolve()
+    staging_root = Path(args.staging_dir) if args.staging_dir else default_staging_root()
+    staging_root = Path(tempfile.mkdtemp(prefix="cookiecutter-batch-", dir=staging_root))
+    cache_dir = Path(args.cache_dir) if args.cache_dir else user_cache_dir() / "jinja"
+    workers = max(1, min(args.workers, len(contexts)))
+
+    start = time.perf_counter()
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(defaults, cache_dir, quiet)) as executor:
+            futures = [executor.submit(generate_one, i, extra_context, staging_root, output_dir,
+                                       args.probe, args.overwrite)
+                       for i, extra_context in enumerate(contexts)]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result["error"]:
+                    print_colored(f"失败: {result['name']} - {result['error']}", "red")
+                elif args.verbose:
+                    print_colored(f"完成: {result['path']} ({result['elapsed']:.2f}s)", "green")
+    finally:
+        shutil.rmtree(staging_root, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+
+    generated = sum(1 for result in results if not result["error"])
+    print_colored(f"批量生成: {generated}/{len(contexts)} 个项目，{workers} 个进程，"
+                  f"耗时 {elapsed:.2f} 秒，{generated / elapsed * 60:.1f} 个项目/分钟", "blue")
+    print_colored(f"输出目录: {output_dir}", "blue")
+    return 0 if generated == len(contexts) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import json
 import os
 import pathlib
 import re
@@ -6,7 +7,26 @@ import stat
 import subprocess
 import shutil
 import sys
-import toml
+
+# 读取TOML：优先使用标准库tomllib（Python 3.11+），其次tomli，最后回退到toml
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+        import toml
+
+# 批量生成时设置 _no_probe 跳过git初始化和pyenv/PDM等环境检测
+NO_PROBE = "{{ cookiecutter._no_probe }}".lower() in ("true", "1", "yes")
+
+# 数组中单独占一行的字符串元素（可带逗号和行尾注释）
+ARRAY_ITEM_RE = re.compile(r"""^\s*("(?:[^"\\]|\\.)*"|'[^']*')\s*,?\s*(#.*)?$""")
+# 表头行，例如 "[project]  # 注释"（不匹配 [[数组表]]）
+TABLE_HEADER_RE = re.compile(r"^\s*\[\s*([^\[\]]+?)\s*\]\s*(#.*)?$")
+# 依赖声明开头的包名
+REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
 
 def print_colored(message, color="reset"):
     """打印彩色文本"""
@@ -41,8 +61,141 @@ def info(message):
     """打印信息"""
     print_colored(f"信息: {message}", "blue")
 
+def load_toml(text):
+    """解析TOML文本"""
+    if tomllib is not None:
+        return tomllib.loads(text)
+    return toml.loads(text)
+
+def canonicalize_name(name):
+    """按PEP 503规范化包名：不区分大小写，'-'、'_'、'.' 视为相同"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def requirement_name(requirement):
+    """提取依赖声明中的规范化包名，例如 'scikit-learn>=1.3' -> 'scikit-learn'"""
+    match = REQUIREMENT_NAME_RE.match(requirement)
+    return canonicalize_name(match.group(1)) if match else ""
+
+def find_table(lines, name):
+    """返回表 [name] 的内容行范围 (起始, 结束)，表头可带行尾注释；不存在时抛出ValueError"""
+    for i, line in enumerate(lines):
+        match = TABLE_HEADER_RE.match(line)
+        if match and match.group(1) == name:
+            end = i + 1
+            while end < len(lines) and not lines[end].lstrip().startswith("["):
+                end += 1
+            return i + 1, end
+    raise ValueError(f"pyproject.toml中未找到表 [{name}]")
+
+def find_key(lines, table_range, key):
+    """在表中查找 key = ... 的行范围 (起始, 结束)；值为多行数组时结束于闭合的 ']'"""
+    start, end = table_range
+    key_re = re.compile(rf"^\s*\"?{re.escape(key)}\"?\s*=")
+    for i in range(start, end):
+        if key_re.match(lines[i]):
+            # 跳过字符串和注释，找到与 '[' 匹配的 ']'
+            depth = 0
+            j = i
+            while j < end:
+                text = lines[j] if j != i else lines[j].split("=", 1)[1]
+                pos = 0
+                while pos < len(text):
+                    char = text[pos]
+                    if char == "#":
+                        break
+                    if char in "\"'":
+                        close = text.find(char, pos + 1)
+                        while char == '"' and close > 0 and text[close - 1] == "\\":
+                            close = text.find(char, close + 1)
+                        pos = close if close > 0 else len(text)
+                    elif char == "[":
+                        depth += 1
+                    elif char == "]":
+                        depth -= 1
+                        if depth == 0:
+                            return i, j + 1
+                    pos += 1
+                if depth == 0:
+                    return i, j + 1
+                j += 1
+            return None
+    return None
+
+def rewrite_array(lines, key_range, values):
+    """把数组的元素改为 values，尽量只删除被移除元素所在的行以保留注释和格式
+
+    当新元素按原顺序构成原元素的子序列且数组为一行一个元素时，只删除行；被删空的
+    注释分组（以空行分隔）一并删除。否则按一行一个元素重新生成数组。
+    """
+    start, end = key_range
+    body = lines[start + 1:end - 1]
+    items = []
+    for line in body:
+        match = ARRAY_ITEM_RE.match(line)
+        if match:
+            items.append(load_toml(f"v = {match.group(1)}")["v"])
+        elif line.strip() and not line.strip().startswith("#"):
+            items = None
+            break
+
+    remaining = iter(values)
+    expected = next(remaining, None)
+    keep = []
+    if items is not None and lines[start].rstrip().endswith("[") and lines[end - 1].strip() == "]":
+        for item in items:
+            if item == expected:
+                keep.append(True)
+                expected = next(remaining, None)
+            else:
+                keep.append(False)
+    if items is None or expected is not None or len(keep) != len(items):
+        indent = "    "
+        lines[start:end] = ([lines[start].split("=", 1)[0] + "= [\n"]
+                            + [f"{indent}{json.dumps(value, ensure_ascii=False)},\n" for value in values]
+                            + ["]\n"])
+        return
+
+    # 以空行分组，删除被移除的元素行；分组中的元素全部被删除时连同注释一起删除
+    new_body = []
+    group = []
+    group_items = group_kept = 0
+    flags = iter(keep)
+
+    def flush():
+        if group_items == 0 or group_kept > 0:
+            new_body.extend(line for line, kept in group if kept)
+
+    for line in body + [None]:
+        if line is None or not line.strip():
+            flush()
+            if line is not None and new_body and new_body[-1].strip():
+                new_body.append(line)
+            group, group_items, group_kept = [], 0, 0
+            continue
+        if ARRAY_ITEM_RE.match(line):
+            kept = next(flags)
+            group_items += 1
+            group_kept += kept
+            group.append((line, kept))
+        else:
+            group.append((line, True))
+    while new_body and not new_body[-1].strip():
+        new_body.pop()
+    lines[start + 1:end - 1] = new_body
+
+def remove_key(lines, key_range):
+    """删除键值对以及紧随其后的一个空行"""
+    start, end = key_range
+    if end < len(lines) and not lines[end].strip():
+        end += 1
+    del lines[start:end]
+
 def configure_dependencies():
-    """根据项目类型配置依赖分组（新版分组结构）"""
+    """根据项目类型配置依赖分组（新版分组结构）
+
+    只解析一次pyproject.toml，在解析结果上计算目标依赖并做结构比较；
+    有变化时只改写受影响的数组和分组，保留文件中的注释和格式。
+    """
     project_type = "{{ cookiecutter.project_type }}"
     cli_interface = "{{ cookiecutter.command_line_interface }}"
     pyproject_path = os.path.join(os.getcwd(), "pyproject.toml")
@@ -54,49 +207,39 @@ def configure_dependencies():
         warning(f"创建配置备份失败: {str(e)}")
 
     with open(pyproject_path, "r", encoding="utf-8") as f:
-        data = toml.load(f)
+        text = f.read()
+    project = load_toml(text)["project"]
 
-    original_data = toml.dumps(data)
-    changed = False
-
-    # 1. dependencies 主依赖处理
-    core_deps = data["project"].get("dependencies", [])
-    new_core_deps = []
-    for dep in core_deps:
-        if project_type != "Web Service" and any(pkg in dep for pkg in ["fastapi", "uvicorn", "pydantic"]):
-            changed = True
-            continue
-        if project_type != "Data Science" and any(pkg in dep for pkg in ["numpy", "pandas", "matplotlib", "scikit-learn"]):
-            changed = True
-            continue
-        if cli_interface == "No command-line interface" and "typer" in dep:
-            changed = True
-            continue
-        if cli_interface == "Argparse" and "typer" in dep:
-            changed = True
-            continue
-        new_core_deps.append(dep)
-    data["project"]["dependencies"] = new_core_deps
+    # 1. dependencies 主依赖处理：按规范化包名精确匹配
+    removed_names = set()
+    if project_type != "Web Service":
+        removed_names.update(["fastapi", "uvicorn", "pydantic"])
+    if project_type != "Data Science":
+        removed_names.update(["numpy", "pandas", "matplotlib", "scikit-learn"])
+    if cli_interface in ("No command-line interface", "Argparse"):
+        removed_names.add("typer")
+    core_deps = project.get("dependencies", [])
+    new_core_deps = [dep for dep in core_deps if requirement_name(dep) not in removed_names]
 
     # 2. optional-dependencies 分组处理
-    opt = data["project"].get("optional-dependencies", {})
+    opt = project.get("optional-dependencies", {})
     # 只保留新版分组
     keep_groups = ["dev", "test", "lint", "typing", "docs", "changelog", "web-dev", "data-dev", "cli-dev", "full-dev"]
-    opt = {k: v for k, v in opt.items() if k in keep_groups}
+    new_opt = {k: v for k, v in opt.items() if k in keep_groups}
 
     # dev组只保留开发体验工具
-    dev_keep = [
+    dev_keep = {
         "pre-commit", "ipython", "ipdb", "python-dotenv", "gitpython", "bump2version"
-    ]
-    opt["dev"] = [dep for dep in opt.get("dev", []) if any(tool in dep for tool in dev_keep)]
+    }
+    new_opt["dev"] = [dep for dep in new_opt.get("dev", []) if requirement_name(dep) in dev_keep]
 
     # 根据项目类型移除无关分组
     if project_type != "Web Service":
-        opt.pop("web-dev", None)
+        new_opt.pop("web-dev", None)
     if project_type != "Data Science":
-        opt.pop("data-dev", None)
+        new_opt.pop("data-dev", None)
     if project_type != "CLI Tool":
-        opt.pop("cli-dev", None)
+        new_opt.pop("cli-dev", None)
 
     # full-dev聚合所有开发分组
     full_dev = ["dev", "test", "lint", "typing", "docs", "changelog"]
@@ -106,18 +249,45 @@ def configure_dependencies():
         full_dev.append("data-dev")
     if project_type == "CLI Tool":
         full_dev.append("cli-dev")
-    opt["full-dev"] = full_dev
-
-    data["project"]["optional-dependencies"] = opt
+    new_opt["full-dev"] = full_dev
 
-    # 写回文件（仅有变化时）
-    new_data = toml.dumps(data)
-    if new_data != original_data:
-        with open(pyproject_path, "w", encoding="utf-8") as f:
-            f.write(new_data)
-        info("已根据项目类型和命令行接口优化依赖分组")
-    else:
+    # 结构比较，无需重新序列化
+    if new_core_deps == core_deps and new_opt == opt:
         info("依赖分组未发生变化")
+        return
+
+    lines = text.splitlines(keepends=True)
+    project_range = find_table(lines, "project")
+    if new_core_deps != core_deps:
+        removed = [dep for dep in core_deps if dep not in new_core_deps]
+        info(f"移除主依赖: {', '.join(removed)}")
+        rewrite_array(lines, find_key(lines, project_range, "dependencies"), new_core_deps)
+
+    # 从后往前修改分组，避免行号偏移影响尚未处理的分组
+    groups = list(opt)
+    for group in reversed(groups):
+        opt_range = find_table(lines, "project.optional-dependencies")
+        key_range = find_key(lines, opt_range, group)
+        if group not in new_opt:
+            info(f"移除依赖分组: {group}")
+            remove_key(lines, key_range)
+        elif new_opt[group] != opt[group]:
+            rewrite_array(lines, key_range, new_opt[group])
+    for group in new_opt:
+        if group not in opt:
+            end = find_table(lines, "project.optional-dependencies")[1]
+            lines[end:end] = [f"{group} = [\n", "]\n", "\n"]
+            rewrite_array(lines, (end, end + 2), new_opt[group])
+
+    new_text = "".join(lines)
+    # 校验改写结果与目标结构一致，避免写出错误的配置
+    new_project = load_toml(new_text)["project"]
+    if new_project.get("dependencies", []) != new_core_deps or new_project.get("optional-dependencies", {}) != new_opt:
+        raise ValueError("改写后的pyproject.toml与预期的依赖结构不一致")
+
+    with open(pyproject_path, "w", encoding="utf-8") as f:
+        f.write(new_text)
+    info("已根据项目类型和命令行接口优化依赖分组")
 
 def normalize_gitattributes():
     """确保.gitattributes文件使用规范的行尾。"""
@@ -478,47 +648,52 @@ if __name__ == '__main__':
     # 规范化.gitattributes行尾
     normalize_gitattributes()
 
-    # 初始化git仓库
-    if shutil.which("git") is None:
-        warning("未检测到git，请先安装Git后再使用本项目的版本控制功能\n")
-    elif not is_git_repo(os.getcwd()):
-        try:
-            subprocess.run(["git", "init", "-b", "main"], check=True)
-            success("已初始化git仓库\n")
-        except Exception as e:
-            warning(f"初始化git仓库失败: {e}\n")
+    if NO_PROBE:
+        info("已设置 _no_probe，跳过git初始化和环境检测\n")
     else:
-        info("当前目录已是git仓库，跳过初始化\n")
+        # 初始化git仓库
+        if shutil.which("git") is None:
+            warning("未检测到git，请先安装Git后再使用本项目的版本控制功能\n")
+        elif not is_git_repo(os.getcwd()):
+            try:
+                subprocess.run(["git", "init", "-b", "main"], check=True)
+                success("已初始化git仓库\n")
+            except Exception as e:
+                warning(f"初始化git仓库失败: {e}\n")
+        else:
+            info("当前目录已是git仓库，跳过初始化\n")
 
     # 创建.python-version文件
     create_python_version_file()
 
-    # 检测pyenv是否安装
-    if not check_pyenv_installed():
-        warning("未检测到pyenv安装")
-        warning("为获得最佳体验，建议安装pyenv管理Python版本")
-        warning("安装指南: https://github.com/pyenv/pyenv#installation")
-        selected_version = "{{ cookiecutter.python_version }}"
-        if isinstance(selected_version, list):
-            selected_version = selected_version[0]
-        warning(f"安装完成后，请在项目目录运行: pyenv install {selected_version}\n")
-    else:
-        selected_version = "{{ cookiecutter.python_version }}"
-        if isinstance(selected_version, list):
-            selected_version = selected_version[0]
-        info(f"pyenv已安装，您可以运行: pyenv install {selected_version}\n")
-
-    # 检测PDM是否安装
-    pdm_installed = check_pdm_installed()
-    # 在pre_gen_project.py中已经显示了警告，这里只提供安装指导
-    warning("本项目使用PDM进行依赖管理")
-    info("使用以下方式一键安装PDM环境：")
-    info("   - Linux/macOS: 执行1. dos2unix ./scripts/init.sh")
-    info("   - Linux/macOS: 执行2. ./scripts/init.sh")
-    info("   - Windows: 双击运行 run_init.bat")
-    info("   - 任何系统: python init.py")
-    info("详细文档请访问: https://pdm.fming.dev/latest/#installation\n")
-    info("PDM已安装，项目可以直接使用PDM进行依赖管理\n")
+    pdm_installed = False
+    if not NO_PROBE:
+        # 检测pyenv是否安装
+        if not check_pyenv_installed():
+            warning("未检测到pyenv安装")
+            warning("为获得最佳体验，建议安装pyenv管理Python版本")
+            warning("安装指南: https://github.com/pyenv/pyenv#installation")
+            selected_version = "{{ cookiecutter.python_version }}"
+            if isinstance(selected_version, list):
+                selected_version = selected_version[0]
+            warning(f"安装完成后，请在项目目录运行: pyenv install {selected_version}\n")
+        else:
+            selected_version = "{{ cookiecutter.python_version }}"
+            if isinstance(selected_version, list):
+                selected_version = selected_version[0]
+            info(f"pyenv已安装，您可以运行: pyenv install {selected_version}\n")
+
+        # 检测PDM是否安装
+        pdm_installed = check_pdm_installed()
+        # 在pre_gen_project.py中已经显示了警告，这里只提供安装指导
+        warning("本项目使用PDM进行依赖管理")
+        info("使用以下方式一键安装PDM环境：")
+        info("   - Linux/macOS: 执行1. dos2unix ./scripts/init.sh")
+        info("   - Linux/macOS: 执行2. ./scripts/init.sh")
+        info("   - Windows: 双击运行 run_init.bat")
+        info("   - 任何系统: python init.py")
+        info("详细文档请访问: https://pdm.fming.dev/latest/#installation\n")
+        info("PDM已安装，项目可以直接使用PDM进行依赖管理\n")
 
     # 项目创建完成提示
     success("项目 {{ cookiecutter.project_name }} 创建成功!")
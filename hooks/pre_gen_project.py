@@ -1,12 +1,25 @@
 #!/usr/bin/env python
+import hashlib
+import json
 import re
 import sys
 import os
 import platform
 import shutil
 import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 环境探测命令的超时时间（秒）
+PROBE_TIMEOUT = 10
+# 探测结果缓存的有效期（秒），在工具链指纹不变时复用结果
+PROBE_CACHE_TTL = 24 * 60 * 60
+PYTHON_COMMAND = 'python' if platform.system() == 'Windows' else 'python3'
+# 批量生成时设置 _no_probe 跳过所有环境探测
+NO_PROBE = "{{ cookiecutter._no_probe }}".lower() in ("true", "1", "yes")
+
 
 def print_colored(message, color="reset"):
     """打印彩色文本"""
@@ -72,20 +85,151 @@ def check_target_directory():
         warning(f"目标目录 '{target_dir}' 已存在。项目生成可能会覆盖现有文件。")
 
 
-def check_python_environment():
-    """检查Python环境"""
+def probe_cache_file():
+    """返回探测结果缓存文件的路径（位于用户缓存目录）
+
+    batch_generate.py 的 user_cache_dir 复制了这里的目录规则，修改时需同步。
+    """
+    if platform.system() == 'Windows':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'cookiecutter-python-template' / 'preflight.json'
+
+
+def interpreter_site_dirs(executable):
+    """不启动解释器，推测其可能的 site-packages / dist-packages 目录"""
+    bin_dir = Path(executable).parent
+    # venv中的解释器多为符号链接，同时检查链接所在位置和实际位置；Windows的python.exe位于prefix根目录
+    prefixes = {bin_dir, bin_dir.parent, Path(os.path.realpath(executable)).parent.parent}
+    if bin_dir.parent == Path('/usr'):
+        # Debian系发行版中 pip 安装到 /usr/local
+        prefixes.add(Path('/usr/local'))
+    patterns = ['lib/python3*/site-packages', 'lib/python3*/dist-packages', 'Lib/site-packages']
+    dirs = {path for prefix in prefixes for pattern in patterns for path in prefix.glob(pattern)}
+    # pip install --user 的安装位置
+    dirs.update(Path.home().glob('.local/lib/python3*/site-packages'))
+    if os.environ.get('APPDATA'):
+        dirs.update(Path(os.environ['APPDATA']).glob('Python/Python3*/site-packages'))
+    return sorted(str(path) for path in dirs)
+
+
+def probe_fingerprint(cmd):
+    """根据命令、PATH以及可执行文件的位置和修改时间计算工具链指纹
+
+    ``python -c "import ..."`` 形式的探测结果取决于已安装的包，指纹中还包含
+    site-packages 目录的修改时间，在同一环境中安装或卸载包后缓存即失效。
+    """
+    executable = shutil.which(cmd[0])
+    parts = [cmd, os.environ.get('PATH', ''), executable]
+    if executable:
+        try:
+            stat = os.stat(executable)
+            parts += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            pass
+        if cmd[1:2] == ['-c'] and cmd[2].lstrip().startswith(('import ', 'from ')):
+            for site_dir in interpreter_site_dirs(executable):
+                try:
+                    parts += [site_dir, os.stat(site_dir).st_mtime_ns]
+                except OSError:
+                    pass
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def run_probe(cmd, timeout=PROBE_TIMEOUT):
+    """执行探测命令，返回 (是否成功, 输出)；超时返回 (None, 说明)"""
     try:
-        python_command = 'python' if platform.system() == 'Windows' else 'python3'
-        python_version_str = subprocess.check_output(
-            [python_command, '--version'],
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             universal_newlines=True,
-            stderr=subprocess.STDOUT
-        ).strip()
-        info(f"检测到Python版本: {python_version_str}")
-        return python_command
-    except (subprocess.SubprocessError, FileNotFoundError):
-        warning("无法检测本地Python版本，请确保您的环境中安装了Python。")
-        return None
+            timeout=timeout
+        )
+        return result.returncode == 0, result.stdout.strip()
+    except subprocess.TimeoutExpired:
+        return None, f"超过 {timeout} 秒未响应"
+    except (subprocess.SubprocessError, OSError):
+        return False, ""
+
+
+def load_probe_cache(cache_file):
+    """读取探测结果缓存，文件不存在或损坏时返回空字典"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_probe_cache(cache_file, cache):
+    """通过临时文件原子地写入探测结果缓存，失败时忽略"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        pass
+
+
+def run_probes(probes):
+    """并发执行环境探测命令，并按工具链指纹缓存结果
+
+    Args:
+        probes: 探测名称到命令的映射
+
+    Returns:
+        dict: 探测名称到 (是否成功, 输出) 的映射；超时的探测为 (None, 说明)
+    """
+    start = time.perf_counter()
+    cache_file = probe_cache_file()
+    cache = load_probe_cache(cache_file)
+    now = time.time()
+    # 清理过期条目
+    cache = {key: entry for key, entry in cache.items()
+             if isinstance(entry, dict) and now - entry.get('time', 0) < PROBE_CACHE_TTL}
+
+    results = {}
+    pending = {}
+    for name, cmd in probes.items():
+        key = probe_fingerprint(cmd)
+        entry = cache.get(key)
+        if entry is not None:
+            results[name] = (entry['ok'], entry['output'])
+        else:
+            pending[name] = (cmd, key)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {name: executor.submit(run_probe, cmd) for name, (cmd, _) in pending.items()}
+        for name, (cmd, key) in pending.items():
+            ok, output = futures[name].result()
+            results[name] = (ok, output)
+            # 只缓存成功的结果和命令不存在的情况（安装后指纹会变化）；其他失败
+            # （例如尚未安装的Python包）和超时在下次生成时重新探测
+            if ok or (ok is False and shutil.which(cmd[0]) is None):
+                cache[key] = {'time': now, 'ok': ok, 'output': output}
+    save_probe_cache(cache_file, cache)
+
+    info(f"环境检查完成，耗时 {time.perf_counter() - start:.2f} 秒"
+         f"（{len(probes) - len(pending)}/{len(probes)} 项来自缓存）")
+    return results
+
+
+def check_python_environment(results):
+    """检查Python环境"""
+    ok, output = results['python']
+    if ok:
+        info(f"检测到Python版本: {output}")
+        return PYTHON_COMMAND
+    if ok is None:
+        warning(f"检测Python版本{output}。")
+    warning("无法检测本地Python版本，请确保您的环境中安装了Python。")
+    return None
 
 
 def validate_python_version():
@@ -114,7 +258,7 @@ def validate_python_version():
         warning("请确保选择的版本不低于最小版本要求。")
 
 
-def check_project_type_requirements(python_command):
+def check_project_type_requirements(python_command, results):
     """根据项目类型检查相关要求"""
     project_type = "{{ cookiecutter.project_type }}"
     cli_type = "{{ cookiecutter.command_line_interface }}"
@@ -127,14 +271,9 @@ def check_project_type_requirements(python_command):
             warning("CLI工具项目通常应该包含命令行接口。您选择了不使用命令行接口，请确认这符合您的需求。")
         
         if cli_type == "Typer" and python_command:
-            try:
-                subprocess.check_call(
-                    [python_command, '-c', 'import typer'],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
+            if results['typer'][0]:
                 info("Typer库已安装在当前环境中。")
-            except subprocess.SubprocessError:
+            else:
                 warning("未检测到Typer库。项目生成后，您需要安装它: pip install typer")
 
     elif project_type == "Web Service":
@@ -146,17 +285,13 @@ def check_project_type_requirements(python_command):
         # 可以在这里添加数据科学项目特有的检查
 
 
-def check_git_availability():
+def check_git_availability(results):
     """检查Git是否可用"""
-    try:
-        git_version = subprocess.check_output(
-            ['git', '--version'],
-            universal_newlines=True,
-            stderr=subprocess.DEVNULL
-        ).strip()
-        info(f"检测到Git: {git_version}")
+    ok, output = results['git']
+    if ok:
+        info(f"检测到Git: {output}")
         return True
-    except (subprocess.SubprocessError, FileNotFoundError):
+    else:
         warning("未检测到Git。建议安装Git进行版本控制。")
         warning("Git下载地址: https://git-scm.com/downloads")
         return False
@@ -171,25 +306,45 @@ def check_license_choice():
         info(f"已选择开源许可证: {license_choice}")
 
 
-def check_required_tools():
-    """检查其他必要工具的可用性"""
-    # 检查make命令 (在Windows上不常用，但在Unix系统上常用)
+def required_tool_probes():
+    """其他必要工具的探测命令"""
+    probes = {'pdm': ['pdm', '--version']}
+    # make命令在Windows上不常用，但在Unix系统上常用
     if platform.system() != 'Windows':
-        try:
-            subprocess.check_call(['make', '--version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        probes['make'] = ['make', '--version']
+    return probes
+
+
+def check_required_tools(results):
+    """检查其他必要工具的可用性"""
+    if 'make' in results:
+        if results['make'][0]:
             info("检测到make工具可用。")
-        except (subprocess.SubprocessError, FileNotFoundError):
+        else:
             warning("未检测到make工具。部分项目命令可能无法使用。")
-    
+
     # 检查PDM可用性
-    try:
-        pdm_version = subprocess.check_output(['pdm', '--version'], universal_newlines=True, stderr=subprocess.DEVNULL).strip()
-        info(f"检测到PDM: {pdm_version}")
-    except (subprocess.SubprocessError, FileNotFoundError):
+    ok, output = results['pdm']
+    if ok:
+        info(f"检测到PDM: {output}")
+    else:
         warning("未检测到PDM包管理器。项目依赖管理将需要PDM。")
         warning("PDM安装指南: https://pdm.fming.dev/latest/#installation")
 
 
+def environment_probes():
+    """本次生成需要执行的环境探测命令"""
+    probes = {
+        'python': [PYTHON_COMMAND, '--version'],
+        'git': ['git', '--version'],
+    }
+    if "{{ cookiecutter.project_type }}" == "CLI Tool" and "{{ cookiecutter.command_line_interface }}" == "Typer":
+        probes['typer'] = [PYTHON_COMMAND, '-c', 'import typer']
+    # 启用 check_required_tools 时同时探测其他必要工具
+    # probes.update(required_tool_probes())
+    return probes
+
+
 if __name__ == '__main__':
     print_colored("\n==================== 项目前置验证 ====================", "cyan")
     
@@ -200,23 +355,32 @@ if __name__ == '__main__':
     # 检查目标目录
     check_target_directory()
     
-    # 检查Python环境
-    python_command = check_python_environment()
+    python_command = None
+    probe_results = {}
+    if NO_PROBE:
+        info("已设置 _no_probe，跳过环境探测。")
+    else:
+        # 并发执行所有环境探测命令（结果按工具链指纹缓存）
+        probe_results = run_probes(environment_probes())
+
+        # 检查Python环境
+        python_command = check_python_environment(probe_results)
     
     # 验证Python版本
     validate_python_version()
     
-    # 检查项目类型要求
-    check_project_type_requirements(python_command)
+    # 检查项目类型要求（未探测时跳过依赖库检查）
+    check_project_type_requirements(python_command, probe_results)
     
     # 检查Git可用性
-    check_git_availability()
+    if not NO_PROBE:
+        check_git_availability(probe_results)
     
     # 检查许可证选择
     check_license_choice()
     
     # 检查其他必要工具
-    # check_required_tools()
+    # check_required_tools(probe_results)
     
     print_colored("\n===================== 验证完成 =====================", "green")
     success("项目前置验证通过！即将开始生成项目...")
@@ -0,0 +1,96 @@
+"""batch_generate.py 的冒烟测试。
+
+在模板根目录运行: python -m pytest tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import batch_generate  # noqa: E402
+
+
+def test_publish_cleans_up_failed_copy(tmp_path, monkeypatch):
+    """测试跨文件系统复制失败时不在输出目录中留下临时目录。"""
+    staged = tmp_path / "staging" / "proj"
+    staged.mkdir(parents=True)
+    (staged / "README.md").write_text("proj", encoding="utf-8")
+    dest = tmp_path / "out" / "proj"
+
+    def fail_rename(src, dst):
+        raise OSError("跨文件系统")
+
+    def partial_copytree(src, dst, symlinks=False):
+        Path(dst).mkdir()
+        (Path(dst) / "README.md").write_text("pr", encoding="utf-8")
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(batch_generate.os, "rename", fail_rename)
+    monkeypatch.setattr(batch_generate.shutil, "copytree", partial_copytree)
+
+    with pytest.raises(OSError):
+        batch_generate.publish(staged, dest)
+
+    assert list((tmp_path / "out").iterdir()) == []
+    assert (staged / "README.md").exists()
+
+
+def test_batch_generate_end_to_end(tmp_path, monkeypatch):
+    """测试使用真实的cookiecutter批量生成项目。"""
+    pytest.importorskip("cookiecutter")
+
+    contexts = tmp_path / "contexts.json"
+    contexts.write_text(json.dumps([
+        {"project_name": "Smoke Library"},
+        {"project_name": "Smoke Cli", "project_type": "CLI Tool"},
+    ]), encoding="utf-8")
+    output_dir = tmp_path / "projects"
+    staging_dir = tmp_path / "staging"
+    staging_dir.mkdir()
+    cache_dir = tmp_path / "jinja"
+    monkeypatch.setattr(sys, "argv", [
+        "batch_generate.py", str(contexts), "--output-dir", str(output_dir),
+        "--staging-dir", str(staging_dir), "--cache-dir", str(cache_dir), "--workers", "2",
+    ])
+
+    assert batch_generate.main() == 0
+
+    assert sorted(path.name for path in output_dir.iterdir()) == ["smoke_cli", "smoke_library"]
+    for slug in ("smoke_cli", "smoke_library"):
+        project = output_dir / slug
+        assert (project / "pyproject.toml").exists()
+        assert (project / "src" / slug / "__init__.py").exists()
+        # _no_probe 跳过了git初始化
+        assert not (project / ".git").exists()
+    assert "typer" in (output_dir / "smoke_cli" / "pyproject.toml").read_text(encoding="utf-8")
+    # 暂存目录已清理，字节码缓存已写入
+    assert list(staging_dir.iterdir()) == []
+    assert any(cache_dir.iterdir())
+
+
+def test_batch_generate_matches_cookiecutter(tmp_path):
+    """测试批量生成的项目与直接调用 cookiecutter() 的结果一致。"""
+    pytest.importorskip("cookiecutter")
+    from cookiecutter.main import cookiecutter
+
+    extra_context = {"project_name": "Same Output", "project_type": "Web Service"}
+    reference = Path(cookiecutter(str(batch_generate.TEMPLATE_DIR), no_input=True,
+                                  extra_context=dict(extra_context, _no_probe="true"),
+                                  output_dir=str(tmp_path / "reference")))
+
+    output_dir = tmp_path / "projects"
+    batch_generate._init_worker(batch_generate.load_defaults(), tmp_path / "jinja", quiet=False)
+    result = batch_generate.generate_one(0, extra_context, tmp_path, output_dir, probe=False,
+                                         overwrite=False)
+
+    assert result["error"] is None
+    generated = Path(result["path"])
+    reference_files = sorted(p.relative_to(reference) for p in reference.rglob("*") if p.is_file())
+    generated_files = sorted(p.relative_to(generated) for p in generated.rglob("*") if p.is_file())
+    assert generated_files == reference_files
+    for relative in reference_files:
+        assert (generated / relative).read_bytes() == (reference / relative).read_bytes(), relative
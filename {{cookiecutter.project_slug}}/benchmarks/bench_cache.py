@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+缓存性能基准测试。
+
+对比 functools.lru_cache 与 memoize 的命中开销，以及并发未命中时 single-flight 的收益。
+
+使用方法:
+    python benchmarks/bench_cache.py [--n 1000000] [--threads 32]
+"""
+
+import argparse
+import functools
+import threading
+import time
+
+from {{cookiecutter.project_slug}}.utils.cache import LRUCache, memoize
+
+
+def timed(label: str, func, *args, **kwargs):
+    """执行函数并打印耗时。"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return result
+
+
+def bench_hits(n: int) -> None:
+    """命中路径的每次调用开销。"""
+    print("\n[命中开销]")
+    keys = [i % 1000 for i in range(n)]
+
+    @functools.lru_cache(maxsize=1024)
+    def std(x):
+        return x
+
+    @memoize(maxsize=1024)
+    def memo(x):
+        return x
+
+    @memoize(maxsize=1024, ttl=3600)
+    def memo_ttl(x):
+        return x
+
+    timed("functools.lru_cache (基线)", lambda: [std(k) for k in keys])
+    timed("memoize", lambda: [memo(k) for k in keys])
+    timed("memoize ttl", lambda: [memo_ttl(k) for k in keys])
+    cache = LRUCache(maxsize=None, max_bytes=1 << 20)
+    timed("LRUCache.set max_bytes", lambda: [cache.set(k, k) for k in keys])
+    print(memo.cache_info())
+
+
+def bench_single_flight(threads: int) -> None:
+    """并发的相同未命中：朴素字典缓存会重复计算，single-flight只计算一次。"""
+    print("\n[并发未命中]")
+    naive_cache = {}
+    naive_calls = []
+
+    def naive(x):
+        if x not in naive_cache:
+            naive_calls.append(x)
+            time.sleep(0.05)
+            naive_cache[x] = x
+        return naive_cache[x]
+
+    memo_calls = []
+
+    @memoize()
+    def memo(x):
+        memo_calls.append(x)
+        time.sleep(0.05)
+        return x
+
+    def run(func):
+        workers = [threading.Thread(target=func, args=(1,)) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    timed("字典缓存 (基线)", run, naive)
+    timed("memoize single-flight", run, memo)
+    print(f"实际计算次数: 基线 {len(naive_calls)}, memoize {len(memo_calls)}")
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="缓存性能基准测试")
+    parser.add_argument("--n", type=int, default=1_000_000, help="命中测试的调用次数")
+    parser.add_argument("--threads", type=int, default=32, help="并发未命中的线程数")
+    args = parser.parse_args()
+
+    bench_hits(args.n)
+    bench_single_flight(args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+变更日志生成性能基准测试。
+
+使用 git fast-import 生成包含大量提交的合成仓库，对比逐个 git show 与单次流式 git log 的耗时，
+以及Markdown渲染、CHANGELOG更新和提交分类的耗时。
+
+使用方法:
+    python benchmarks/bench_changelog.py [--sizes 1000 10000 100000] [--baseline-sample 500]
+        [--classify-size 200000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import generate_changelog  # noqa: E402
+
+COMMIT_TYPES = ["feat", "fix", "docs", "refactor", "perf", "test", "chore"]
+
+
+def build_repo(path: Path, commits: int, seed: int = 0) -> None:
+    """使用 git fast-import 生成合成仓库。
+
+    Args:
+        path: 仓库目录
+        commits: 提交数量
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    lines = []
+    timestamp = 1_600_000_000
+    for i in range(commits):
+        commit_type = rng.choice(COMMIT_TYPES)
+        scope = rng.choice(["", "(core)", "(cli)", "(utils)"])
+        message = f"{commit_type}{scope}: change number {i}\n".encode("utf-8")
+        content = f"{i}\n".encode("utf-8")
+        lines.append(b"commit refs/heads/main\n")
+        lines.append(f"committer Bench <bench@example.com> {timestamp + i * 60} +0000\n".encode())
+        lines.append(f"data {len(message)}\n".encode() + message)
+        lines.append(f"M 644 inline file{i % 100}.txt\ndata {len(content)}\n".encode() + content)
+        lines.append(b"\n")
+    subprocess.run(["git", "fast-import", "--quiet"], input=b"".join(lines),
+                   cwd=path, check=True)
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+
+
+def legacy_commit_details(commit_hash: str):
+    """原先的实现：每个提交启动一个 git show 进程。"""
+    cmd = ["git", "show", "-s", "--format=%h %ad %s %an", "--date=short", commit_hash]
+    commit_data = subprocess.check_output(cmd, universal_newlines=True).strip()
+    return re.match(r"([a-f0-9]+) (\d{4}-\d{2}-\d{2}) (.*) (.*)", commit_data)
+
+
+def timed(label: str, func, *args, **kwargs):
+    """执行函数并打印耗时，屏蔽被测函数的日志输出。"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed:8.3f}s")
+    return result
+
+
+def bench_cache_io(tmp_dir: Path, cache) -> None:
+    """对比整体重写JSON与只追加的缓存文件在新增少量提交时的I/O耗时。"""
+    commits = cache.commit_cache
+
+    def legacy_roundtrip():
+        legacy_file = tmp_dir / "legacy.json"
+        with open(legacy_file, "w", encoding="utf-8") as f:
+            json.dump({"commits": commits}, f, ensure_ascii=False, indent=2)
+        with open(legacy_file, encoding="utf-8") as f:
+            json.load(f)
+
+    timed("旧版JSON 整体写入+读取 (基线)", legacy_roundtrip)
+
+    cache_file = str(tmp_dir / "cache.jsonl")
+    full = generate_changelog.GitCache(cache_file)
+    for commit_hash, commit in commits.items():
+        full.add_commit(commit_hash, commit)
+    timed("GitCache 首次保存", full.save_cache)
+
+    def incremental_run():
+        run_cache = generate_changelog.GitCache(cache_file)
+        for i in range(10):
+            fake_hash = f"{i:040x}"
+            run_cache.add_commit(fake_hash, {"hash": fake_hash, "title": "new"})
+        run_cache.save_cache()
+
+    timed("GitCache 加载索引+追加10个提交", incremental_run)
+
+
+def legacy_markdown(categorized, version: str, date: str) -> str:
+    """原先的实现：通过字符串反复拼接生成Markdown。"""
+    markdown = f"## {version} ({date})\n\n"
+    for commit_type, type_commits in categorized.items():
+        markdown += f"### {commit_type}\n\n"
+        for commit in type_commits:
+            markdown += f"* {commit.get('title', '')} ({commit.get('short_hash', '')})\n"
+        markdown += "\n"
+    return markdown
+
+
+def bench_render(tmp_dir: Path, commits) -> None:
+    """对比字符串拼接与StringIO渲染，以及整体读写与流式原子更新CHANGELOG。"""
+    config = {"commit_types": generate_changelog.DEFAULT_COMMIT_TYPES, "header": "# 变更日志\n\n"}
+    categorized = generate_changelog.categorize_commits(commits, config)
+    timed("Markdown 字符串拼接 (基线)", legacy_markdown, categorized, "1.0.0", "2024-01-01")
+    new_content = timed("generate_markdown (StringIO)", generate_changelog.generate_markdown,
+                        categorized, "1.0.0", "2024-01-01", config)
+
+    # 模拟一个包含大量历史版本的CHANGELOG
+    changelog = tmp_dir / "CHANGELOG.md"
+    changelog.write_text(config["header"] + new_content * 20, encoding="utf-8")
+
+    def legacy_update():
+        content = changelog.read_text(encoding="utf-8")
+        changelog.write_text(generate_changelog.update_changelog(content, new_content, config),
+                             encoding="utf-8")
+
+    timed("读取+字符串更新+写回 (基线)", legacy_update)
+    timed("update_changelog_file (流式原子替换)", generate_changelog.update_changelog_file,
+          changelog, new_content, config)
+
+
+def legacy_categorize(commits, config):
+    """原先的实现：每个提交用内联正则解析标题，再逐个查表分类。"""
+    categorized = {}
+    commit_types = config["commit_types"]
+    for commit in commits:
+        match = re.match(r"([\w:]+)(?:\(([^)]+)\))?: (.*)", commit["message"])
+        commit_type = match.group(1).lower() if match else ""
+        if commit_type not in commit_types:
+            commit_type = "chore"
+        categorized.setdefault(commit_type, []).append(commit)
+    return categorized
+
+
+def bench_classify(size: int, seed: int = 0) -> None:
+    """对比逐个解析分类与预编译分类器的批量分类。"""
+    print(f"\n[分类 {size} 个提交]")
+    rng = random.Random(seed)
+    commits = []
+    for i in range(size):
+        commit_type = rng.choice(COMMIT_TYPES)
+        scope = rng.choice(["", "(core)", "(CLI)", "(utils)"])
+        bang = "!" if i % 50 == 0 else ""
+        message = f"{commit_type}{scope}{bang}: change number {i}"
+        body = "BREAKING CHANGE: removed option\n" if i % 97 == 0 else ""
+        commits.append(generate_changelog.build_commit(f"{i:040x}", f"{i:07x}", "2024-01-01",
+                                                       "Bench", message, body))
+    config = {
+        "commit_types": generate_changelog.DEFAULT_COMMIT_TYPES,
+        "default_type": "chore",
+        "scope_aliases": {"CLI": "cli"},
+        "rules": [{"pattern": "^Merge ", "type": "chore"}],
+    }
+    timed("逐个内联正则解析+分类 (基线)", legacy_categorize, commits, config)
+    timed("CommitClassifier 构建+批量分类", generate_changelog.categorize_commits, commits, config)
+    classifier = generate_changelog.CommitClassifier(config)
+    timed("CommitClassifier 复用实例", classifier.classify_batch, commits)
+
+
+def bench_size(commits: int, baseline_sample: int) -> None:
+    """在指定规模的仓库上运行各实现。"""
+    print(f"\n[{commits} 个提交]")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = Path(tmp_dir) / "repo"
+        timed("生成合成仓库 (fast-import)", build_repo, repo, commits)
+        cwd = os.getcwd()
+        os.chdir(repo)
+        try:
+            hashes = subprocess.check_output(["git", "rev-list", "HEAD"], text=True).split()
+            sample = hashes[:baseline_sample]
+            start = time.perf_counter()
+            for commit_hash in sample:
+                legacy_commit_details(commit_hash)
+            per_commit = (time.perf_counter() - start) / max(1, len(sample))
+            print(f"{'逐个 git show (基线, 按样本外推)':<44} {per_commit * commits:8.3f}s")
+
+            result = timed("get_git_log 无缓存", generate_changelog.get_git_log)
+            assert len(result) == commits
+            cache = generate_changelog.GitCache()
+            timed("get_git_log 冷缓存", generate_changelog.get_git_log, cache=cache)
+            timed("get_git_log 热缓存", generate_changelog.get_git_log, cache=cache)
+            bench_cache_io(Path(tmp_dir), cache)
+            bench_render(Path(tmp_dir), result)
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="变更日志生成性能基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000],
+                        help="合成仓库的提交数量")
+    parser.add_argument("--baseline-sample", type=int, default=500,
+                        help="基线实现实际运行的提交数量，其余按比例外推")
+    parser.add_argument("--classify-size", type=int, default=200_000,
+                        help="分类基准测试的提交数量")
+    args = parser.parse_args()
+
+    for commits in args.sizes:
+        bench_size(commits, args.baseline_sample)
+    bench_classify(args.classify_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+数据工具性能基准测试。
+
+对比逐个处理的基线实现与批量/向量化实现的吞吐量。
+
+使用方法:
+    python benchmarks/bench_data_utils.py [--n 1000000] [--processes 8]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import string
+import time
+import tracemalloc
+import unicodedata
+from datetime import datetime, timedelta
+
+from {{cookiecutter.project_slug}}.utils.data_utils import (
+    DateRange,
+    TextNormalizer,
+    chunk_list,
+    chunked,
+    clean_text,
+    flatten_dict,
+    format_datetimes,
+    generate_random_string,
+    generate_random_strings,
+    generate_sortable_ids,
+    get_date_range,
+    normalize_texts,
+    parse_datetimes,
+    unflatten_dict,
+)
+
+
+def report(label: str, count: int, unit: str, func, *args, **kwargs):
+    """执行函数并打印每秒处理量。"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed:8.3f}s {count / elapsed:14,.1f} {unit}/s")
+    return result
+
+
+def bench_random_ids(n: int) -> None:
+    """对比逐字符 random.choice 与批量生成随机ID。"""
+    print("\n[random ids]")
+    chars = string.ascii_letters + string.digits
+    report("random.choice 逐字符 (基线)", n, "IDs",
+           lambda: [''.join(random.choice(chars) for _ in range(16)) for _ in range(n)])
+    report("generate_random_string 逐个调用", n, "IDs",
+           lambda: [generate_random_string(16) for _ in range(n)])
+    report("generate_random_strings secure=True", n, "IDs",
+           generate_random_strings, n, 16)
+    report("generate_random_strings secure=False", n, "IDs",
+           generate_random_strings, n, 16, secure=False)
+    report("generate_sortable_ids ulid", n, "IDs", generate_sortable_ids, n)
+    report("generate_sortable_ids uuid7", n, "IDs", generate_sortable_ids, n, "uuid7")
+
+
+def bench_datetimes(n: int) -> None:
+    """对比逐个 strptime/strftime 与批量解析和格式化。"""
+    print("\n[datetimes]")
+    # 模拟秒级精度的日志时间戳：大量重复值
+    start = datetime(2024, 1, 1)
+    dts = [start + timedelta(seconds=i // 10) for i in range(n)]
+    iso_strings = [dt.strftime("%Y-%m-%d %H:%M:%S") for dt in dts]
+    custom_strings = [dt.strftime("%d/%m/%Y %H:%M:%S") for dt in dts]
+    unique_strings = [(start + timedelta(seconds=i)).strftime("%d/%m/%Y %H:%M:%S")
+                      for i in range(n)]
+
+    report("strptime ISO (基线)", n, "rows",
+           lambda: [datetime.strptime(s, "%Y-%m-%d %H:%M:%S") for s in iso_strings])
+    report("parse_datetimes ISO", n, "rows", parse_datetimes, iso_strings)
+    report("strptime 自定义格式 (基线)", n, "rows",
+           lambda: [datetime.strptime(s, "%d/%m/%Y %H:%M:%S") for s in custom_strings])
+    report("parse_datetimes 自定义格式", n, "rows",
+           parse_datetimes, custom_strings, "%d/%m/%Y %H:%M:%S")
+    report("parse_datetimes 自定义格式 无重复", n, "rows",
+           parse_datetimes, unique_strings, "%d/%m/%Y %H:%M:%S")
+    report("strftime (基线)", n, "rows",
+           lambda: [dt.strftime("%Y-%m-%d %H:%M:%S") for dt in dts])
+    report("format_datetimes", n, "rows", format_datetimes, dts)
+
+
+def bench_date_range(n: int) -> None:
+    """对比预先生成的日期列表与惰性日期范围。"""
+    print("\n[date range]")
+    start = datetime(2000, 1, 1)
+    end_str = (start + timedelta(hours=n - 1)).strftime("%Y-%m-%d %H")
+    fmt = "%Y-%m-%d %H"
+
+    def baseline():
+        current, end, result = start, datetime.strptime(end_str, fmt), []
+        while current <= end:
+            result.append(current.strftime(fmt))
+            current += timedelta(hours=1)
+        return result
+
+    report("while循环 + strftime (基线)", n, "items", baseline)
+    report("get_date_range", n, "items", get_date_range, start, end_str, fmt, "hour")
+    hours = report("DateRange 构造", n, "items", DateRange, start, end_str, fmt, "hour")
+    probes = [(start + timedelta(hours=i * 7919 % n)).strftime(fmt) for i in range(10_000)]
+    report("DateRange 成员判断 x10000", 10_000, "lookups",
+           lambda: sum(p in hours for p in probes))
+    report("DateRange 下标访问 x10000", 10_000, "lookups",
+           lambda: [hours[i * 7919 % n] for i in range(10_000)])
+
+
+def bench_text(n: int, processes: int) -> None:
+    """对比逐条 re.sub 清理与批量文本规范化流水线。"""
+    print("\n[text normalization]")
+    words = ["Hello", "ＷＯＲＬＤ", "Straße", "naïve", "data\x07", "\u200bzero", "tab\there"]
+    rng = random.Random(0)
+    texts = ["  ".join(rng.choice(words) for _ in range(12)) + " \n" for _ in range(n)]
+    megabytes = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    report("re.sub + strip 逐条 (基线)", megabytes, "MB",
+           lambda: [re.sub(r"\s+", " ", t).strip() for t in texts])
+    report("clean_text", megabytes, "MB", lambda: [clean_text(t) for t in texts])
+    report("完整规范化逐条 (基线)", megabytes, "MB",
+           lambda: [re.sub(r"\s+", " ", "".join(
+               c for c in unicodedata.normalize("NFKC", t)
+               if c.isspace() or unicodedata.category(c) not in ("Cc", "Cf"))).strip().casefold()
+               for t in texts])
+    normalizer = TextNormalizer()
+    report("TextNormalizer 逐条调用", megabytes, "MB", lambda: [normalizer(t) for t in texts])
+    report("normalize_texts", megabytes, "MB", normalize_texts, texts)
+    report(f"normalize_texts processes={processes}", megabytes, "MB",
+           normalize_texts, texts, processes=processes, batch_size=50_000)
+
+
+def bench_chunking(n: int) -> None:
+    """对比复制式 chunk_list 与零拷贝的 chunked 的耗时和峰值内存。"""
+    print("\n[chunking]")
+    data = list(range(n))
+
+    def peak(label, func):
+        tracemalloc.start()
+        report(label, n, "items", func)
+        print(f"{'':<44} 峰值内存 {tracemalloc.get_traced_memory()[1] / 1e6:10.1f} MB")
+        tracemalloc.stop()
+
+    peak("chunk_list (基线)", lambda: sum(len(c) for c in chunk_list(data, 1000)))
+    peak("chunked 列表视图", lambda: sum(len(c) for c in chunked(data, 1000)))
+    peak("chunked 迭代器", lambda: sum(len(c) for c in chunked(iter(data), 1000)))
+    peak("chunked n_chunks=8", lambda: sum(len(c) for c in chunked(data, n_chunks=8)))
+
+
+def _recursive_flatten(d, parent_key="", separator="."):
+    """原先的递归实现，作为基线。"""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{separator}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(_recursive_flatten(v, new_key, separator).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def bench_flatten(n: int) -> None:
+    """在宽文档和深文档上对比递归与迭代的字典扁平化。"""
+    print("\n[flatten_dict]")
+    # 宽文档：每层10个分支、共4层，经JSON往返以模拟真实解析结果
+    width = max(2, round(n ** 0.25))
+    wide: dict = {"leaf": 0}
+    for _ in range(4):
+        wide = {f"k{i}": json.loads(json.dumps(wide)) for i in range(width)}
+    leaves = len(flatten_dict(wide))
+    report("递归实现 宽文档 (基线)", leaves, "keys", _recursive_flatten, wide)
+    report("flatten_dict 宽文档", leaves, "keys", flatten_dict, wide)
+    flat = flatten_dict(wide)
+    report("unflatten_dict 宽文档", leaves, "keys", unflatten_dict, flat)
+
+    # 深文档：单链嵌套，递归实现在深度接近递归限制时即失败
+    for depth in (500, 50_000):
+        deep = current = {}
+        for _ in range(depth):
+            current["k"] = current = {}
+        current["leaf"] = 1
+        try:
+            report(f"递归实现 深度={depth} (基线)", depth, "levels", _recursive_flatten, deep)
+        except RecursionError:
+            print(f"{'递归实现 深度=' + str(depth) + ' (基线)':<44} RecursionError")
+        report(f"flatten_dict 深度={depth}", depth, "levels", flatten_dict, deep)
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="数据工具性能基准测试")
+    parser.add_argument("--n", type=int, default=1_000_000, help="每项测试的数据量")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 4, help="进程池大小")
+    args = parser.parse_args()
+
+    bench_random_ids(args.n)
+    bench_datetimes(args.n)
+    bench_date_range(args.n)
+    bench_text(args.n, args.processes)
+    bench_chunking(args.n)
+    bench_flatten(args.n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+文件工具性能基准测试。
+
+在临时目录中生成合成的大型目录树，对比各文件工具函数的耗时。
+
+使用方法:
+    python benchmarks/bench_file_utils.py [--dirs 200] [--files-per-dir 500] [--workers 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from {{cookiecutter.project_slug}}.utils.data_utils import calculate_md5
+from {{cookiecutter.project_slug}}.utils.file_utils import (
+    DirectorySnapshot,
+    diff_since,
+    disk_usage,
+    find_duplicates,
+    get_file_size,
+    get_file_sizes,
+    iter_files,
+    list_files,
+)
+
+
+def build_tree(root: Path, dirs: int, files_per_dir: int, fanout: int = 10) -> int:
+    """生成合成目录树。
+
+    Args:
+        root: 根目录
+        dirs: 目录数量
+        files_per_dir: 每个目录中的文件数量
+        fanout: 每层目录的分支数量
+
+    Returns:
+        int: 生成的文件总数
+    """
+    total = 0
+    for i in range(dirs):
+        # 按分支数量生成多层嵌套路径，例如 d1/d12/d123
+        parts = []
+        n = i
+        while True:
+            parts.append(f"d{n}")
+            n //= fanout
+            if n == 0:
+                break
+        directory = root.joinpath(*reversed(parts))
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(files_per_dir):
+            with open(directory / f"f{j}.txt", "wb") as f:
+                f.write(b"x" * (j % 64))
+            total += 1
+    return total
+
+
+def timed(label: str, func, *args, **kwargs):
+    """执行函数并打印耗时。"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return result
+
+
+def bench_list_files(root: Path, workers: int) -> None:
+    """对比 rglob、单线程与多线程 scandir 遍历。"""
+    print("\n[list_files]")
+    timed("Path.rglob (基线)", lambda: list(root.rglob("*.txt")))
+    timed("list_files(recursive=True)", list_files, root, "*.txt", recursive=True)
+    timed("iter_files 单线程", lambda: sum(1 for _ in iter_files(root, "*.txt")))
+    timed(f"iter_files workers={workers}",
+          lambda: sum(1 for _ in iter_files(root, "*.txt", workers=workers)))
+
+    # 首个结果的延迟体现流式遍历的优势
+    start = time.perf_counter()
+    next(iter_files(root, "*.txt"))
+    print(f"{'iter_files 首个结果延迟':<40} {time.perf_counter() - start:8.3f}s")
+
+
+def bench_snapshot(root: Path) -> None:
+    """对比全量重新扫描与基于快照的增量变更检测。"""
+    print("\n[snapshot]")
+
+    def full_rescan():
+        return {p: get_file_size(p) for p in list_files(root, recursive=True)}
+
+    timed("list_files + get_file_size (基线)", full_rescan)
+    index_file = root.parent / "snapshot.db"
+    snapshot = timed("DirectorySnapshot.scan", DirectorySnapshot.scan, root)
+    timed("DirectorySnapshot.save", snapshot.save, index_file)
+    timed("DirectorySnapshot.load", DirectorySnapshot.load, index_file)
+
+    # 修改少量文件后做增量比较
+    for path in list(iter_files(root, "*.txt"))[:100]:
+        path.write_bytes(b"changed")
+    diff = timed("diff_since", diff_since, index_file)
+    print(f"新增 {len(diff.added)}, 修改 {len(diff.modified)}, 删除 {len(diff.removed)}")
+    index_file.unlink()
+
+
+def bench_disk_usage(root: Path, workers: int) -> None:
+    """对比逐文件获取大小与单次遍历聚合。"""
+    print("\n[disk_usage]")
+    paths = list_files(root, recursive=True)
+    timed("sum(get_file_size) (基线)", lambda: sum(get_file_size(p) for p in paths))
+    timed("get_file_sizes", get_file_sizes, paths)
+    usage = timed("disk_usage 单线程", disk_usage, root)
+    timed(f"disk_usage workers={workers}", disk_usage, root, workers=workers)
+    print(f"{len(usage)} 个目录, 共 {usage.total_apparent} 字节")
+
+
+def bench_find_duplicates(root: Path, workers: int) -> None:
+    """对比逐个完整哈希与分级哈希去重。"""
+    print("\n[find_duplicates]")
+    # 加入大文件：一半为完全重复，另一半大小相同但内容不同
+    large_dir = root / "large"
+    large_dir.mkdir(exist_ok=True)
+    payload = os.urandom(8 * 1024 * 1024)
+    for i in range(16):
+        content = payload if i % 2 == 0 else os.urandom(len(payload))
+        (large_dir / f"large{i}.bin").write_bytes(content)
+
+    def naive():
+        groups = {}
+        for path in list_files(root, recursive=True):
+            groups.setdefault(calculate_md5(path.read_bytes()), []).append(path)
+        return [g for g in groups.values() if len(g) > 1]
+
+    timed("list_files + calculate_md5 (基线)", naive)
+    groups = timed(f"find_duplicates workers={workers}",
+                   lambda: list(find_duplicates(root, workers=workers)))
+    print(f"{len(groups)} 组重复文件")
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="文件工具性能基准测试")
+    parser.add_argument("--dirs", type=int, default=200, help="生成的目录数量")
+    parser.add_argument("--files-per-dir", type=int, default=500, help="每个目录的文件数量")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行线程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir) / "tree"
+        total = timed("生成合成目录树", build_tree, root, args.dirs, args.files_per_dir)
+        print(f"共 {total} 个文件, {args.dirs} 个目录")
+
+        bench_list_files(root, args.workers)
+        bench_snapshot(root)
+        bench_disk_usage(root, args.workers)
+        bench_find_duplicates(root, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+哈希性能基准测试。
+
+生成若干随机内容的临时文件，报告不同算法和读取方式的吞吐量 (GB/s)。
+
+使用方法:
+    python benchmarks/bench_hashing.py [--files 8] [--size-mb 64] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from {{cookiecutter.project_slug}}.utils.data_utils import (
+    calculate_hashes,
+    calculate_md5,
+    hash_file,
+    hash_files,
+)
+
+ALGORITHMS = ["md5", "sha256", "blake2b", "xxh64", "xxh3_64"]
+
+
+def report(label: str, nbytes: int, func, *args, **kwargs):
+    """执行函数并打印吞吐量。"""
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except ValueError as e:
+        print(f"{label:<40} 跳过 ({e})")
+        return None
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s {nbytes / elapsed / 1e9:8.2f} GB/s")
+    return result
+
+
+def bench_files(paths, workers: int) -> None:
+    """对比整文件读入、分块读取、mmap和多线程批量哈希。"""
+    total = sum(p.stat().st_size for p in paths)
+    print(f"\n[hash_file] {len(paths)} 个文件, 共 {total / 1e6:.0f} MB")
+
+    report("calculate_md5(read_bytes) (基线)", total,
+           lambda: [calculate_md5(p.read_bytes()) for p in paths])
+    for algorithm in ALGORITHMS:
+        report(f"hash_file {algorithm} 分块读取", total,
+               lambda a=algorithm: [hash_file(p, a, use_mmap=False) for p in paths])
+        report(f"hash_file {algorithm} mmap", total,
+               lambda a=algorithm: [hash_file(p, a, use_mmap=True) for p in paths])
+        report(f"hash_files {algorithm} workers={workers}", total,
+               hash_files, paths, algorithm, workers)
+
+
+def bench_keys(n: int) -> None:
+    """对比逐个调用 calculate_md5 与批量短键哈希。"""
+    keys = [f"user:{i}:session" for i in range(n)]
+    print(f"\n[calculate_hashes] {n} 个短键")
+
+    def per_key(label, func, repeat=3):
+        # 取多次运行的最短耗时，减少调度和内存分配抖动的影响
+        elapsed = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                func()
+            except ValueError as e:
+                print(f"{label:<40} 跳过 ({e})")
+                return None
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(f"{label:<40} {elapsed:8.3f}s {n / elapsed:14,.0f} keys/s")
+        return elapsed
+
+    baseline = per_key("calculate_md5 逐个调用 (基线)", lambda: [calculate_md5(k) for k in keys])
+    # 与基线输出相同（完整的十六进制MD5），批量接口不应比它替代的循环慢
+    batch = per_key("calculate_hashes md5 hex",
+                    lambda: calculate_hashes(keys, "md5", digest_size=None, output="hex"))
+    assert batch <= baseline, f"批量哈希 ({batch:.3f}s) 比逐个调用 ({baseline:.3f}s) 慢"
+    for algorithm in ["blake2b", "md5", "sha256", "xxh64", "xxh3_64"]:
+        per_key(f"calculate_hashes {algorithm}",
+                lambda a=algorithm: calculate_hashes(keys, a, digest_size=8))
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="哈希性能基准测试")
+    parser.add_argument("--files", type=int, default=8, help="文件数量")
+    parser.add_argument("--size-mb", type=int, default=64, help="每个文件的大小 (MB)")
+    parser.add_argument("--keys", type=int, default=1_000_000, help="短键哈希测试的键数量")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行线程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i in range(args.files):
+            path = Path(tmp_dir) / f"file{i}.bin"
+            path.write_bytes(os.urandom(args.size_mb * 1024 * 1024))
+            paths.append(path)
+
+        bench_files(paths, args.workers)
+
+    bench_keys(args.keys)
+
+
+if __name__ == "__main__":
+    main()
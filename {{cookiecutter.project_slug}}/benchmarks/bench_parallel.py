@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+并行执行性能基准测试。
+
+在CPU密集型和I/O密集型负载上，对比普通循环与各并行后端的耗时。
+
+使用方法:
+    python benchmarks/bench_parallel.py [--n 2000] [--workers 8]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from {{cookiecutter.project_slug}}.utils.parallel import imap_unordered, pmap
+
+
+def cpu_task(n: int) -> int:
+    """CPU密集型任务：纯Python整数运算。"""
+    total = 0
+    for i in range(20_000 + n % 7):
+        total += i * i % 7
+    return total
+
+
+def io_task(n: int) -> int:
+    """I/O密集型任务：模拟10毫秒的阻塞等待。"""
+    time.sleep(0.01)
+    return n
+
+
+async def async_io_task(n: int) -> int:
+    """异步I/O任务：模拟10毫秒的非阻塞等待。"""
+    await asyncio.sleep(0.01)
+    return n
+
+
+def timed(label: str, func, *args, **kwargs):
+    """执行函数并打印耗时。"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return result
+
+
+def bench_cpu(n: int, workers: int) -> None:
+    """CPU密集型负载：线程受GIL限制，进程可以线性扩展。"""
+    print("\n[CPU密集型]")
+    items = list(range(n))
+    timed("普通循环 (基线)", lambda: [cpu_task(x) for x in items])
+    timed(f"pmap thread workers={workers}", pmap, cpu_task, items, workers=workers)
+    timed(f"pmap process workers={workers}", pmap, cpu_task, items,
+          backend="process", workers=workers)
+    timed("pmap process chunksize=1", pmap, cpu_task, items,
+          backend="process", workers=workers, chunksize=1)
+
+
+def bench_io(n: int, workers: int) -> None:
+    """I/O密集型负载：并发等待可以重叠。"""
+    print("\n[I/O密集型]")
+    items = list(range(n // 10))
+    timed("普通循环 (基线)", lambda: [io_task(x) for x in items])
+    timed(f"pmap thread workers={workers * 4}", pmap, io_task, items, workers=workers * 4)
+    timed(f"imap_unordered thread workers={workers * 4}",
+          lambda: list(imap_unordered(io_task, items, workers=workers * 4)))
+    timed("pmap asyncio workers=256", pmap, async_io_task, items,
+          backend="asyncio", workers=256)
+
+
+def main():
+    """主函数。"""
+    parser = argparse.ArgumentParser(description="并行执行性能基准测试")
+    parser.add_argument("--n", type=int, default=2000, help="任务数量")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行工作者数量")
+    args = parser.parse_args()
+
+    bench_cpu(args.n, args.workers)
+    bench_io(args.n, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,37 @@
 
 使用方法:
     python scripts/generate_changelog.py [--output CHANGELOG.md] [--since <commit/tag>] [--until <commit/tag>] [--config <config_file>] [--cache-file <cache_file>]
+        [--first-parent] [--path <path> ...] [--max-count <n>] [--all-releases]
+
+    工作区模式（并行为多个仓库或单一仓库中的多个子包生成CHANGELOG）:
+    python scripts/generate_changelog.py --repo <repo_dir> ... --package <package_dir> ... [--jobs <n>]
 """
 
 import argparse
+import contextlib
+import functools
+import io
 import json
+import mmap
 import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
 import yaml
 import traceback
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Set
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Any, Set, Union
+
+try:
+    import jinja2
+except ImportError:  # 可选依赖，仅在配置了模板时需要
+    jinja2 = None
 
 # 日志颜色
 class ColorLog:
@@ -60,43 +77,171 @@ DEFAULT_COMMIT_TYPES = {
     "build": "构建系统",
     "ci": "CI配置",
     "chore": "其他变更",
-    "revert": "回退提交"
+    "revert": "回退提交",
+    "breaking": "破坏性变更"
 }
 
+# 破坏性变更（``type!:`` 或正文中的 ``BREAKING CHANGE:``）使用的分类
+BREAKING_TYPE = "breaking"
+
+# git log输出格式：字段以单元分隔符(0x1f)分隔，记录以记录分隔符(0x1e)结尾
+LOG_FIELD_SEP = "\x1f"
+LOG_RECORD_SEP = "\x1e"
+LOG_FORMAT = "%H%x1f%h%x1f%ad%x1f%an%x1f%s%x1f%b%x1e"
+# 约定式提交标题：type(scope)!: message
+TYPE_PATTERN = re.compile(r"([\w:]+)(?:\(([^)]+)\))?(!)?: (.*)")
+# 提交正文中的破坏性变更说明
+BREAKING_PATTERN = re.compile(r"^BREAKING[ -]CHANGE: *(.*)$", re.MULTILINE)
+# 旧版单行日志格式：hash date message [author]
+COMMIT_LINE_PATTERN = re.compile(r"([a-f0-9]+) (\d{4}-\d{2}-\d{2}) (.*) \[(.*)\]")
+# 流式读取git输出时每次读取的字符数
+STREAM_CHUNK_SIZE = 64 * 1024
+# 更新CHANGELOG时复制现有内容的块大小
+COPY_CHUNK_SIZE = 1024 * 1024
+# 优先显示的提交类型
+PRIORITY_TYPES = [BREAKING_TYPE, 'feat', 'fix', 'perf', 'refactor']
+
 class GitCache:
-    """Git提交缓存，用于加速多次运行。"""
+    """Git提交缓存，用于加速多次运行。
+
+    缓存文件为只追加的JSON Lines：每行一个提交（``hash`` 为第一个字段）。加载时以只读方式mmap
+    文件，只扫描行边界建立 哈希 -> 偏移量 的索引，提交在首次访问时才从映射中读取并解析，文件内容
+    不会整体读入内存；保存时只追加新提交，失效行过多或需要
+    迁移旧格式时通过临时文件原子地整体重写。元数据（如版本归属）保存在旁边的
+    ``<cache_file>.meta`` 文件中，只在变化时整体覆盖。
+    """
+
+    # 提交行的固定前缀，用于不解析JSON直接提取哈希
+    ENTRY_PREFIX = b'{"hash":"'
+    # 失效行（被覆盖的提交和旧版元数据行）超过该数量加上有效条目数一半时压缩文件
+    COMPACT_SLACK = 100
 
     def __init__(self, cache_file: Optional[str] = None):
         self.cache_file = cache_file
+        self.meta_file = f"{cache_file}.meta" if cache_file else None
         self.commit_cache: Dict[str, Dict[str, Any]] = {}
         self.processed_commits: Set[str] = set()
         self.cache_loaded = False
+        self.meta: Dict[str, Any] = {}
+        # 缓存文件的只读映射（文件为空或不存在时为空字节串），以及 哈希 -> (偏移量, 长度) 索引
+        self._data: Union[bytes, mmap.mmap] = b""
+        self._index: Dict[str, Tuple[int, int]] = {}
+        # 尚未写入文件的提交（用字典保持插入顺序）
+        self._new_commits: Dict[str, None] = {}
+        self._meta_dirty = False
+        self._stale_lines = 0
+        self._needs_rewrite = False
 
         if cache_file and os.path.exists(cache_file):
             self._load_cache()
+        if self.meta_file and os.path.exists(self.meta_file):
+            self._load_meta()
 
     def _load_cache(self) -> None:
-        """从缓存文件加载缓存。"""
+        """映射缓存文件并扫描行边界，建立哈希索引。"""
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
-            if 'commits' in cache_data and isinstance(cache_data['commits'], dict):
-                self.commit_cache = cache_data['commits']
-                self.cache_loaded = True
-                ColorLog.info(f"已从 {self.cache_file} 加载 {len(self.commit_cache)} 条提交缓存")
-            else:
-                ColorLog.warning(f"缓存文件格式无效: {self.cache_file}")
+            with open(self.cache_file, 'rb') as f:
+                head = f.read(len(b'{"last_updated"'))
+                if head.startswith(b"{\n") or head.startswith(b'{"last_updated"'):
+                    # 旧版整体JSON格式只能一次性解析
+                    f.seek(0)
+                    self._load_legacy(f.read())
+                    return
+
+            self._map()
+            self._index_lines(0)
+            self.cache_loaded = True
+            ColorLog.info(f"已从 {self.cache_file} 索引 {len(self._index)} 条提交缓存")
         except Exception as e:
             ColorLog.warning(f"加载缓存失败: {e}")
+            self._unmap()
+            self._index.clear()
+            self._needs_rewrite = True
+
+    def _map(self) -> None:
+        """以只读方式重新映射缓存文件，文件为空时使用空字节串（mmap不支持空文件）。"""
+        self._unmap()
+        if not self.cache_file:
+            return
+        with open(self.cache_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self) -> None:
+        """释放缓存文件的映射。"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+
+    def _load_meta(self) -> None:
+        """加载元数据文件。"""
+        try:
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                self.meta.update(json.load(f))
+        except Exception as e:
+            ColorLog.warning(f"加载缓存元数据失败: {e}")
+
+    def _load_legacy(self, data: bytes) -> None:
+        """加载旧版整体JSON格式的缓存，下次保存时迁移为JSON Lines。"""
+        cache_data = json.loads(data)
+        if 'commits' in cache_data and isinstance(cache_data['commits'], dict):
+            self.commit_cache = cache_data['commits']
+            self._new_commits = dict.fromkeys(self.commit_cache)
+            self._needs_rewrite = True
+            self.cache_loaded = True
+            ColorLog.info(f"已从旧格式缓存 {self.cache_file} 加载 {len(self.commit_cache)} 条提交，保存时将迁移")
+        else:
+            ColorLog.warning(f"缓存文件格式无效: {self.cache_file}")
+
+    def _index_lines(self, pos: int) -> None:
+        """从指定偏移量开始扫描行边界，为提交行建立索引并读取元数据行。"""
+        data = self._data
+        prefix = self.ENTRY_PREFIX
+        start = len(prefix)
+        size = len(data)
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end == -1:
+                # 最后一行不完整（写入被中断），忽略并在下次保存时重写
+                self._needs_rewrite = True
+                break
+            if data[pos:pos + start] == prefix:
+                hash_end = data.find(b'"', pos + start)
+                commit_hash = data[pos + start:hash_end].decode("ascii")
+                if commit_hash in self._index:
+                    self._stale_lines += 1
+                self._index[commit_hash] = (pos, end - pos)
+            elif end > pos:
+                # 旧版写在缓存文件中的元数据行，下次保存时迁移到元数据文件
+                self._stale_lines += 1
+                self._needs_rewrite = True
+                self._meta_dirty = True
+                self.meta.update(json.loads(data[pos:end]).get("_meta", {}))
+            pos = end + 1
+
+    def __len__(self) -> int:
+        return len(self._index) + sum(1 for h in self._new_commits if h not in self._index)
+
+    def __contains__(self, commit_hash: str) -> bool:
+        return commit_hash in self.commit_cache or commit_hash in self._index
 
     def get_commit(self, commit_hash: str) -> Optional[Dict[str, Any]]:
-        """从缓存获取提交信息。"""
-        return self.commit_cache.get(commit_hash)
+        """从缓存获取提交信息，首次访问时才解析对应的行。"""
+        commit = self.commit_cache.get(commit_hash)
+        if commit is None and commit_hash in self._index:
+            offset, length = self._index[commit_hash]
+            commit = json.loads(self._data[offset:offset + length])
+            self.commit_cache[commit_hash] = commit
+        return commit
 
     def add_commit(self, commit_hash: str, commit_data: Dict[str, Any]) -> None:
         """添加提交到缓存。"""
+        if commit_hash in self._index:
+            # 覆盖已有条目，旧行在压缩时清除
+            del self._index[commit_hash]
+            self._stale_lines += 1
         self.commit_cache[commit_hash] = commit_data
+        self._new_commits[commit_hash] = None
         self.processed_commits.add(commit_hash)
 
     def is_processed(self, commit_hash: str) -> bool:
@@ -107,24 +252,87 @@ class GitCache:
         """标记提交为已处理。"""
         self.processed_commits.add(commit_hash)
 
+    def set_meta(self, key: str, value: Any) -> None:
+        """设置随缓存保存的元数据，例如版本归属 ``releases``。"""
+        if self.meta.get(key) != value:
+            self.meta[key] = value
+            self._meta_dirty = True
+
+    def _entry_line(self, commit_hash: str) -> bytes:
+        commit = {k: v for k, v in self.commit_cache[commit_hash].items() if k != "hash"}
+        # 保证hash为第一个字段，加载时无需解析JSON即可建立索引
+        return json.dumps({"hash": commit_hash, **commit}, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8") + b"\n"
+
     def save_cache(self) -> None:
-        """保存缓存到文件。"""
+        """保存缓存到文件：通常只追加新提交，必要时原子地压缩重写；元数据只在变化时覆盖。"""
         if not self.cache_file:
             return
+        if not self._new_commits and not self._meta_dirty and not self._needs_rewrite:
+            return
 
         try:
-            cache_data = {
-                "last_updated": datetime.now().isoformat(),
-                "commits": self.commit_cache
-            }
-
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-
-            ColorLog.success(f"已保存 {len(self.commit_cache)} 条提交缓存到 {self.cache_file}")
+            new_lines = b"".join(self._entry_line(h) for h in self._new_commits)
+            if self._needs_rewrite or self._stale_lines > self.COMPACT_SLACK + len(self) // 2:
+                self._rewrite(new_lines)
+                ColorLog.success(f"已压缩并保存 {len(self)} 条提交缓存到 {self.cache_file}")
+            elif new_lines:
+                self._append(new_lines)
+                ColorLog.success(f"已追加 {len(self._new_commits)} 条提交缓存到 {self.cache_file}")
+            self._new_commits.clear()
+            if self._meta_dirty:
+                Path(self.meta_file).parent.mkdir(parents=True, exist_ok=True)
+                with atomic_write(self.meta_file) as f:
+                    json.dump(dict(self.meta, last_updated=datetime.now().isoformat()), f,
+                              ensure_ascii=False)
+                self._meta_dirty = False
         except Exception as e:
             ColorLog.warning(f"保存缓存失败: {e}")
 
+    def _append(self, new_lines: bytes) -> None:
+        """以单次写入追加新提交，中断时最多留下一个不完整的尾行。"""
+        cache_path = Path(self.cache_file)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'ab') as f:
+            f.write(new_lines)
+            f.flush()
+            os.fsync(f.fileno())
+        # 重新映射后只扫描新追加的部分
+        start = len(self._data)
+        self._map()
+        self._index_lines(start)
+
+    def _rewrite(self, new_lines: bytes) -> None:
+        """把所有有效条目写入临时文件，再用os.replace原子地替换缓存文件。"""
+        cache_path = Path(self.cache_file)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                # 未解析的条目直接从映射中复制原始字节
+                data = self._data
+                for commit_hash, (offset, length) in self._index.items():
+                    if commit_hash not in self._new_commits:
+                        f.write(data[offset:offset + length + 1])
+                f.write(new_lines)
+                f.flush()
+                os.fsync(f.fileno())
+            # Windows上无法替换仍被映射的文件；替换失败时重新映射原文件
+            self._unmap()
+            try:
+                os.replace(tmp_path, cache_path)
+            finally:
+                self._map()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._index = {}
+        self._stale_lines = 0
+        self._needs_rewrite = False
+        self._index_lines(0)
+
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """从配置文件加载配置。
 
@@ -216,6 +424,21 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         if 'header' in custom_config:
             config['header'] = custom_config['header']
 
+        if 'template' in custom_config:
+            config['template'] = custom_config['template']
+
+        if 'scope_aliases' in custom_config:
+            if isinstance(custom_config['scope_aliases'], dict):
+                config['scope_aliases'] = custom_config['scope_aliases']
+            else:
+                ColorLog.error(f"scope_aliases 应为字典格式，但得到了 {type(custom_config['scope_aliases']).__name__}")
+
+        if 'rules' in custom_config:
+            if isinstance(custom_config['rules'], list):
+                config['rules'] = custom_config['rules']
+            else:
+                ColorLog.error(f"rules 应为列表格式，但得到了 {type(custom_config['rules']).__name__}")
+
         ColorLog.success(f"已成功加载配置: {config_path}")
         return config
     except Exception as e:
@@ -224,66 +447,217 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         ColorLog.info("使用内置默认配置")
         return config
 
-def get_git_log(since: Optional[str] = None, until: Optional[str] = None, cache: Optional[GitCache] = None) -> List[Dict[str, Any]]:
-    """获取git日志。
+def parse_subject(message: str) -> Tuple[str, str, bool, str]:
+    """解析约定式提交的标题。
 
     Args:
-        since: 起始提交或标签
-        until: 结束提交或标签
-        cache: 可选的Git缓存对象
+        message: 提交标题
 
     Returns:
-        List[Dict[str, Any]]: git提交信息列表
+        Tuple[str, str, bool, str]: (类型, 作用域, 是否带 ``!`` 破坏性标记, 描述)
     """
-    # 首先获取提交哈希列表
-    cmd = ["git", "log", "--pretty=format:%H", "--date=short"]
+    type_match = TYPE_PATTERN.match(message)
+    if not type_match:
+        return "", "", False, message
+    commit_type, scope, bang, msg = type_match.groups()
+    return commit_type.lower(), scope or "", bool(bang), msg
 
-    if since:
-        cmd.append(f"{since}...")
+def build_commit(commit_hash: str, short_hash: str, date: str, author: str, message: str,
+                 body: str = "") -> Dict[str, Any]:
+    """根据git log的字段构造提交信息字典。
 
-    if until:
-        cmd.append(f"...{until}")
+    正文不保存到提交信息中，只提取其中的 ``BREAKING CHANGE:`` 说明。
 
-    try:
-        git_hashes = subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.PIPE)
-        commit_hashes = git_hashes.splitlines() if git_hashes else []
+    Args:
+        commit_hash: 完整哈希值
+        short_hash: 短哈希值
+        date: 提交日期
+        author: 作者
+        message: 提交标题
+        body: 提交正文
 
-        if not commit_hashes:
-            return []
+    Returns:
+        Dict[str, Any]: 提交信息字典
+    """
+    commit_type, scope, breaking, msg = parse_subject(message)
+    breaking_note = ""
+    if body:
+        note_match = BREAKING_PATTERN.search(body)
+        if note_match:
+            breaking = True
+            breaking_note = note_match.group(1).strip()
+
+    return {
+        "hash": commit_hash,
+        "short_hash": short_hash,
+        "date": date,
+        "message": message,
+        "author": author,
+        "type": commit_type,
+        "scope": scope,
+        "title": msg,
+        "breaking": breaking,
+        "breaking_note": breaking_note
+    }
 
-        ColorLog.info(f"找到 {len(commit_hashes)} 个提交")
+def stream_git_records(cmd: List[str], separator: str, stdin_data: Optional[str] = None) -> Iterator[str]:
+    """执行git命令，按分隔符流式切分标准输出。
+
+    输出通过Popen按块读取，内存占用与单条记录大小相关，而不是与输出总量相关。
+    标准错误写入临时文件，git输出大量警告时也不会因管道写满而阻塞。
+
+    Args:
+        cmd: 完整的git命令
+        separator: 记录分隔符
+        stdin_data: 写入标准输入的内容，配合 --stdin 使用
 
-        commits = []
-        new_commits = 0
+    Yields:
+        str: 单条记录（不含分隔符）
 
-        # 如果有缓存，从缓存中获取已有提交信息
-        for commit_hash in commit_hashes:
-            if cache and not cache.is_processed(commit_hash):
-                cached_commit = cache.get_commit(commit_hash)
-                if cached_commit:
-                    commits.append(cached_commit)
-                    cache.mark_processed(commit_hash)
+    Raises:
+        subprocess.CalledProcessError: git执行失败
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            encoding="utf-8",
+            errors="replace",
+        )
+        try:
+            if stdin_data is not None:
+                # git log/rev-list --stdin 会先读完全部输入再开始输出，因此可以先写后读
+                process.stdin.write(stdin_data)
+                process.stdin.close()
+
+            # 当前记录尚未结束的片段，记录结束时才拼接，避免每个块都复制已读取的部分
+            parts: List[str] = []
+            overlap = len(separator) - 1
+            while True:
+                chunk = process.stdout.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if parts and overlap:
+                    # 分隔符可能跨越两个块：把上一个片段末尾的几个字符移到本块开头
+                    last = parts.pop()
+                    parts.append(last[:-overlap])
+                    chunk = last[-overlap:] + chunk
+                records = chunk.split(separator)
+                if len(records) == 1:
+                    parts.append(chunk)
                     continue
+                parts.append(records[0])
+                yield "".join(parts)
+                yield from records[1:-1]
+                parts = [records[-1]]
+            last_record = "".join(parts)
+            if last_record:
+                yield last_record
+
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode("utf-8", errors="replace")
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+def stream_git_log(args: List[str], stdin_data: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """执行一次git log并以流式方式逐条解析提交。
 
-                # 获取单个提交的详细信息
-                commit_info = get_commit_details(commit_hash)
-                if commit_info:
-                    commits.append(commit_info)
-                    cache.add_commit(commit_hash, commit_info)
-                    new_commits += 1
-            else:
-                # 没有缓存或提交未处理，获取详细信息
-                commit_info = get_commit_details(commit_hash)
-                if commit_info:
-                    commits.append(commit_info)
-                    if cache:
-                        cache.add_commit(commit_hash, commit_info)
-                    new_commits += 1
+    Args:
+        args: git log的附加参数（修订范围等）
+        stdin_data: 写入标准输入的内容，配合 --stdin 使用
+
+    Yields:
+        Dict[str, Any]: 提交信息字典
+
+    Raises:
+        subprocess.CalledProcessError: git执行失败
+    """
+    cmd = ["git", "log", f"--format={LOG_FORMAT}", "--date=short"] + args
+    for record in stream_git_records(cmd, LOG_RECORD_SEP, stdin_data):
+        fields = record.lstrip("\n").split(LOG_FIELD_SEP)
+        if len(fields) == 6:
+            yield build_commit(*fields)
+
+def build_revision_args(since: Optional[str] = None,
+                        until: Optional[str] = None,
+                        first_parent: bool = False,
+                        paths: Optional[List[str]] = None,
+                        max_count: Optional[int] = None) -> List[str]:
+    """构造git log/rev-list的修订范围和过滤参数。
+
+    ``since..until`` 只包含从until可达、但从since不可达的提交，即since之后的新提交。
+
+    Args:
+        since: 起始提交或标签（不包含）
+        until: 结束提交或标签（包含），默认为HEAD
+        first_parent: 是否只沿第一父提交遍历，跳过合并进来的分支内部提交
+        paths: 只包含修改了这些路径的提交
+        max_count: 最多返回的提交数量
+
+    Returns:
+        List[str]: git参数列表
+    """
+    args = []
+    if first_parent:
+        args.append("--first-parent")
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    end = until or "HEAD"
+    args.append(f"{since}..{end}" if since else end)
+    if paths:
+        args.append("--")
+        args.extend(paths)
+    return args
+
+def get_git_log(since: Optional[str] = None,
+                until: Optional[str] = None,
+                cache: Optional[GitCache] = None,
+                first_parent: bool = False,
+                paths: Optional[List[str]] = None,
+                max_count: Optional[int] = None) -> List[Dict[str, Any]]:
+    """获取git日志。
+
+    所有提交信息通过一次 ``git log`` 调用获取。使用缓存时先用 ``git rev-list`` 列出哈希，
+    只为缓存中没有的提交调用 ``git log --no-walk --stdin``。
+
+    Args:
+        since: 起始提交或标签（不包含）
+        until: 结束提交或标签（包含）
+        cache: 可选的Git缓存对象
+        first_parent: 是否只沿第一父提交遍历
+        paths: 只包含修改了这些路径的提交
+        max_count: 最多返回的提交数量
+
+    Returns:
+        List[Dict[str, Any]]: git提交信息列表
+    """
+    revisions = build_revision_args(since, until, first_parent, paths, max_count)
 
-        if cache:
-            ColorLog.info(f"处理了 {new_commits} 个新提交，{len(commits) - new_commits} 个从缓存加载")
+    cmd = ["git", "log"] + revisions
+    try:
+        if cache is None:
+            commits = list(stream_git_log(revisions))
+            if commits:
+                ColorLog.info(f"找到 {len(commits)} 个提交")
+            return commits
 
-        return commits
+        # 首先获取提交哈希列表
+        cmd = ["git", "rev-list"] + revisions
+        commit_hashes = [h for h in stream_git_records(cmd, "\n") if h]
+
+        if not commit_hashes:
+            return []
+
+        ColorLog.info(f"找到 {len(commit_hashes)} 个提交")
+
+        cmd = ["git", "log", "--no-walk=unsorted", "--stdin"]
+        return fetch_commits(commit_hashes, cache)
 
     except subprocess.CalledProcessError as e:
         ColorLog.error(f"获取git日志失败: {e}")
@@ -291,9 +665,40 @@ def get_git_log(since: Optional[str] = None, until: Optional[str] = None, cache:
         ColorLog.error(f"错误输出: {e.stderr if e.stderr else '无'}")
         return []
 
+def fetch_commits(commit_hashes: List[str], cache: GitCache) -> List[Dict[str, Any]]:
+    """按给定顺序获取提交信息，缓存中没有的提交通过一次 ``git log --no-walk --stdin`` 获取。
+
+    Args:
+        commit_hashes: 提交哈希列表
+        cache: Git缓存对象，新获取的提交会加入缓存
+
+    Returns:
+        List[Dict[str, Any]]: 提交信息列表
+
+    Raises:
+        subprocess.CalledProcessError: git执行失败
+    """
+    missing = [h for h in commit_hashes if cache.get_commit(h) is None]
+    if missing:
+        for commit_info in stream_git_log(["--no-walk=unsorted", "--stdin"], "\n".join(missing) + "\n"):
+            cache.add_commit(commit_info["hash"], commit_info)
+
+    commits = []
+    for commit_hash in commit_hashes:
+        commit_info = cache.get_commit(commit_hash)
+        if commit_info:
+            commits.append(commit_info)
+            cache.mark_processed(commit_hash)
+
+    ColorLog.info(f"处理了 {len(missing)} 个新提交，{len(commits) - len(missing)} 个从缓存加载")
+
+    return commits
+
 def get_commit_details(commit_hash: str) -> Optional[Dict[str, Any]]:
     """获取单个提交的详细信息。
 
+    批量获取请使用 :func:`get_git_log`，它只启动一个git进程。
+
     Args:
         commit_hash: 提交哈希值
 
@@ -301,34 +706,7 @@ def get_commit_details(commit_hash: str) -> Optional[Dict[str, Any]]:
         Optional[Dict[str, Any]]: 提交信息字典或None
     """
     try:
-        # 获取提交详情
-        cmd = ["git", "show", "-s", "--format=%h %ad %s %an", "--date=short", commit_hash]
-        commit_data = subprocess.check_output(cmd, universal_newlines=True).strip()
-
-        # 解析提交数据
-        match = re.match(r"([a-f0-9]+) (\d{4}-\d{2}-\d{2}) (.*) (.*)", commit_data)
-        if not match:
-            return None
-
-        short_hash, date, message, author = match.groups()
-
-        # 解析类型和作用域
-        type_match = re.match(r"([\w:]+)(?:\(([^)]+)\))?: (.*)", message)
-        if type_match:
-            commit_type, scope, msg = type_match.groups()
-        else:
-            commit_type, scope, msg = "", "", message
-
-        return {
-            "hash": commit_hash,
-            "short_hash": short_hash,
-            "date": date,
-            "message": message,
-            "author": author,
-            "type": commit_type.lower() if commit_type else "",
-            "scope": scope or "",
-            "title": msg
-        }
+        return next(stream_git_log(["--no-walk", commit_hash]), None)
     except subprocess.CalledProcessError:
         return None
 
@@ -364,6 +742,150 @@ def get_version_from_tag(tag: str) -> str:
         return tag[1:]
     return tag
 
+def list_tags() -> List[Tuple[str, str, str]]:
+    """列出所有指向提交的标签。
+
+    Returns:
+        List[Tuple[str, str, str]]: (标签名, 提交哈希, 日期) 列表，按创建时间从新到旧排列
+    """
+    sep = LOG_FIELD_SEP
+    fmt = sep.join(["%(refname:short)", "%(objecttype)", "%(objectname)",
+                    "%(*objecttype)", "%(*objectname)", "%(creatordate:short)"])
+    cmd = ["git", "for-each-ref", "--sort=-creatordate", f"--format={fmt}", "refs/tags"]
+    tags = []
+    for line in stream_git_records(cmd, "\n"):
+        fields = line.split(sep)
+        if len(fields) != 6:
+            continue
+        name, obj_type, obj, peeled_type, peeled, date = fields
+        # 附注标签需要解引用到它指向的对象
+        if peeled_type:
+            obj_type, obj = peeled_type, peeled
+        if obj_type == "commit":
+            tags.append((name, obj, date))
+    return tags
+
+def walk_releases(revisions: List[str],
+                  tag_of: Dict[str, str],
+                  first_parent: bool = False) -> Tuple[List[Optional[str]], Dict[Optional[str], List[str]]]:
+    """一次拓扑序遍历历史，把每个提交归入包含它的最早标签。
+
+    ``git rev-list --topo-order`` 保证子提交先于父提交输出，因此遍历到某个提交时，
+    所有子提交的标签都已确定：带标签的提交使用自己的标签，其余提交继承子提交中最早的标签。
+    后遇到的标签是更早的版本；不被任何标签包含的提交归入 ``None``（未发布）。
+
+    Args:
+        revisions: 遍历的起点和 ``^排除`` 提交，通过标准输入传给git
+        tag_of: 提交哈希 -> 标签名
+        first_parent: 是否只沿第一父提交传播
+
+    Returns:
+        Tuple[List[Optional[str]], Dict[Optional[str], List[str]]]:
+            (从新到旧遇到的标签, 标签 -> 提交哈希列表)
+
+    Raises:
+        subprocess.CalledProcessError: git执行失败
+    """
+    cmd = ["git", "rev-list", "--topo-order", "--parents", "--stdin"]
+    if first_parent:
+        cmd.append("--first-parent")
+
+    rank: Dict[Optional[str], int] = {None: -1}
+    order: List[Optional[str]] = []
+    buckets: Dict[Optional[str], List[str]] = defaultdict(list)
+    # 尚未遍历到的提交 -> 子提交中最早的标签
+    pending: Dict[str, Optional[str]] = {}
+    for line in stream_git_records(cmd, "\n", "\n".join(revisions) + "\n"):
+        if not line:
+            continue
+        commit_hash, *parents = line.split()
+        inherited = pending.pop(commit_hash, None)
+        label = tag_of.get(commit_hash, inherited)
+        if label not in rank:
+            rank[label] = len(rank)
+        if label not in buckets:
+            order.append(label)
+        buckets[label].append(commit_hash)
+
+        for parent in parents[:1] if first_parent else parents:
+            current = pending.get(parent)
+            if parent not in pending or rank[label] > rank[current]:
+                pending[parent] = label
+
+    return order, buckets
+
+def get_releases(cache: Optional[GitCache] = None,
+                 first_parent: bool = False,
+                 paths: Optional[List[str]] = None) -> List[Tuple[Optional[str], str, List[Dict[str, Any]]]]:
+    """获取所有版本及其包含的提交，只遍历一次历史。
+
+    标签的提交归属保存在缓存元数据 ``releases`` 中。再次运行时，如果已知标签都未移动，
+    只遍历新标签和HEAD中不被已知标签包含的部分（``^已知标签``）；否则重新完整遍历。
+    指定 ``paths`` 时版本归属仍基于完整历史确定（标签所在的提交不一定修改了这些路径），
+    再只保留修改了这些路径的提交。
+
+    Args:
+        cache: 可选的Git缓存对象
+        first_parent: 是否只沿第一父提交遍历
+        paths: 只包含修改了这些路径的提交
+
+    Returns:
+        List[Tuple[Optional[str], str, List[Dict[str, Any]]]]:
+            从新到旧的 (标签名, 日期, 提交列表)，未发布的提交标签名为None
+    """
+    cache = cache if cache is not None else GitCache()
+    tags = list_tags()
+    tag_of: Dict[str, str] = {}
+    for name, commit_hash, _ in tags:
+        # 同一提交上有多个标签时使用最新创建的标签
+        tag_of.setdefault(commit_hash, name)
+    tag_info = {name: (commit_hash, date) for name, commit_hash, date in tags}
+
+    # 复用缓存中的标签归属：要求遍历选项相同，且所有已知标签都存在并指向原提交
+    cached = cache.meta.get("releases")
+    known: List[Dict[str, Any]] = []
+    if (isinstance(cached, dict) and cached.get("first_parent") == first_parent
+            and all(tag_info.get(r["tag"], (None,))[0] == r["commit"] for r in cached["tags"])):
+        known = [r for r in cached["tags"] if tag_of.get(r["commit"]) == r["tag"]]
+    known_tags = {r["tag"] for r in known}
+
+    new_tags = [(name, commit_hash) for commit_hash, name in tag_of.items() if name not in known_tags]
+    revisions = ["HEAD"] + [commit_hash for _, commit_hash in new_tags]
+    revisions += [f"^{r['commit']}" for r in known]
+    order, buckets = walk_releases(revisions, tag_of, first_parent)
+
+    # 新标签位于已遍历过的历史中时，增量结果不完整，需要完整遍历
+    if known and any(name not in buckets for name, _ in new_tags):
+        ColorLog.info("发现位于已知版本历史中的新标签，重新遍历完整历史")
+        known = []
+        revisions = ["HEAD"] + list(tag_of)
+        order, buckets = walk_releases(revisions, tag_of, first_parent)
+    ColorLog.info(f"遍历了 {sum(len(b) for b in buckets.values())} 个提交，"
+                  f"{len(known)} 个版本从缓存加载")
+
+    sections = [(label, buckets[label]) for label in order]
+    sections += [(r["tag"], r["commits"]) for r in known]
+    cache.set_meta("releases", {
+        "first_parent": first_parent,
+        "tags": [{"tag": label, "commit": tag_info[label][0], "commits": hashes}
+                 for label, hashes in sections if label is not None],
+    })
+
+    if paths:
+        cmd = ["git", "rev-list", "--stdin"]
+        if first_parent:
+            cmd.append("--first-parent")
+        cmd += ["--"] + paths
+        touched = set(stream_git_records(cmd, "\n", "\n".join(["HEAD"] + list(tag_of)) + "\n"))
+        sections = [(label, [h for h in hashes if h in touched]) for label, hashes in sections]
+
+    all_commits = fetch_commits([h for _, hashes in sections for h in hashes], cache)
+    by_hash = {commit["hash"]: commit for commit in all_commits}
+    today = datetime.now().strftime("%Y-%m-%d")
+    return [(label, tag_info[label][1] if label else today,
+             [by_hash[h] for h in hashes if h in by_hash])
+            for label, hashes in sections]
+
 def parse_commit(commit_line: str) -> Tuple[str, str, str, str, str]:
     """解析提交行。
 
@@ -374,46 +896,186 @@ def parse_commit(commit_line: str) -> Tuple[str, str, str, str, str]:
         Tuple[str, str, str, str, str]: (hash, date, type, scope, message)
     """
     # 解析hash和日期
-    match = re.match(r"([a-f0-9]+) (\d{4}-\d{2}-\d{2}) (.*) \[(.*)\]", commit_line)
+    match = COMMIT_LINE_PATTERN.match(commit_line)
     if not match:
         return "", "", "", "", commit_line
 
     commit_hash, date, message, author = match.groups()
 
     # 解析类型和作用域
-    type_match = re.match(r"([\w:]+)(?:\(([^)]+)\))?: (.*)", message)
-    if type_match:
-        commit_type, scope, msg = type_match.groups()
-    else:
-        commit_type, scope, msg = "", "", message
+    commit_type, scope, _, msg = parse_subject(message)
+    return commit_hash, date, commit_type, scope, msg
+
+class CommitClassifier:
+    """根据配置构建一次、可重复使用的提交分类器。
+
+    分类顺序：自定义规则（按配置顺序，第一个匹配的生效）、破坏性变更、约定式提交类型；
+    未知类型归入 ``default_type``。作用域别名在分类时统一为规范名称。
+
+    Args:
+        config: 配置信息，使用其中的 ``commit_types``、``default_type``、
+            ``scope_aliases``（别名 -> 规范作用域）和 ``rules``（``pattern``/``type`` 列表）
+    """
 
-    return commit_hash, date, commit_type.lower(), scope or "", msg
+    def __init__(self, config: Dict[str, Any]):
+        self.commit_types = config.get('commit_types', DEFAULT_COMMIT_TYPES)
+        self.default_type = config.get('default_type', 'chore')
+        self.scope_aliases = {alias.lower(): scope
+                              for alias, scope in (config.get('scope_aliases') or {}).items()}
+        self.rules: List[Tuple[re.Pattern, str]] = []
+        for rule in config.get('rules') or []:
+            try:
+                self.rules.append((re.compile(rule['pattern']), rule['type']))
+            except (KeyError, TypeError, re.error) as e:
+                ColorLog.warning(f"忽略无效的分类规则 {rule!r}: {e}")
+
+    def classify(self, commit: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """对单个提交分类。
+
+        Args:
+            commit: 提交信息
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: (分类, 提交信息)；作用域被替换为规范名称时返回副本
+        """
+        if "breaking" not in commit:
+            # 旧版缓存中的提交没有破坏性标记，从标题重新解析
+            commit_type, scope, breaking, title = parse_subject(commit.get("message", ""))
+            commit = dict(commit, type=commit_type, scope=scope, breaking=breaking, title=title)
+
+        message = commit.get("message", "")
+        for pattern, rule_type in self.rules:
+            if pattern.search(message):
+                commit_type = rule_type
+                break
+        else:
+            if commit.get("breaking"):
+                commit_type = BREAKING_TYPE
+            else:
+                commit_type = commit.get("type") or self.default_type
+                if commit_type not in self.commit_types:
+                    commit_type = self.default_type
+
+        scope = commit.get("scope")
+        if scope and self.scope_aliases:
+            canonical = self.scope_aliases.get(scope.lower())
+            if canonical is not None and canonical != scope:
+                commit = dict(commit, scope=canonical)
+        return commit_type, commit
+
+    def classify_batch(self, commits: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """批量分类提交。
+
+        Args:
+            commits: 提交信息列表
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 分类 -> 提交列表
+        """
+        categorized = defaultdict(list)
+        classify = self.classify
+        for commit in commits:
+            commit_type, commit = classify(commit)
+            categorized[commit_type].append(commit)
+        return categorized
 
-def categorize_commits(commits: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+def categorize_commits(commits: List[Dict[str, Any]], config: Dict[str, Any],
+                       classifier: Optional[CommitClassifier] = None) -> Dict[str, List[Dict[str, Any]]]:
     """将提交信息按类型分类。
 
     Args:
         commits: 提交信息列表
         config: 配置信息，包含提交类型映射
+        classifier: 已构建的分类器，多次分类时传入以避免重复编译规则
 
     Returns:
         Dict[str, List]: 按类型分类的提交信息
     """
-    categorized = defaultdict(list)
-    commit_types = config.get('commit_types', DEFAULT_COMMIT_TYPES)
-    default_type = config.get('default_type', 'chore')
+    if classifier is None:
+        classifier = CommitClassifier(config)
+    return classifier.classify_batch(commits)
 
-    for commit in commits:
-        commit_type = commit.get("type", "")
-        if not commit_type:
-            commit_type = default_type
+def order_commit_types(categorized_commits: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    """确定提交类型的显示顺序：重要的更改类型（新功能、修复等）排在前面，其余保持原顺序。
 
-        if commit_type in commit_types:
-            categorized[commit_type].append(commit)
-        else:
-            categorized[default_type].append(commit)
+    Args:
+        categorized_commits: 分类后的提交信息
+
+    Returns:
+        List[str]: 非空的提交类型列表
+    """
+    ordered_types = [t for t in PRIORITY_TYPES if categorized_commits.get(t)]
+    ordered_types += [t for t, commits in categorized_commits.items()
+                      if commits and t not in ordered_types]
+    return ordered_types
+
+@functools.lru_cache(maxsize=None)
+def _compile_template(template_path: str, mtime_ns: int) -> Any:
+    """读取并编译Jinja2模板，修改时间是缓存键的一部分，模板修改后会重新编译。
+
+    失败时抛出异常，lru_cache不会缓存异常，下次调用会重试。
+    """
+    source = Path(template_path).read_text(encoding="utf-8")
+    return jinja2.Environment(keep_trailing_newline=True).from_string(source)
+
+def load_template(template_path: str) -> Optional[Any]:
+    """加载并编译Jinja2模板，同一模板未修改时只编译一次。
+
+    只缓存编译成功的模板；未安装jinja2或加载失败时输出警告并返回None，问题解决后的调用会重新加载。
+
+    Args:
+        template_path: 模板文件路径
+
+    Returns:
+        Optional[Any]: 编译后的模板；未安装jinja2或加载失败时返回None
+    """
+    if jinja2 is None:
+        ColorLog.warning("未安装jinja2（pdm install -G changelog），忽略模板配置并使用内置格式")
+        return None
+    try:
+        return _compile_template(template_path, os.stat(template_path).st_mtime_ns)
+    except Exception as e:
+        ColorLog.error(f"加载模板失败: {e}")
+        ColorLog.info("使用内置格式")
+        return None
 
-    return categorized
+def write_markdown(out: TextIO, categorized_commits: Dict, version: str, date: str,
+                   config: Dict[str, Any]) -> None:
+    """把一个版本的变更日志写入文本流。
+
+    配置了 ``template`` 时使用Jinja2模板渲染，模板中可以使用 ``version``、``date`` 和
+    ``sections``（每项包含 ``type``、``title`` 和 ``commits``）；否则使用内置格式逐行写入。
+
+    Args:
+        out: 可写的文本流
+        categorized_commits: 分类后的提交信息
+        version: 版本号
+        date: 发布日期
+        config: 配置信息，包含提交类型映射和可选的模板路径
+    """
+    commit_types = config.get('commit_types', DEFAULT_COMMIT_TYPES)
+    ordered_types = order_commit_types(categorized_commits)
+    titles = {t: commit_types.get(t) or DEFAULT_COMMIT_TYPES.get(t, "其他变更") for t in ordered_types}
+
+    template = load_template(config['template']) if config.get('template') else None
+    if template is not None:
+        sections = [{"type": t, "title": titles[t],
+                     "commits": categorized_commits[t]} for t in ordered_types]
+        out.write(template.render(version=version, date=date, sections=sections))
+        return
+
+    write = out.write
+    write(f"## {version} ({date})\n\n")
+    for commit_type in ordered_types:
+        write(f"### {titles[commit_type]}\n\n")
+        for commit in categorized_commits[commit_type]:
+            scope = commit.get("scope", "")
+            message = commit.get("title", commit.get("message", ""))
+            scope_text = f"**{scope}:** " if scope else ""
+            write(f"* {scope_text}{message} ({commit.get('short_hash', '')})\n")
+            if commit.get("breaking_note"):
+                write(f"  {commit['breaking_note']}\n")
+        write("\n")
 
 def generate_markdown(categorized_commits: Dict, version: str, date: str, config: Dict[str, Any]) -> str:
     """生成Markdown格式的变更日志。
@@ -427,85 +1089,281 @@ def generate_markdown(categorized_commits: Dict, version: str, date: str, config
     Returns:
         str: Markdown格式的变更日志
     """
-    commit_types = config.get('commit_types', DEFAULT_COMMIT_TYPES)
-    markdown = f"## {version} ({date})\n\n"
+    buffer = io.StringIO()
+    write_markdown(buffer, categorized_commits, version, date, config)
+    return buffer.getvalue()
 
-    # 按照特定顺序显示提交类型
-    # 首先，确保重要的更改类型（新功能、修复等）排在前面
-    priority_types = ['feat', 'fix', 'perf', 'refactor']
+def update_changelog(changelog_content: str, new_content: str, config: Dict[str, Any]) -> str:
+    """更新变更日志内容。
 
-    # 创建提交类型的有序列表
-    ordered_types = []
-    # 先添加优先类型
-    for type_name in priority_types:
-        if type_name in categorized_commits and categorized_commits[type_name]:
-            ordered_types.append(type_name)
+    Args:
+        changelog_content: 现有的变更日志内容
+        new_content: 新的变更日志内容
+        config: 配置信息，包含header等
 
-    # 然后添加其他类型
-    for commit_type in categorized_commits:
-        if commit_type not in ordered_types and categorized_commits[commit_type]:
-            ordered_types.append(commit_type)
+    Returns:
+        str: 更新后的变更日志内容
+    """
+    out = io.StringIO()
+    _insert_section(io.StringIO(changelog_content), out, new_content, config)
+    return out.getvalue()
 
-    # 按顺序生成Markdown
-    for commit_type in ordered_types:
-        commits = categorized_commits[commit_type]
-        if not commits:
-            continue
+def _insert_section(src: TextIO, out: TextIO, new_content: str, config: Dict[str, Any]) -> None:
+    """把新内容插入到现有变更日志的头部之后，其余内容按块复制，不整体读入内存。"""
+    header = config.get('header', "# 变更日志\n\n")
+    marker = header.strip()
+
+    head = src.read(len(marker))
+    if head == marker:
+        # 读取到头部段落结束（第一个空行）
+        lines = [head + src.readline()]
+        while lines[-1].endswith("\n"):
+            line = src.readline()
+            if line == "\n":
+                break
+            lines.append(line)
+        else:
+            # 文件中只有头部段落
+            if "".join(lines).strip() == marker:
+                out.write(header + new_content)
+            else:
+                out.write("".join(lines) + "\n\n" + new_content)
+            return
+        rest = src.read(COPY_CHUNK_SIZE)
+        if not rest.strip() and "".join(lines).strip() == marker and not src.read(1):
+            out.write(header + new_content)
+            return
+        out.write("".join(lines).rstrip("\n") + "\n\n" + new_content + "\n\n" + rest)
+    else:
+        rest = head + src.read(COPY_CHUNK_SIZE)
+        if len(rest) < len(head) + COPY_CHUNK_SIZE and rest.strip() in ("", marker):
+            # 内容为空、只有空白或只有头部
+            out.write(header + new_content)
+            return
+        out.write(header + new_content + "\n\n" + rest)
+    shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
 
-        type_name = commit_types.get(commit_type, "其他变更")
-        markdown += f"### {type_name}\n\n"
+@contextlib.contextmanager
+def atomic_write(path: Union[str, Path]) -> Iterator[TextIO]:
+    """写入同目录下的临时文件，成功后用os.replace原子地替换目标文件。
 
-        for commit in commits:
-            scope = commit.get("scope", "")
-            message = commit.get("title", commit.get("message", ""))
-            commit_hash = commit.get("short_hash", "")
+    Args:
+        path: 目标文件路径
 
-            scope_text = f"**{scope}:** " if scope else ""
-            markdown += f"* {scope_text}{message} ({commit_hash})\n"
+    Yields:
+        TextIO: 临时文件的文本流
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_current_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
-        markdown += "\n"
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
 
-    return markdown
+def update_changelog_file(path: Union[str, Path], new_content: str, config: Dict[str, Any]) -> None:
+    """在变更日志文件头部之后插入新内容。
 
-def update_changelog(changelog_content: str, new_content: str, config: Dict[str, Any]) -> str:
-    """更新变更日志内容。
+    现有内容从原文件按块复制到临时文件，再原子地替换原文件，
+    因此内存占用与文件大小无关，写入中断也不会留下损坏的文件。
 
     Args:
-        changelog_content: 现有的变更日志内容
+        path: 变更日志文件路径，不存在时创建
         new_content: 新的变更日志内容
         config: 配置信息，包含header等
+    """
+    path = Path(path)
+    with atomic_write(path) as out:
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as src:
+                _insert_section(src, out, new_content, config)
+        else:
+            _insert_section(io.StringIO(), out, new_content, config)
+
+def generate_all_releases(output: str, config: Dict[str, Any], cache: Optional[GitCache] = None,
+                          first_parent: bool = False, paths: Optional[List[str]] = None) -> int:
+    """为所有版本重新生成完整的CHANGELOG。
+
+    Args:
+        output: 输出文件路径
+        config: 配置信息
+        cache: 可选的Git缓存对象
+        first_parent: 是否只沿第一父提交遍历
+        paths: 只包含修改了这些路径的提交
 
     Returns:
-        str: 更新后的变更日志内容
+        int: 退出码
     """
-    header = config.get('header', "# 变更日志\n\n")
+    releases = [(tag, date, commits) for tag, date, commits in get_releases(cache, first_parent, paths)
+                if commits]
+    if not releases:
+        ColorLog.warning("未发现任何提交")
+        return 0
 
-    if not changelog_content or changelog_content.strip() == header.strip() or changelog_content.strip() == "":
-        return header + new_content
+    classifier = CommitClassifier(config)
+    try:
+        with atomic_write(output) as out:
+            out.write(config.get('header', "# 变更日志\n\n"))
+            for tag, date, commits in releases:
+                version = get_version_from_tag(tag) if tag else "未发布"
+                categorized = categorize_commits(commits, config, classifier)
+                write_markdown(out, categorized, version, date, config)
+    except Exception as e:
+        ColorLog.error(f"写入CHANGELOG失败: {e}")
+        return 1
+    ColorLog.success(f"已生成 {len(releases)} 个版本的变更日志: {output}")
 
-    # 提取头部（如果有）
-    if changelog_content.startswith(header.strip()):
-        # 在头部后面插入新内容
-        parts = changelog_content.split("\n\n", 1)
-        if len(parts) > 1:
-            return parts[0] + "\n\n" + new_content + "\n\n" + parts[1]
-        else:
-            return parts[0] + "\n\n" + new_content
-    else:
-        # 没有标准头部，直接在前面加上
-        return header + new_content + "\n\n" + changelog_content
+    if cache:
+        cache.save_cache()
+    return 0
 
-def main():
-    """主函数。"""
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器。"""
     parser = argparse.ArgumentParser(description="从git提交历史生成CHANGELOG")
     parser.add_argument("--output", default="CHANGELOG.md", help="输出文件路径")
     parser.add_argument("--since", help="起始提交或标签")
     parser.add_argument("--until", help="结束提交或标签")
     parser.add_argument("--config", help="配置文件路径")
     parser.add_argument("--cache-file", help="缓存文件路径")
+    parser.add_argument("--first-parent", action="store_true", help="只沿第一父提交遍历历史")
+    parser.add_argument("--path", dest="paths", action="append", help="只包含修改了该路径的提交（可多次指定）")
+    parser.add_argument("--max-count", type=int, help="最多处理的提交数量")
+    parser.add_argument("--all-releases", action="store_true", help="一次遍历历史，为所有标签重新生成完整的CHANGELOG")
+    parser.add_argument("--repo", dest="repos", action="append", default=[],
+                        help="工作区模式：为该仓库生成CHANGELOG（可多次指定）")
+    parser.add_argument("--package", dest="packages", action="append", default=[],
+                        help="工作区模式：为单一仓库中的该子目录生成CHANGELOG，只包含修改了该目录的提交（可多次指定）")
+    parser.add_argument("--jobs", "-j", type=int, help="工作区模式的并行进程数，默认为CPU核数")
     parser.add_argument("--verbose", "-v", action="store_true", help="显示详细信息")
-    args = parser.parse_args()
+    return parser
+
+def run_workspace_target(args: argparse.Namespace, directory: str, package: bool) -> Dict[str, Any]:
+    """在工作进程中为单个仓库或子包生成CHANGELOG。
 
+    工作进程切换到目标目录后运行，因此输出文件、缓存文件和默认配置文件都相对于该目录，
+    每个目标使用各自的 ``GitCache``。子包通过 ``-- .`` 路径过滤只包含修改了该目录的提交，
+    ``--all-releases`` 模式同样适用。
+
+    Args:
+        args: 命令行参数
+        directory: 仓库或子包目录
+        package: 是否为单一仓库中的子包
+
+    Returns:
+        Dict[str, Any]: 目标名称、退出码、耗时和日志输出
+    """
+    target_args = argparse.Namespace(**vars(args))
+    if package and not args.paths:
+        target_args.paths = ["."]
+    log = io.StringIO()
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    try:
+        os.chdir(directory)
+        with contextlib.redirect_stdout(log):
+            code = run_changelog(target_args)
+    except Exception as e:
+        log.write(f"{ColorLog.RED}错误: {e}{ColorLog.RESET}\n")
+        code = 1
+    finally:
+        os.chdir(cwd)
+    return {
+        "name": directory,
+        "code": code,
+        "elapsed": time.perf_counter() - start,
+        "log": log.getvalue(),
+    }
+
+def run_workspace(args: argparse.Namespace) -> int:
+    """工作区模式：用进程池并行地为多个仓库和子包生成CHANGELOG，并输出耗时汇总。
+
+    Args:
+        args: 命令行参数，``repos`` 和 ``packages`` 为目标目录
+
+    Returns:
+        int: 退出码，任一目标失败时为1
+    """
+    # 配置文件路径在切换目录前转换为绝对路径
+    if args.config:
+        args.config = os.path.abspath(args.config)
+    # 输出和缓存文件相对于各目标目录；绝对路径会让所有并行的目标写同一个文件
+    for option, value in (("--output", args.output), ("--cache-file", args.cache_file)):
+        if value and os.path.isabs(value):
+            ColorLog.error(f"工作区模式下 {option} 必须是相对于各目标目录的路径: {value}")
+            return 1
+    targets = [(repo, False) for repo in args.repos] + [(pkg, True) for pkg in args.packages]
+    seen: Set[str] = set()
+    for directory, _ in targets:
+        if not os.path.isdir(directory):
+            ColorLog.error(f"目录不存在: {directory}")
+            return 1
+        real = os.path.realpath(directory)
+        if real in seen:
+            ColorLog.error(f"目标目录重复: {directory}")
+            return 1
+        seen.add(real)
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(targets)))
+    ColorLog.info(f"工作区模式: {len(targets)} 个目标，{jobs} 个进程")
+    start = time.perf_counter()
+    results = []
+    if jobs == 1:
+        for directory, package in targets:
+            results.append(run_workspace_target(args, directory, package))
+            print(results[-1]["log"], end="")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_workspace_target, args, directory, package)
+                       for directory, package in targets]
+            # 按完成顺序输出各目标的日志，避免多个进程的输出交错
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(f"\n[{result['name']}]")
+                print(result["log"], end="")
+    wall_time = time.perf_counter() - start
+
+    # 按目标顺序输出汇总表
+    order = {directory: i for i, (directory, _) in enumerate(targets)}
+    results.sort(key=lambda r: order[r["name"]])
+    # 中文在终端中占两列，因此名称放在最后一列，前面的列宽度固定
+    print(f"\n{'耗时':>7}  状态  目标")
+    for result in results:
+        status = "成功" if result["code"] == 0 else "失败"
+        print(f"{result['elapsed']:8.2f}s  {status}  {result['name']}")
+    total = sum(r["elapsed"] for r in results)
+    ColorLog.info(f"总耗时 {wall_time:.2f}s（各目标累计 {total:.2f}s）")
+
+    failed = [r["name"] for r in results if r["code"] != 0]
+    if failed:
+        ColorLog.error(f"{len(failed)} 个目标生成失败: {', '.join(failed)}")
+        return 1
+    ColorLog.success(f"已为 {len(results)} 个目标生成CHANGELOG")
+    return 0
+
+def run_changelog(args: argparse.Namespace) -> int:
+    """在当前目录的仓库中生成CHANGELOG。
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        int: 退出码
+    """
     try:
         # 检查是否在git仓库中
         try:
@@ -524,6 +1382,9 @@ def main():
             if args.verbose:
                 ColorLog.info(f"使用缓存文件: {args.cache_file}")
 
+        if args.all_releases:
+            return generate_all_releases(args.output, config, cache, args.first_parent, args.paths)
+
         # 获取版本和日期
         today = datetime.now().strftime("%Y-%m-%d")
 
@@ -544,7 +1405,9 @@ def main():
         if args.verbose:
             ColorLog.info(f"获取提交记录 - 从: {args.since or '仓库起始'} 到: {args.until or 'HEAD'}")
 
-        commits = get_git_log(args.since, args.until, cache)
+        commits = get_git_log(args.since, args.until, cache,
+                              first_parent=args.first_parent, paths=args.paths,
+                              max_count=args.max_count)
         if not commits:
             ColorLog.warning("未发现新的提交")
             return 0
@@ -563,27 +1426,16 @@ def main():
         # 生成Markdown
         new_content = generate_markdown(categorized, version, today, config)
 
-        # 读取现有的CHANGELOG
+        # 在现有CHANGELOG的头部之后插入新版本
         output_path = Path(args.output)
-        if output_path.exists():
-            try:
-                existing_content = output_path.read_text(encoding="utf-8")
-                if args.verbose:
-                    ColorLog.info(f"已读取现有的CHANGELOG: {output_path}")
-            except Exception as e:
-                ColorLog.error(f"读取现有CHANGELOG失败: {e}")
-                existing_content = ""
-        else:
-            if args.verbose:
+        if args.verbose:
+            if output_path.exists():
+                ColorLog.info(f"更新现有的CHANGELOG: {output_path}")
+            else:
                 ColorLog.info(f"CHANGELOG文件不存在，将创建新文件: {output_path}")
-            existing_content = ""
 
-        # 更新CHANGELOG
-        updated_content = update_changelog(existing_content, new_content, config)
-
-        # 写入文件
         try:
-            output_path.write_text(updated_content, encoding="utf-8")
+            update_changelog_file(output_path, new_content, config)
             ColorLog.success(f"已更新 {args.output}")
 
             # 保存缓存
@@ -603,5 +1455,15 @@ def main():
         ColorLog.error(traceback.format_exc())
         return 1
 
+def main():
+    """主函数。"""
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.all_releases and (args.since or args.until or args.max_count is not None):
+        parser.error("--all-releases 会重新生成所有版本，不能与 --since、--until 或 --max-count 同时使用")
+    if args.repos or args.packages:
+        return run_workspace(args)
+    return run_changelog(args)
+
 if __name__ == "__main__":
     sys.exit(main())
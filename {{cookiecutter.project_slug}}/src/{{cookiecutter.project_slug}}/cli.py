@@ -9,12 +9,44 @@ from rich.panel import Panel
 from rich.table import Table
 from typing import Optional, List
 
+from {{cookiecutter.project_slug}}.utils.profiling import PROFILE_MODES, Profiler, top_functions
+
 app = typer.Typer(
     help="{{cookiecutter.project_short_description}}",
     add_completion=True,
 )
 console = Console()
 
+
+@app.callback()
+def global_options(
+    ctx: typer.Context,
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        "--profile",
+        help="分析命令性能，结果写入 <路径>.pstats 和 <路径>.collapsed"
+    ),
+    profile_mode: str = typer.Option(
+        "cprofile",
+        "--profile-mode",
+        help=f"性能分析模式: {', '.join(PROFILE_MODES)}"
+    ),
+):
+    """全局选项，对所有命令生效。"""
+    if profile_output is None:
+        return
+    if profile_mode not in PROFILE_MODES:
+        raise typer.BadParameter(f"不支持的分析模式: {profile_mode}", param_hint="--profile-mode")
+    profiler = Profiler(profile_output, mode=profile_mode).start()
+
+    def finish():
+        profiler.stop()
+        console.print(f"性能分析结果已保存到: [bold]{profile_output}[/bold].*"
+                      f" (耗时 {profiler.elapsed:.3f}s)")
+
+    # 子命令执行完毕、上下文关闭时停止分析并写出结果
+    ctx.call_on_close(finish)
+
 # CLI工具特定命令
 @app.command()
 def process(
@@ -210,6 +242,47 @@ def info():
     ))
 
 # 通用命令
+@app.command()
+def profile(
+    stats_file: Path = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="pstats文件路径"
+    ),
+    limit: int = typer.Option(
+        20,
+        "--limit",
+        "-n",
+        help="显示的函数数量"
+    ),
+    sort: str = typer.Option(
+        "cumulative",
+        "--sort",
+        "-s",
+        help="排序字段: cumulative, tottime, calls"
+    ),
+):
+    """汇总性能分析结果中最耗时的函数。"""
+    try:
+        rows = top_functions(stats_file, limit=limit, sort=sort)
+    except ValueError as e:
+        console.print(f"[bold red]错误[/bold red]: {e}")
+        raise typer.Exit(1)
+
+    table = Table(title=f"最耗时的函数 (按 {sort} 排序)")
+    table.add_column("函数", style="cyan")
+    table.add_column("位置", style="blue")
+    table.add_column("调用次数", justify="right")
+    table.add_column("自身耗时(s)", justify="right", style="green")
+    table.add_column("总耗时(s)", justify="right", style="green")
+
+    for row in rows:
+        table.add_row(row.name, row.location, str(row.calls),
+                      f"{row.self_time:.4f}", f"{row.total_time:.4f}")
+
+    console.print(table)
+
 @app.command()
 def version():
     """显示版本信息。"""
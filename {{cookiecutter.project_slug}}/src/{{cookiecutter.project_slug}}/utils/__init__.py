@@ -6,3 +6,6 @@
 from .file_utils import *  # noqa
 from .data_utils import *  # noqa
 from .logging_utils import *  # noqa
+from .cache import *  # noqa
+from .parallel import *  # noqa
+from .profiling import *  # noqa
@@ -0,0 +1,376 @@
+"""缓存与记忆化相关工具函数。"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple, Union
+
+# 表示缓存未命中的哨兵对象，允许缓存None
+_MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    """缓存统计信息。"""
+
+    hits: int
+    misses: int
+    evictions: int
+    expired: int
+    currsize: int
+    currbytes: int
+    maxsize: Optional[int]
+
+
+class _SQLiteStore:
+    """跨进程共享的SQLite持久化存储，键为pickle后键的摘要。
+
+    同一文件可被多个缓存共享，各缓存的条目按命名空间隔离。
+    """
+
+    def __init__(self, path: Union[str, Path], namespace: str = ''):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 自动提交模式，写入后立即对其他进程可见
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key BLOB, value BLOB,"
+            " expires_at REAL, PRIMARY KEY (namespace, key)) WITHOUT ROWID")
+
+    @staticmethod
+    def _digest(key: Hashable) -> bytes:
+        return hashlib.blake2b(pickle.dumps(key, protocol=4), digest_size=16).digest()
+
+    def get(self, key: Hashable) -> Any:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM entries WHERE namespace=? AND key=?",
+            (self.namespace, self._digest(key))).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return _MISSING, None
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float]) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                           (self.namespace, self._digest(key), pickle.dumps(value), expires_at))
+
+    def delete(self, key: Hashable) -> None:
+        self._conn.execute("DELETE FROM entries WHERE namespace=? AND key=?",
+                           (self.namespace, self._digest(key)))
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM entries WHERE namespace=?", (self.namespace,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class LRUCache:
+    """线程安全的LRU缓存，支持过期时间、条目数上限和字节数上限。
+
+    条目保存在按访问顺序排列的 ``OrderedDict`` 中，超出任一上限时淘汰最久未使用的条目；
+    过期条目在访问时惰性删除。指定 ``persist`` 时写入会同步到SQLite文件，
+    内存未命中时再从文件读取，因此可在多个进程和多次运行之间共享。SQLite读写不持有
+    实例锁，其他线程的内存命中不会等待磁盘I/O。
+
+    Args:
+        maxsize: 最大条目数，为None时不限制
+        ttl: 默认的过期秒数，为None时永不过期
+        max_bytes: 所有值的总字节数上限，为None时不限制
+        sizeof: 计算值大小的函数，默认使用 ``sys.getsizeof``（浅层大小）
+        persist: SQLite持久化文件路径，值必须可pickle
+        namespace: 持久化条目的命名空间，多个缓存共享同一文件时用于区分各自的条目
+    """
+
+    def __init__(self,
+                 maxsize: Optional[int] = 128,
+                 ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = sys.getsizeof,
+                 persist: Optional[Union[str, Path]] = None,
+                 namespace: str = ''):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        # 键 -> (值, 过期时间, 字节数)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = self._expired = 0
+        self._store = _SQLiteStore(persist, namespace) if persist is not None else None
+        # 串行化SQLite操作；实例锁下递增的写入序号保证持久化层的写入顺序与内存层一致
+        self._store_lock = threading.Lock()
+        self._mutations = 0
+        self._pending_writes: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key, count=False) is not _MISSING
+
+    def _lookup(self, key: Hashable, count: bool = True) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] is not None and entry[1] <= time.monotonic():
+                    self._remove(key)
+                    self._expired += 1
+                else:
+                    self._data.move_to_end(key)
+                    if count:
+                        self._hits += 1
+                    return entry[0]
+            if self._store is None:
+                if count:
+                    self._misses += 1
+                return _MISSING
+            mutations = self._mutations
+
+        with self._store_lock:
+            value, expires_at = self._store.get(key)
+        with self._lock:
+            if value is _MISSING:
+                if count:
+                    self._misses += 1
+                return _MISSING
+            # 读取期间发生过写入、删除或清空时不回填，避免用旧值覆盖
+            if self._mutations == mutations:
+                # 持久化层使用墙钟时间，转换为内存层使用的单调时钟
+                ttl = None if expires_at is None else expires_at - time.time()
+                self._insert(key, value, ttl)
+            if count:
+                self._hits += 1
+            return value
+
+    def _begin_write(self, key: Hashable) -> int:
+        """在实例锁内登记一次持久化写入，返回其序号。"""
+        self._mutations += 1
+        self._pending_writes[key] = self._mutations
+        return self._mutations
+
+    def _write_store(self, key: Hashable, seq: int, operation: Callable[..., None],
+                     *args: Any) -> None:
+        """在实例锁外执行持久化写入；同一个键已有更新的写入时跳过本次写入。"""
+        try:
+            with self._store_lock:
+                if self._pending_writes.get(key) == seq:
+                    operation(*args)
+        finally:
+            with self._lock:
+                if self._pending_writes.get(key) == seq:
+                    del self._pending_writes[key]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值。
+
+        Args:
+            key: 键
+            default: 未命中或已过期时的返回值
+
+        Returns:
+            Any: 缓存值或默认值
+        """
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值。
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 本条目的过期秒数，默认使用缓存的 ``ttl``
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._insert(key, value, ttl)
+            if self._store is None:
+                return
+            seq = self._begin_write(key)
+        self._write_store(key, seq, self._store.set, key, value,
+                          None if ttl is None else time.time() + ttl)
+
+    def _insert(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        nbytes = self._sizeof(value) if self.max_bytes is not None else 0
+        if key in self._data:
+            self._remove(key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._data[key] = (value, expires_at, nbytes)
+        self._bytes += nbytes
+        # 超出上限时从最久未使用的一端淘汰；单个超出字节上限的条目也不会保留
+        while self._data and (
+                (self.maxsize is not None and len(self._data) > self.maxsize)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._data)))
+            self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def delete(self, key: Hashable) -> None:
+        """删除缓存值（包括持久化层）。"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self._store is None:
+                return
+            seq = self._begin_write(key)
+        self._write_store(key, seq, self._store.delete, key)
+
+    def clear(self) -> None:
+        """清空缓存（包括持久化层）并重置统计信息。"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = self._expired = 0
+            # 尚未执行的持久化写入一并作废
+            self._mutations += 1
+            self._pending_writes.clear()
+            if self._store is None:
+                return
+        with self._store_lock:
+            self._store.clear()
+
+    def info(self) -> CacheInfo:
+        """返回缓存统计信息。"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._expired,
+                             len(self._data), self._bytes, self.maxsize)
+
+    def close(self) -> None:
+        """关闭持久化存储。"""
+        if self._store is not None:
+            with self._store_lock:
+                self._store.close()
+
+
+def _make_key(*args: Any, **kwargs: Any) -> Hashable:
+    """根据调用参数构造缓存键，与 ``functools.lru_cache`` 一样要求参数可哈希。"""
+    if kwargs:
+        return args + (_MISSING,) + tuple(sorted(kwargs.items()))
+    if len(args) == 1 and type(args[0]) in (int, str):
+        return args[0]
+    return args
+
+
+def memoize(maxsize: Optional[int] = 128,
+            ttl: Optional[float] = None,
+            max_bytes: Optional[int] = None,
+            sizeof: Callable[[Any], int] = sys.getsizeof,
+            persist: Optional[Union[str, Path]] = None,
+            key: Optional[Callable[..., Hashable]] = None) -> Callable[[Callable], Callable]:
+    """为同步或异步函数添加LRU+TTL记忆化的装饰器。
+
+    同一个键并发未命中时只执行一次函数（single-flight），其余调用等待并共享结果；
+    函数抛出的异常不会被缓存。被装饰的函数带有 ``cache``、``cache_info()`` 和
+    ``cache_clear()`` 属性。
+
+    Args:
+        maxsize: 最大条目数
+        ttl: 过期秒数
+        max_bytes: 所有结果的总字节数上限
+        sizeof: 计算结果大小的函数
+        persist: SQLite持久化文件路径，可在进程之间共享结果；
+            条目以函数的模块名和限定名为命名空间，多个函数可共享同一文件
+        key: 根据调用参数计算缓存键的函数，默认使用全部参数
+
+    Returns:
+        Callable[[Callable], Callable]: 装饰器
+    """
+    make_key = key or _make_key
+
+    def decorator(func: Callable) -> Callable:
+        cache = LRUCache(maxsize, ttl, max_bytes, sizeof, persist,
+                         namespace=f"{func.__module__}.{func.__qualname__}")
+        lock = threading.Lock()
+        # 包装函数上会附加 cache、cache_info 和 cache_clear 属性
+        wrapper: Any
+
+        if inspect.iscoroutinefunction(func):
+            # 每个键对应一个正在执行的asyncio任务
+            pending: Dict[Hashable, asyncio.Future] = {}
+
+            def forget(cache_key, future):
+                if pending.get(cache_key) is future:
+                    del pending[cache_key]
+
+            async def run(cache_key, args, kwargs):
+                result = await func(*args, **kwargs)
+                cache.set(cache_key, result)
+                return result
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = make_key(*args, **kwargs)
+                value = cache._lookup(cache_key)
+                if value is not _MISSING:
+                    return value
+                future = pending.get(cache_key)
+                if future is None or future.get_loop() is not asyncio.get_running_loop():
+                    future = asyncio.ensure_future(run(cache_key, args, kwargs))
+                    pending[cache_key] = future
+                    future.add_done_callback(functools.partial(forget, cache_key))
+                # 用shield避免某个调用者被取消时连带取消其他调用者共享的任务
+                return await asyncio.shield(future)
+
+            wrapper = async_wrapper
+        else:
+            # 每个键对应一个 (事件, 结果容器)，由第一个未命中的线程负责计算
+            inflight: Dict[Hashable, Tuple[threading.Event, list]] = {}
+
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                cache_key = make_key(*args, **kwargs)
+                value = cache._lookup(cache_key)
+                if value is not _MISSING:
+                    return value
+                with lock:
+                    call = inflight.get(cache_key)
+                    leader = call is None
+                    if leader:
+                        call = inflight[cache_key] = (threading.Event(), [])
+                event, outcome = call
+                if not leader:
+                    event.wait()
+                    if outcome[0]:
+                        return outcome[1]
+                    raise outcome[1]
+                try:
+                    # 上一个leader可能在本线程未命中之后、成为leader之前刚写入结果
+                    value = cache._lookup(cache_key, count=False)
+                    if value is not _MISSING:
+                        outcome[:] = [True, value]
+                        return value
+                    result = func(*args, **kwargs)
+                except BaseException as exc:
+                    outcome[:] = [False, exc]
+                    raise
+                else:
+                    cache.set(cache_key, result)
+                    outcome[:] = [True, result]
+                    return result
+                finally:
+                    with lock:
+                        del inflight[cache_key]
+                    event.set()
+
+            wrapper = sync_wrapper
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
@@ -1,16 +1,61 @@
 """数据处理相关工具函数。"""
 
+import base64
+import calendar
 import hashlib
+import importlib
+import mmap
+import operator
+import os
 import random
 import re
 import string
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Union
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
+from itertools import islice
+from pathlib import Path
+from array import array
+from collections.abc import Sequence, Sized
+from typing import (Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple,
+                    TypeGuard, Union, cast)
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - 可选依赖
+    xxhash = None
+
+
+@lru_cache(maxsize=None)
+def _optional_import(name: str):
+    """按需导入可选依赖（如numpy、pandas），未安装时返回None。
+
+    延迟到首次使用时导入，避免拖慢本包的导入速度。
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _is_pandas(values: Any) -> TypeGuard[Any]:
+    """判断对象是否为pandas对象（不会触发pandas导入）。"""
+    return type(values).__module__.partition('.')[0] == 'pandas'
+
+
+def _is_numpy(values: Any) -> TypeGuard[Any]:
+    """判断对象是否为NumPy数组（不会触发numpy导入）。"""
+    return type(values).__module__ == 'numpy'
 
 
 def generate_random_string(length: int = 8, include_digits: bool = True) -> str:
     """生成随机字符串。
 
+    使用操作系统提供的安全随机源，可用作令牌或标识符。
+
     Args:
         length: 字符串长度
         include_digits: 是否包含数字
@@ -18,10 +63,131 @@ def generate_random_string(length: int = 8, include_digits: bool = True) -> str:
     Returns:
         str: 随机字符串
     """
-    chars = string.ascii_letters
-    if include_digits:
-        chars += string.digits
-    return ''.join(random.choice(chars) for _ in range(length))
+    return generate_random_strings(1, length, include_digits)[0]
+
+
+@lru_cache(maxsize=32)
+def _byte_lookup_table(alphabet: str) -> Tuple[bytes, bytes]:
+    """构建把随机字节映射到字母表的转换表。
+
+    只使用小于 ``len(alphabet)`` 最大整数倍的字节值，其余字节被丢弃，
+    从而避免取模带来的分布偏差。
+
+    Returns:
+        Tuple[bytes, bytes]: (``bytes.translate`` 转换表, 需要删除的字节)
+    """
+    if not alphabet or len(alphabet) > 256 or not alphabet.isascii():
+        raise ValueError("字母表必须是1到256个ASCII字符")
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    encoded = alphabet.encode('ascii')
+    table = bytes(encoded[b % size] for b in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256))
+
+
+def generate_random_strings(n: int,
+                            length: int = 8,
+                            include_digits: bool = True,
+                            secure: bool = True,
+                            alphabet: Optional[str] = None) -> List[str]:
+    """批量生成随机字符串。
+
+    安全模式下一次性读取 ``os.urandom`` 的随机字节并通过查找表转换为字符，
+    比逐个字符调用 ``random.choice`` 快一个数量级以上；非安全模式在安装NumPy时
+    使用向量化的伪随机数生成器。
+
+    Args:
+        n: 生成数量
+        length: 每个字符串的长度
+        include_digits: 是否包含数字，指定 ``alphabet`` 时忽略
+        secure: 是否使用密码学安全的随机源
+        alphabet: 自定义字母表（ASCII，最多256个字符）
+
+    Returns:
+        List[str]: 随机字符串列表
+    """
+    if alphabet is None:
+        alphabet = string.ascii_letters + (string.digits if include_digits else "")
+    total = n * length
+    if total <= 0:
+        return [""] * max(n, 0)
+
+    if secure:
+        table, delete = _byte_lookup_table(alphabet)
+        # 按拒绝率多读取少量字节，通常一次即可凑够
+        ratio = 256 / (256 - len(delete))
+        parts = []
+        produced = 0
+        while produced < total:
+            chunk = os.urandom(int((total - produced) * ratio * 1.05) + 16).translate(table, delete)
+            parts.append(chunk)
+            produced += len(chunk)
+        data = b"".join(parts)[:total].decode('ascii')
+    elif (np := _optional_import('numpy')) is not None:
+        lookup = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+        indices = np.random.default_rng().integers(0, len(alphabet), size=total)
+        data = lookup[indices].tobytes().decode('ascii')
+    else:
+        data = ''.join(random.choices(alphabet, k=total))
+
+    return [data[i:i + length] for i in range(0, total, length)]
+
+
+# Crockford Base32 字母表（ULID使用），按字符排序与数值排序一致
+_CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_B32_TO_CROCKFORD = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", _CROCKFORD_ALPHABET)
+
+
+def generate_sortable_ids(n: int = 1,
+                          kind: str = 'ulid',
+                          timestamp: Optional[Union[float, datetime]] = None) -> List[str]:
+    """批量生成按时间排序的唯一标识符。
+
+    支持两种格式：
+
+    * ``ulid``: 26个字符的Crockford Base32字符串，48位毫秒时间戳 + 80位随机数；
+    * ``uuid7``: 标准UUID字符串，版本7，48位毫秒时间戳 + 74位随机数。
+
+    同一批次共享时间戳，随机部分排序后输出，因此批内结果也严格递增。
+
+    Args:
+        n: 生成数量
+        kind: 标识符格式，'ulid' 或 'uuid7'
+        timestamp: 时间戳（秒）或datetime，默认为当前时间
+
+    Returns:
+        List[str]: 标识符列表，按字典序即按生成时间排序
+    """
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.timestamp()
+    millis = int((time.time() if timestamp is None else timestamp) * 1000)
+    if not 0 <= millis < 1 << 48:
+        raise ValueError(f"时间戳超出48位范围: {timestamp}")
+
+    if kind == 'ulid':
+        prefix = ''.join(_CROCKFORD_ALPHABET[(millis >> shift) & 31]
+                         for shift in range(45, -1, -5))
+        raw = os.urandom(10 * n)
+        randoms = sorted(raw[i:i + 10] for i in range(0, len(raw), 10))
+        # 10字节正好编码为16个Base32字符，可以整批编码后再切分
+        encoded = base64.b32encode(b"".join(randoms)).decode('ascii').translate(_B32_TO_CROCKFORD)
+        return [prefix + encoded[i:i + 16] for i in range(0, len(encoded), 16)]
+
+    if kind == 'uuid7':
+        ts_bytes = millis.to_bytes(6, 'big')
+        buf = bytearray(os.urandom(10 * n))
+        randoms = []
+        for i in range(0, len(buf), 10):
+            block = buf[i:i + 10]
+            block[0] = 0x70 | (block[0] & 0x0F)  # 版本号 7
+            block[2] = 0x80 | (block[2] & 0x3F)  # RFC 4122 变体
+            randoms.append(bytes(block))
+        randoms.sort()
+        hex_str = b"".join(ts_bytes + r for r in randoms).hex()
+        return [f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+                for h in (hex_str[i:i + 32] for i in range(0, len(hex_str), 32))]
+
+    raise ValueError(f"不支持的标识符格式: {kind}")
 
 
 def calculate_md5(data: Union[str, bytes]) -> str:
@@ -38,6 +204,378 @@ def calculate_md5(data: Union[str, bytes]) -> str:
     return hashlib.md5(data).hexdigest()
 
 
+# xxhash算法名称到构造函数名的映射（需要安装可选依赖 xxhash）
+_XXHASH_ALGORITHMS = {"xxh32": "xxh32", "xxh64": "xxh64",
+                      "xxh3_64": "xxh3_64", "xxh3_128": "xxh3_128", "xxh128": "xxh128"}
+
+# 超过此大小的文件默认使用mmap哈希
+_MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def _new_hasher(algorithm: str):
+    """根据算法名称创建哈希对象。
+
+    Args:
+        algorithm: hashlib支持的算法名称，或xxhash的 xxh32/xxh64/xxh3_64/xxh3_128
+
+    Returns:
+        哈希对象，支持 ``update`` 和 ``hexdigest``
+
+    Raises:
+        ValueError: 不支持的算法或未安装xxhash
+    """
+    name = algorithm.lower()
+    if name in _XXHASH_ALGORITHMS:
+        if xxhash is None:
+            raise ValueError(f"算法 {algorithm} 需要安装xxhash: pip install xxhash")
+        return getattr(xxhash, _XXHASH_ALGORITHMS[name])()
+    try:
+        return hashlib.new(name)
+    except ValueError:
+        raise ValueError(f"不支持的哈希算法: {algorithm}") from None
+
+
+# 取摘要的C实现调用，批量哈希时避免为每个键进入Python函数
+_DIGEST = operator.methodcaller('digest')
+
+# CPython内置（非OpenSSL）哈希实现所在的模块，3.12起SHA-2合并为 _sha2
+_BUILTIN_HASH_MODULES = {
+    'md5': ('_md5',),
+    'sha1': ('_sha1',),
+    'sha224': ('_sha2', '_sha256'),
+    'sha256': ('_sha2', '_sha256'),
+    'sha384': ('_sha2', '_sha512'),
+    'sha512': ('_sha2', '_sha512'),
+}
+
+
+def _short_input_constructor(name: str) -> Callable[[bytes], Any]:
+    """返回适合大量短输入的哈希构造函数。
+
+    OpenSSL实现每次构造都要初始化EVP上下文，对很短的键开销比计算本身还大；
+    优先使用CPython的内置实现，不可用时（例如FIPS构建）回退到hashlib。
+    """
+    for module_name in _BUILTIN_HASH_MODULES.get(name, ()):
+        constructor = getattr(_optional_import(module_name), name, None)
+        if constructor is not None:
+            return constructor
+    return getattr(hashlib, name, None) or partial(hashlib.new, name)
+
+
+def _digest_many(algorithm: str,
+                 digest_size: Optional[int]) -> Tuple[Callable[[Iterable[bytes]], Iterator[bytes]], int]:
+    """创建批量计算摘要的函数，每个键只经过C实现的调用链（构造、取摘要、截断）。
+
+    Returns:
+        Tuple: (把字节序列映射为摘要序列的函数, 摘要字节数)
+    """
+    name = algorithm.lower()
+    if name in ('blake2b', 'blake2s'):
+        size = digest_size or 8
+        blake = partial(getattr(hashlib, name), digest_size=size)
+        return (lambda items: map(_DIGEST, map(blake, items))), size
+    if name in _XXHASH_ALGORITHMS:
+        if xxhash is None:
+            raise ValueError(f"算法 {algorithm} 需要安装xxhash: pip install xxhash")
+        func = getattr(xxhash, f"{_XXHASH_ALGORITHMS[name]}_digest")
+        natural = len(func(b""))
+
+        def digest(items: Iterable[bytes]) -> Iterator[bytes]:
+            return map(func, items)
+    else:
+        natural = _new_hasher(name).digest_size
+        constructor = _short_input_constructor(name)
+
+        def digest(items: Iterable[bytes]) -> Iterator[bytes]:
+            return map(_DIGEST, map(constructor, items))
+    if digest_size is None or digest_size == natural:
+        return digest, natural
+    if digest_size > natural:
+        raise ValueError(f"算法 {algorithm} 的摘要长度只有 {natural} 字节")
+    truncate = operator.itemgetter(slice(0, digest_size))
+    return (lambda items: map(truncate, digest(items))), digest_size
+
+
+def _as_item_list(values: Any) -> Iterable[Any]:
+    """把NumPy数组、pandas Series或Arrow数组转换为Python对象序列。"""
+    if hasattr(values, 'to_pylist'):  # pyarrow.Array / ChunkedArray
+        return values.to_pylist()
+    if hasattr(values, 'tolist'):  # numpy.ndarray / pandas.Series
+        return values.tolist()
+    return values
+
+
+def calculate_hashes(values: Iterable[Union[str, bytes]],
+                     algorithm: str = 'blake2b',
+                     digest_size: Optional[int] = 8,
+                     output: str = 'bytes') -> Union[bytes, array, List[str]]:
+    """批量计算大量短键的哈希值，适用于分片和去重。
+
+    所有摘要按输入顺序首尾相接存放在一个 ``bytes`` 中（第i个摘要位于
+    ``[i * digest_size, (i + 1) * digest_size)``），避免为每个键创建对象。
+
+    Args:
+        values: 字符串或字节序列，也可以是NumPy数组、pandas Series或Arrow数组
+        algorithm: hashlib支持的算法或xxhash的 xxh32/xxh64/xxh3_64/xxh3_128，
+            推荐 'blake2b' 或 'xxh3_64'（需要xxhash）
+        digest_size: 摘要字节数，blake2系列直接生成该长度，其余算法截断；
+            None表示使用算法的默认长度
+        output: 输出格式，'bytes' 为连续字节；'array' 为 ``array('Q')``
+            （仅限8字节摘要，按大端序解释为无符号整数）；'hex' 为十六进制字符串列表
+
+    Returns:
+        Union[bytes, array, List[str]]: 按输入顺序排列的摘要
+    """
+    digest_many, size = _digest_many(algorithm, digest_size)
+    items = _as_item_list(values)
+    if not isinstance(items, (list, tuple)):
+        items = list(items)
+    try:
+        # 快速路径：全部为字符串时用map避免逐个判断类型
+        digests = list(digest_many(map(str.encode, items)))
+    except TypeError:
+        digests = list(digest_many([v.encode('utf-8') if isinstance(v, str) else v
+                                    for v in items]))
+
+    if output == 'bytes':
+        return b"".join(digests)
+    if output == 'hex':
+        return list(map(bytes.hex, digests))
+    if output == 'array':
+        if size != 8:
+            raise ValueError("output='array' 要求摘要长度为8字节")
+        result = array('Q')
+        result.frombytes(b"".join(digests))
+        if sys.byteorder == 'little':
+            result.byteswap()
+        return result
+    raise ValueError(f"不支持的输出格式: {output}")
+
+
+class IncrementalHasher:
+    """增量哈希器，用于对数据流逐段计算哈希。
+
+    Args:
+        algorithm: 哈希算法，支持的名称同 :func:`hash_file`
+    """
+
+    def __init__(self, algorithm: str = 'sha256'):
+        self.algorithm = algorithm
+        self._hasher = _new_hasher(algorithm)
+        self.bytes_processed = 0
+
+    def update(self, data: Union[str, bytes, bytearray, memoryview]) -> "IncrementalHasher":
+        """追加一段数据，字符串按UTF-8编码。"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._hasher.update(data)
+        self.bytes_processed += len(data)
+        return self
+
+    def update_many(self, items: Iterable[Union[str, bytes]]) -> "IncrementalHasher":
+        """依次追加多段数据。"""
+        for item in items:
+            self.update(item)
+        return self
+
+    def update_stream(self, stream: BinaryIO, chunk_size: int = 1024 * 1024) -> "IncrementalHasher":
+        """从二进制文件对象中分块读取并追加全部数据。"""
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return self
+            self.update(chunk)
+
+    def copy(self) -> "IncrementalHasher":
+        """复制当前状态，可用于计算前缀哈希后继续追加。"""
+        clone = IncrementalHasher.__new__(IncrementalHasher)
+        clone.algorithm = self.algorithm
+        clone._hasher = self._hasher.copy()
+        clone.bytes_processed = self.bytes_processed
+        return clone
+
+    def digest(self) -> bytes:
+        """返回当前的二进制摘要。"""
+        return self._hasher.digest()
+
+    def hexdigest(self) -> str:
+        """返回当前的十六进制摘要。"""
+        return self._hasher.hexdigest()
+
+
+def hash_file(file_path: Union[str, Path],
+              algorithm: str = 'sha256',
+              chunk_size: int = 1024 * 1024,
+              use_mmap: Optional[bool] = None) -> str:
+    """以流式方式计算文件的哈希值，不会把整个文件读入内存。
+
+    Args:
+        file_path: 文件路径
+        algorithm: 哈希算法，如 'md5'、'sha256'、'blake2b'，安装xxhash后可用 'xxh64' 等
+        chunk_size: 分块读取的块大小（字节）
+        use_mmap: 是否使用mmap，None表示大文件自动使用
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    hasher = _new_hasher(algorithm)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= _MMAP_THRESHOLD
+        if use_mmap and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        else:
+            # 复用同一缓冲区读取，避免每个块分配新的bytes对象；小文件按实际大小分配
+            buffer = bytearray(max(1, min(chunk_size, size)))
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def hash_files(file_paths: Iterable[Union[str, Path]],
+               algorithm: str = 'sha256',
+               workers: Optional[int] = None,
+               chunk_size: int = 1024 * 1024) -> Dict[str, str]:
+    """使用线程池批量计算多个文件的哈希值。
+
+    hashlib在处理大块数据时会释放GIL，因此多线程可以并行利用多个CPU核心。
+
+    Args:
+        file_paths: 文件路径序列
+        algorithm: 哈希算法
+        workers: 线程数，默认为 min(32, CPU核数 + 4)
+        chunk_size: 分块读取的块大小（字节）
+
+    Returns:
+        Dict[str, str]: 文件路径到十六进制哈希值的映射
+    """
+    paths = [os.fspath(p) for p in file_paths]
+    # 提前校验算法，避免在每个线程中重复报错
+    _new_hasher(algorithm)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = executor.map(
+            lambda p: hash_file(p, algorithm, chunk_size), paths)
+        return dict(zip(paths, digests))
+
+
+# 支持快速路径的格式指令: 指令 -> (datetime属性, 固定宽度)
+_DATETIME_FIELDS = {
+    'Y': ('year', 4), 'm': ('month', 2), 'd': ('day', 2),
+    'H': ('hour', 2), 'M': ('minute', 2), 'S': ('second', 2), 'f': ('microsecond', 6),
+}
+# datetime构造函数的位置参数顺序，以及strptime对缺失字段使用的默认值
+_DATETIME_ARGS = (('year', 1900), ('month', 1), ('day', 1), ('hour', 0),
+                  ('minute', 0), ('second', 0), ('microsecond', 0))
+# 可以直接交给 datetime.fromisoformat 解析的格式，
+# 以及格式化时对应的 datetime.isoformat(sep, timespec) 参数
+_ISO_FORMATS = {
+    '%Y-%m-%d': None,
+    '%Y-%m-%d %H:%M': (' ', 'minutes'),
+    '%Y-%m-%dT%H:%M': ('T', 'minutes'),
+    '%Y-%m-%d %H:%M:%S': (' ', 'seconds'),
+    '%Y-%m-%dT%H:%M:%S': ('T', 'seconds'),
+    '%Y-%m-%d %H:%M:%S.%f': (' ', 'microseconds'),
+    '%Y-%m-%dT%H:%M:%S.%f': ('T', 'microseconds'),
+}
+
+
+class _DatetimeFormatPlan:
+    """预编译的日期时间格式计划。
+
+    只包含固定宽度数字字段和普通字符的格式（如 ``%Y-%m-%d %H:%M:%S``）会被编译为
+    字符串切片解析和printf风格格式化；遇到不完全匹配的输入时退回
+    ``strptime``/``strftime``，因此结果与标准库完全一致。
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.fast = True
+        self.length = 0
+        self.fields: List[Tuple[int, int, str]] = []
+        self.literals: List[Tuple[int, str]] = []
+        printf_parts = []
+        i = 0
+        while i < len(fmt):
+            ch = fmt[i]
+            if ch == '%':
+                directive = fmt[i + 1:i + 2]
+                i += 2
+                if directive == '%':
+                    self.literals.append((self.length, '%'))
+                    printf_parts.append('%%')
+                    self.length += 1
+                    continue
+                spec = _DATETIME_FIELDS.get(directive)
+                if spec is None or any(f[2] == spec[0] for f in self.fields):
+                    self.fast = False
+                    break
+                name, width = spec
+                self.fields.append((self.length, self.length + width, name))
+                printf_parts.append(f'%0{width}d')
+                self.length += width
+            else:
+                self.literals.append((self.length, ch))
+                printf_parts.append(ch)
+                self.length += 1
+                i += 1
+        self.iso = fmt in _ISO_FORMATS
+        self.iso_spec = _ISO_FORMATS.get(fmt)
+        self.printf = ''.join(printf_parts)
+        attrs = [name for _, _, name in self.fields]
+        self.getter = operator.attrgetter(*attrs) if attrs else (lambda dt: ())
+        # datetime位置参数：字段对应 (起点, 终点) 切片，缺失字段为默认值
+        positions = {name: (start, end) for start, end, name in self.fields}
+        self.slots = [positions.get(name, default) for name, default in _DATETIME_ARGS]
+
+    def parse(self, value: str) -> datetime:
+        """解析字符串，输入不完全匹配快速路径时退回strptime。"""
+        if self.fast and len(value) == self.length:
+            try:
+                for pos, ch in self.literals:
+                    if value[pos] != ch:
+                        raise ValueError
+                if self.iso:
+                    return datetime.fromisoformat(value)
+                args: List[int] = []
+                for slot in self.slots:
+                    if isinstance(slot, int):
+                        args.append(slot)
+                        continue
+                    piece = value[slot[0]:slot[1]]
+                    if not piece.isdigit():
+                        raise ValueError
+                    args.append(int(piece))
+                # 固定为7个整数参数：年、月、日、时、分、秒、微秒
+                return datetime(*args)  # type: ignore[arg-type]
+            except ValueError:
+                pass
+        return datetime.strptime(value, self.fmt)
+
+    def format(self, dt: datetime) -> str:
+        """格式化日期时间。
+
+        ``date`` 对象（没有时间字段和时区）以及年份小于1000的值退回strftime，
+        以保持与标准库一致的行为。
+        """
+        if self.fast and isinstance(dt, datetime) and dt.year >= 1000:
+            if self.iso_spec is not None and dt.tzinfo is None:
+                return dt.isoformat(*self.iso_spec)
+            return self.printf % self.getter(dt)
+        return dt.strftime(self.fmt)
+
+
+@lru_cache(maxsize=128)
+def _get_format_plan(fmt: str) -> _DatetimeFormatPlan:
+    """获取（并缓存）格式字符串对应的格式计划。"""
+    return _DatetimeFormatPlan(fmt)
+
+
 def format_datetime(dt: Optional[datetime] = None,
                     fmt: str = '%Y-%m-%d %H:%M:%S') -> str:
     """格式化日期时间。
@@ -51,7 +589,7 @@ def format_datetime(dt: Optional[datetime] = None,
     """
     if dt is None:
         dt = datetime.now()
-    return dt.strftime(fmt)
+    return _get_format_plan(fmt).format(dt)
 
 
 def parse_datetime(dt_str: str,
@@ -65,34 +603,273 @@ def parse_datetime(dt_str: str,
     Returns:
         datetime: 解析后的日期时间对象
     """
-    return datetime.strptime(dt_str, fmt)
+    return _get_format_plan(fmt).parse(dt_str)
+
+
+def parse_datetimes(values: Iterable[str],
+                    fmt: Optional[str] = '%Y-%m-%d %H:%M:%S') -> Any:
+    """批量解析日期时间字符串。
+
+    * 列表等可迭代对象：使用预编译的格式计划逐个解析，重复出现的字符串只解析一次，
+      返回 ``List[datetime]``；
+    * pandas Series：交给 ``pandas.to_datetime`` 向量化解析，返回Series；
+    * NumPy数组：ISO格式直接转换为 ``datetime64[us]``，否则逐个解析后转换。
+
+    Args:
+        values: 日期时间字符串序列
+        fmt: 格式字符串，None表示按ISO-8601解析（使用 ``datetime.fromisoformat``）
+
+    Returns:
+        解析结果，类型与输入对应
+    """
+    if _is_pandas(values):
+        pd = _optional_import('pandas')
+        return pd.to_datetime(values, format=fmt or 'ISO8601')
+    if _is_numpy(values):
+        np = _optional_import('numpy')
+        if fmt is None or fmt in _ISO_FORMATS:
+            return values.astype('datetime64[us]')
+        return np.array(parse_datetimes(values.tolist(), fmt), dtype='datetime64[us]')
+
+    parse = datetime.fromisoformat if fmt is None else _get_format_plan(fmt).parse
+    cache: Dict[str, datetime] = {}
+    result: List[datetime] = []
+    append = result.append
+    for value in values:
+        dt = cache.get(value)
+        if dt is None:
+            dt = cache[value] = parse(value)
+        append(dt)
+    return result
+
+
+def format_datetimes(values: Iterable[datetime],
+                     fmt: str = '%Y-%m-%d %H:%M:%S') -> Any:
+    """批量格式化日期时间。
+
+    重复出现的日期时间只格式化一次。pandas Series使用 ``Series.dt.strftime``，
+    NumPy ``datetime64`` 数组先转换为datetime再格式化。
+
+    Args:
+        values: 日期时间序列
+        fmt: 格式字符串
+
+    Returns:
+        格式化结果，输入为pandas Series时返回Series，否则返回 ``List[str]``
+    """
+    if _is_pandas(values):
+        return values.dt.strftime(fmt)
+    if _is_numpy(values):
+        values = values.astype('datetime64[us]').tolist()
+
+    format_one = _get_format_plan(fmt).format
+    cache: Dict[datetime, str] = {}
+    result: List[str] = []
+    append = result.append
+    for dt in values:
+        text = cache.get(dt)
+        if text is None:
+            text = cache[dt] = format_one(dt)
+        append(text)
+    return result
+
+
+# 固定长度的日期步长单位
+_FIXED_DATE_UNITS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+# 导出为NumPy datetime64时使用的单位代码
+_NUMPY_DATE_UNITS = {'hour': 'h', 'day': 'D', 'week': 'W', 'month': 'M'}
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    """在日期上增加若干个月，日期超过目标月份天数时取该月最后一天。"""
+    year, month = divmod(dt.month - 1 + months, 12)
+    year += dt.year
+    day = min(dt.day, calendar.monthrange(year, month + 1)[1])
+    return dt.replace(year=year, month=month + 1, day=day)
+
+
+def _to_datetime(value: Union[str, date, datetime], fmt: str) -> datetime:
+    """把字符串、date或datetime统一转换为datetime。"""
+    if isinstance(value, str):
+        return parse_datetime(value, fmt)
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+class DateRange(Sequence):
+    """惰性的日期时间范围，包含起止时间。
+
+    不会预先生成列表：长度、下标访问、切片和 ``in`` 判断都通过日历运算在O(1)时间内完成，
+    只在访问元素时才格式化为字符串。
+
+    Args:
+        start_date: 开始时间
+        end_date: 结束时间（包含）
+        fmt: 字符串格式，用于解析字符串参数和格式化输出
+        unit: 步长单位，'hour'、'day'、'week' 或 'month'
+        step: 每步包含的单位数量
+    """
+
+    def __init__(self,
+                 start_date: Union[str, date, datetime],
+                 end_date: Union[str, date, datetime],
+                 fmt: str = '%Y-%m-%d',
+                 unit: str = 'day',
+                 step: int = 1):
+        if unit not in _FIXED_DATE_UNITS and unit != 'month':
+            raise ValueError(f"不支持的步长单位: {unit}")
+        if step <= 0:
+            raise ValueError("步长必须为正整数")
+        self.fmt = fmt
+        self.unit = unit
+        self._anchor = _to_datetime(start_date, fmt)
+        end = _to_datetime(end_date, fmt)
+        last = self._unit_offset_floor(end)
+        count = last // step + 1 if last >= 0 else 0
+        # 以单位为刻度的下标序列，切片和包含判断都直接委托给range
+        self._offsets = range(0, count * step, step)
+
+    @classmethod
+    def _from_offsets(cls, template: "DateRange", offsets: range) -> "DateRange":
+        clone = cls.__new__(cls)
+        clone.fmt = template.fmt
+        clone.unit = template.unit
+        clone._anchor = template._anchor
+        clone._offsets = offsets
+        return clone
+
+    def _unit_offset_floor(self, value: datetime) -> int:
+        """计算不晚于value的最大单位偏移量。"""
+        if self.unit == 'month':
+            months = (value.year - self._anchor.year) * 12 + value.month - self._anchor.month
+            if _add_months(self._anchor, months) > value:
+                months -= 1
+            return months
+        return (value - self._anchor) // _FIXED_DATE_UNITS[self.unit]
+
+    def _datetime_at_offset(self, offset: int) -> datetime:
+        if self.unit == 'month':
+            return _add_months(self._anchor, offset)
+        return self._anchor + _FIXED_DATE_UNITS[self.unit] * offset
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_offsets(self, self._offsets[index])
+        return format_datetime(self._datetime_at_offset(self._offsets[index]), self.fmt)
+
+    def __iter__(self) -> Iterator[str]:
+        format_one = _get_format_plan(self.fmt).format
+        for dt in self.datetimes():
+            yield format_one(dt)
+
+    def __reversed__(self) -> Iterator[str]:
+        return iter(self[::-1])
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, (str, date)):
+            return False
+        try:
+            dt = _to_datetime(value, self.fmt)
+        except ValueError:
+            return False
+        offset = self._unit_offset_floor(dt)
+        return offset in self._offsets and self._datetime_at_offset(offset) == dt
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DateRange):
+            return list(self.datetimes()) == list(other.datetimes()) and self.fmt == other.fmt
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        if not self:
+            return f"DateRange(<empty>, unit={self.unit!r})"
+        return (f"DateRange({self[0]!r}, {self[-1]!r}, unit={self.unit!r}, "
+                f"step={self._offsets.step}, len={len(self)})")
+
+    def index(self, value: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        """返回元素的下标，不存在时抛出ValueError。"""
+        if value in self:
+            i = self._offsets.index(self._unit_offset_floor(_to_datetime(value, self.fmt)))
+            if start <= i < (len(self) if stop is None else stop):
+                return i
+        raise ValueError(f"{value!r} 不在范围内")
+
+    def count(self, value: Any) -> int:
+        """返回元素出现的次数（0或1）。"""
+        return int(value in self)
+
+    def datetimes(self) -> Iterator[datetime]:
+        """按顺序惰性产出datetime对象，不进行格式化。"""
+        if self.unit == 'month':
+            for offset in self._offsets:
+                yield _add_months(self._anchor, offset)
+            return
+        if not self._offsets:
+            return
+        delta = _FIXED_DATE_UNITS[self.unit] * self._offsets.step
+        current = self._datetime_at_offset(self._offsets[0])
+        for _ in self._offsets:
+            yield current
+            current += delta
+
+    def to_datetime64(self):
+        """导出为NumPy ``datetime64[us]`` 数组，便于向量化的连接和比较。
+
+        Returns:
+            numpy.ndarray: 日期时间数组
+
+        Raises:
+            ImportError: 未安装numpy
+        """
+        np = _optional_import('numpy')
+        if np is None:
+            raise ImportError("to_datetime64 需要安装numpy: pip install numpy")
+        anchor = np.datetime64(self._anchor, 'us')
+        if self.unit == 'month':
+            return np.array(list(self.datetimes()), dtype='datetime64[us]')
+        offsets = np.arange(self._offsets.start, self._offsets.stop, self._offsets.step)
+        unit = np.timedelta64(1, _NUMPY_DATE_UNITS[self.unit]).astype('timedelta64[us]')
+        return anchor + offsets * unit
 
 
 def get_date_range(start_date: Union[str, datetime],
                    end_date: Union[str, datetime],
-                   fmt: str = '%Y-%m-%d') -> List[str]:
+                   fmt: str = '%Y-%m-%d',
+                   unit: str = 'day',
+                   step: int = 1) -> List[str]:
     """获取日期范围内的所有日期。
 
+    需要处理很长的范围时，请直接使用惰性的 :class:`DateRange`。
+
     Args:
         start_date: 开始日期
         end_date: 结束日期
         fmt: 返回的日期格式
+        unit: 步长单位，'hour'、'day'、'week' 或 'month'
+        step: 每步包含的单位数量
 
     Returns:
         List[str]: 日期列表
     """
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, fmt)
-    if isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, fmt)
+    return list(DateRange(start_date, end_date, fmt, unit, step))
 
-    date_list = []
-    curr_date = start_date
-    while curr_date <= end_date:
-        date_list.append(curr_date.strftime(fmt))
-        curr_date += timedelta(days=1)
 
-    return date_list
+# 预编译的连续空白模式
+_WHITESPACE_RE = re.compile(r'\s+')
+# 删除控制字符（保留由空白折叠处理的 \t、\n 等）及常见零宽字符的translate表
+_CONTROL_CHAR_TABLE = dict.fromkeys(
+    [c for c in [*range(0x20), *range(0x7f, 0xa0)] if not chr(c).isspace()]
+    + [0x200b, 0x2060, 0xfeff])
 
 
 def clean_text(text: str) -> str:
@@ -104,10 +881,119 @@ def clean_text(text: str) -> str:
     Returns:
         str: 清理后的文本
     """
-    # 替换多个空白为单个空格
-    text = re.sub(r'\s+', ' ', text)
-    # 移除首尾空白
-    return text.strip()
+    # 替换多个空白为单个空格，并移除首尾空白
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _nfkc(text: str) -> str:
+    # ASCII文本在NFKC下保持不变，跳过规范化
+    return text if text.isascii() else unicodedata.normalize('NFKC', text)
+
+
+def _strip_control(text: str) -> str:
+    return text.translate(_CONTROL_CHAR_TABLE)
+
+
+def _collapse_whitespace(text: str) -> str:
+    return _WHITESPACE_RE.sub(' ', text)
+
+
+_TEXT_STEPS: Dict[str, Callable[[str], str]] = {
+    'nfkc': _nfkc,
+    'strip_control': _strip_control,
+    'collapse_whitespace': _collapse_whitespace,
+    'strip': str.strip,
+    'casefold': str.casefold,
+    'lower': str.lower,
+}
+DEFAULT_TEXT_STEPS = ('nfkc', 'strip_control', 'collapse_whitespace', 'strip', 'casefold')
+
+
+class TextNormalizer:
+    """可组合的文本规范化流水线。
+
+    各步骤在构造时解析为函数列表，正则和translate表均为模块级预编译对象。
+    实例可被pickle，因此可以直接分发给进程池。
+
+    Args:
+        steps: 步骤序列，可为内置步骤名（'nfkc'、'strip_control'、'collapse_whitespace'、
+            'strip'、'casefold'、'lower'）或自定义的 ``str -> str`` 函数，按顺序执行
+    """
+
+    def __init__(self, steps: Iterable[Union[str, Callable[[str], str]]] = DEFAULT_TEXT_STEPS):
+        self.steps = tuple(steps)
+        funcs = []
+        for step in self.steps:
+            if callable(step):
+                funcs.append(step)
+            elif step in _TEXT_STEPS:
+                funcs.append(_TEXT_STEPS[step])
+            else:
+                raise ValueError(f"不支持的规范化步骤: {step}")
+        self._funcs = tuple(funcs)
+
+    def __reduce__(self):
+        return (type(self), (self.steps,))
+
+    def __repr__(self) -> str:
+        return f"TextNormalizer(steps={self.steps!r})"
+
+    def __call__(self, text: str) -> str:
+        for func in self._funcs:
+            text = func(text)
+        return text
+
+    def normalize_batch(self, texts: Iterable[str]) -> List[str]:
+        """规范化一批文本。
+
+        Args:
+            texts: 文本序列
+
+        Returns:
+            List[str]: 规范化后的文本列表
+        """
+        result = texts if isinstance(texts, list) else list(texts)
+        # 逐步骤对整批执行map，避免逐条文本的Python层循环开销
+        for func in self._funcs:
+            result = list(map(func, result))
+        return result
+
+
+def normalize_texts(texts: Iterable[str],
+                    steps: Union[TextNormalizer, Iterable[Union[str, Callable[[str], str]]]] = DEFAULT_TEXT_STEPS,
+                    batch_size: int = 10000,
+                    processes: Optional[int] = None) -> Union[List[str], Any]:
+    """批量规范化文本。
+
+    Args:
+        texts: 文本的可迭代对象或pandas Series
+        steps: :class:`TextNormalizer` 实例或步骤序列
+        batch_size: 每批处理的文本数量，使用进程池时即每个任务的大小
+        processes: 进程池大小；为None时在当前进程中处理，适合中小规模语料
+
+    Returns:
+        Union[List[str], pandas.Series]: 规范化后的文本；输入为Series时返回保留索引的Series，
+        其中的缺失值保持不变
+    """
+    normalizer = steps if isinstance(steps, TextNormalizer) else TextNormalizer(steps)
+    if _is_pandas(texts):
+        values = texts.tolist()
+        mask = [isinstance(v, str) for v in values]
+        normalized = iter(normalize_texts([v for v, ok in zip(values, mask) if ok],
+                                          normalizer, batch_size, processes))
+        return texts.__class__([next(normalized) if ok else v for v, ok in zip(values, mask)],
+                               index=texts.index, name=texts.name)
+
+    batches = chunked(texts, batch_size)
+    result: List[str] = []
+    if processes is None:
+        for batch in batches:
+            result.extend(normalizer.normalize_batch(batch))
+        return result
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for batch in executor.map(normalizer.normalize_batch, batches):
+            result.extend(batch)
+    return result
 
 
 def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
@@ -123,24 +1009,246 @@ def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
     return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
 
+class _SequenceView(Sequence):
+    """列表的只读零拷贝视图。
+
+    pickle时会物化为普通列表，避免把整个底层列表发送给子进程。
+    """
+
+    __slots__ = ('_seq', '_range')
+
+    def __init__(self, seq: Sequence, indices: range):
+        self._seq = seq
+        self._range = indices
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _SequenceView(self._seq, self._range[index])
+        return self._seq[self._range[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._seq.__getitem__, self._range)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (_SequenceView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"_SequenceView({list(self)!r})"
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+# 切片语义已知的序列类型；deque等其他Sequence不一定支持切片，按普通可迭代对象处理
+_SLICEABLE_TYPES = (list, tuple, range, str, bytes, bytearray, memoryview, _SequenceView)
+
+
+def _slice_view(seq: Any, start: int, stop: int) -> Any:
+    """返回序列在[start, stop)区间上的视图，尽量避免复制。"""
+    if isinstance(seq, (bytes, bytearray)):
+        return memoryview(seq)[start:stop]
+    if isinstance(seq, (list, tuple)):
+        return _SequenceView(seq, range(start, stop))
+    if _is_pandas(seq):
+        return seq.iloc[start:stop]
+    # memoryview、NumPy数组和range的切片本身就是视图；str等不可变序列直接切片
+    return seq[start:stop]
+
+
+def _balanced_bounds(length: int, n_chunks: int) -> Iterator[Tuple[int, int]]:
+    """计算均衡分块的 [start, stop) 边界：前 length % n_chunks 个块各多一个元素。"""
+    base, extra = divmod(length, n_chunks)
+    start = 0
+    for i in range(min(n_chunks, length)):
+        stop = start + base + (i < extra)
+        yield start, stop
+        start = stop
+
+
+def _chunk_bounds(length: int, size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    """计算固定大小（可重叠）分块的 [start, stop) 边界。"""
+    stride = size - overlap
+    for start in range(0, length, stride):
+        stop = min(start + size, length)
+        yield start, stop
+        if stop == length:
+            return
+
+
+def chunked(iterable: Iterable[Any],
+            size: Optional[int] = None,
+            overlap: int = 0,
+            n_chunks: Optional[int] = None) -> Iterator[Any]:
+    """惰性地把可迭代对象分块。
+
+    对支持切片的序列返回视图而不是副本：列表和元组返回只读视图，bytes/bytearray返回
+    ``memoryview``，``memoryview``、NumPy数组和pandas对象返回其原生切片视图。
+    其他可迭代对象（包括 ``deque`` 等不支持切片的序列）通过 ``itertools.islice``
+    惰性读取，每个块为一个新列表。
+
+    Args:
+        iterable: 输入的可迭代对象
+        size: 每个块的大小，与 ``n_chunks`` 二选一
+        overlap: 相邻块重叠的元素数量，用于滑动窗口，必须小于 ``size``
+        n_chunks: 分成大小尽量均衡的块数（例如工作进程数），不能与 ``overlap`` 同时使用；
+            非序列输入会先被物化为列表
+
+    Yields:
+        块视图或列表
+
+    Raises:
+        ValueError: 参数组合无效
+    """
+    if (size is None) == (n_chunks is None):
+        raise ValueError("必须且只能指定 size 或 n_chunks 之一")
+    sliceable = (isinstance(iterable, _SLICEABLE_TYPES)
+                 or _is_numpy(iterable) or _is_pandas(iterable))
+    if n_chunks is not None:
+        if n_chunks <= 0:
+            raise ValueError("n_chunks 必须为正整数")
+        if overlap:
+            raise ValueError("均衡分块不支持 overlap")
+        seq = cast(Sized, iterable) if sliceable else list(iterable)
+        for start, stop in _balanced_bounds(len(seq), n_chunks):
+            yield _slice_view(seq, start, stop)
+        return
+    if size is None or size <= 0:
+        raise ValueError("size 必须为正整数")
+    if not 0 <= overlap < size:
+        raise ValueError("overlap 必须满足 0 <= overlap < size")
+
+    if sliceable:
+        for start, stop in _chunk_bounds(len(cast(Sized, iterable)), size, overlap):
+            yield _slice_view(iterable, start, stop)
+        return
+
+    iterator = iter(iterable)
+    window = list(islice(iterator, size))
+    if not window:
+        return
+    yield window
+    stride = size - overlap
+    while len(window) == size:
+        fresh = list(islice(iterator, stride))
+        if not fresh:
+            return
+        window = window[stride:] + fresh
+        yield window
+
+
+def iter_flatten_dict(d: Dict[str, Any],
+                      parent_key: str = '',
+                      separator: str = '.',
+                      flatten_lists: bool = False) -> Iterator[Tuple[Any, Any]]:
+    """以生成器形式扁平化嵌套字典，按深度优先顺序产出 ``(键, 值)``。
+
+    使用显式的迭代器栈而非递归，嵌套深度不受递归深度限制，也不会构建中间字典。
+    空的嵌套字典（以及 ``flatten_lists`` 时的空列表）不产出任何键。
+
+    Args:
+        d: 嵌套字典
+        parent_key: 父键前缀
+        separator: 键分隔符
+        flatten_lists: 是否把列表和元组按下标展开，例如 ``a.0.b``
+
+    Yields:
+        Tuple[Any, Any]: 扁平化后的键值对
+    """
+    containers = (dict, list, tuple) if flatten_lists else (dict,)
+    # 每层只在入栈时拼接一次带分隔符的前缀，叶子键只需一次格式化
+    stack = [(None if not parent_key else f"{parent_key}{separator}", _flatten_children(d))]
+    while stack:
+        head, items = stack[-1]
+        for k, v in items:
+            key = k if head is None else f"{head}{k}"
+            if isinstance(v, containers):
+                stack.append((f"{key}{separator}", _flatten_children(v)))
+                break
+            yield key, v
+        else:
+            stack.pop()
+
+
+def _flatten_children(value: Any) -> Iterator[Tuple[Any, Any]]:
+    return iter(value.items()) if isinstance(value, dict) else enumerate(value)
+
+
 def flatten_dict(d: Dict[str, Any],
-                parent_key: str = '',
-                separator: str = '.') -> Dict[str, Any]:
+                 parent_key: str = '',
+                 separator: str = '.',
+                 flatten_lists: bool = False) -> Dict[str, Any]:
     """将嵌套字典扁平化。
 
     Args:
         d: 嵌套字典
         parent_key: 父键前缀
         separator: 键分隔符
+        flatten_lists: 是否把列表和元组按下标展开
 
     Returns:
         Dict[str, Any]: 扁平化后的字典
     """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{separator}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, separator).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
+    if not flatten_lists and not parent_key:
+        # 常见情况的快速路径：直接写入结果字典，省去生成器逐项切换的开销
+        result: Dict[str, Any] = {}
+        stack: List[Tuple[Optional[str], Iterator[Tuple[str, Any]]]] = [(None, iter(d.items()))]
+        while stack:
+            head, items = stack[-1]
+            for k, v in items:
+                key = k if head is None else f"{head}{k}"
+                if isinstance(v, dict):
+                    stack.append((f"{key}{separator}", iter(v.items())))
+                    break
+                result[key] = v
+            else:
+                stack.pop()
+        return result
+    return dict(iter_flatten_dict(d, parent_key, separator, flatten_lists))
+
+
+def unflatten_dict(d: Dict[Any, Any],
+                   separator: str = '.',
+                   restore_lists: bool = False) -> Dict[Any, Any]:
+    """将扁平化的字典还原为嵌套字典，是 :func:`flatten_dict` 的逆操作。
+
+    Args:
+        d: 扁平化的字典
+        separator: 键分隔符
+        restore_lists: 是否把键恰好为 ``0..n-1`` 的嵌套层还原为列表
+
+    Returns:
+        Dict[Any, Any]: 嵌套字典
+
+    Raises:
+        ValueError: 键之间存在冲突，例如同时存在 ``a`` 和 ``a.b``
+    """
+    result: Dict[Any, Any] = {}
+    for key, value in d.items():
+        parts = key.split(separator) if isinstance(key, str) else [key]
+        node = result
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if not isinstance(child, dict):
+                raise ValueError(f"键冲突: {key}")
+            node = child
+        if isinstance(node.get(parts[-1]), dict):
+            raise ValueError(f"键冲突: {key}")
+        node[parts[-1]] = value
+
+    if restore_lists:
+        # 先序收集所有嵌套层，再逆序处理，保证子层先于父层转换
+        order = []
+        pending: List[Tuple[Dict[Any, Any], Optional[Dict[Any, Any]], Any]] = [(result, None, None)]
+        while pending:
+            node, parent, key = pending.pop()
+            order.append((node, parent, key))
+            pending.extend((v, node, k) for k, v in node.items() if isinstance(v, dict))
+        for node, parent, key in reversed(order):
+            if parent is not None and node and node.keys() == set(map(str, range(len(node)))):
+                parent[key] = [node[str(i)] for i in range(len(node))]
+    return result
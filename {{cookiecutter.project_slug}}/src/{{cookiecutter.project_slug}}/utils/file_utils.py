@@ -1,11 +1,26 @@
 """文件处理相关工具函数。"""
 
+import fnmatch
+import heapq
 import json
 import os
 import pickle
+import sqlite3
+import tempfile
+import threading
 import yaml
+from array import array
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple,
+                    Optional, Sequence, Tuple, Union)
+
+from .data_utils import _new_hasher, hash_file
+
+# 符号链接处理策略：True跟随所有符号链接，False全部跳过，'files'只跟随指向文件的链接
+SymlinkPolicy = Union[bool, Literal['files']]
 
 
 def ensure_dir(directory: Union[str, Path]) -> Path:
@@ -100,6 +115,10 @@ def list_files(directory: Union[str, Path],
                recursive: bool = False) -> List[Path]:
     """列出目录中符合模式的所有文件。
 
+    只返回文件（包括指向文件的符号链接），不包含目录。只匹配文件名的模式基于 :func:`iter_files` 实现；
+    包含路径分隔符或 ``**`` 的模式沿用 ``Path.glob``/``Path.rglob`` 的语义。
+    大目录树请直接使用 :func:`iter_files` 以流式方式处理结果。
+
     Args:
         directory: 目录路径
         pattern: 匹配模式 (glob格式)
@@ -108,11 +127,247 @@ def list_files(directory: Union[str, Path],
     Returns:
         List[Path]: 文件路径列表
     """
-    path = Path(directory)
-    if recursive:
-        return list(path.rglob(pattern))
-    else:
-        return list(path.glob(pattern))
+    if "/" in pattern or os.sep in pattern or "**" in pattern:
+        path = Path(directory)
+        matches = path.rglob(pattern) if recursive else path.glob(pattern)
+        return [p for p in matches if p.is_file()]
+    # 与 Path.glob 一致：返回指向文件的符号链接，但不进入符号链接目录
+    return list(iter_files(directory, pattern, recursive=recursive, follow_symlinks='files'))
+
+
+def _to_timestamp(value: Union[None, float, datetime]) -> Optional[float]:
+    """将datetime或时间戳统一转换为时间戳。"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _match_segments(parts: Sequence[str], pat_parts: Sequence[str]) -> bool:
+    """按路径段匹配glob模式，``**`` 匹配零个或多个路径段。"""
+    if not pat_parts:
+        return not parts
+    head = pat_parts[0]
+    if head == "**":
+        return any(_match_segments(parts[i:], pat_parts[1:])
+                   for i in range(len(parts) + 1))
+    return (bool(parts) and fnmatch.fnmatchcase(parts[0], head)
+            and _match_segments(parts[1:], pat_parts[1:]))
+
+
+def _matches_any(name: str, rel_path: str, patterns: Sequence[str]) -> bool:
+    """判断文件是否匹配任一glob模式。
+
+    不含路径分隔符的模式只匹配文件名，否则按路径段匹配相对路径。
+    """
+    for pat in patterns:
+        if "/" not in pat:
+            if fnmatch.fnmatchcase(name, pat):
+                return True
+        elif _match_segments(rel_path.split("/"), pat.split("/")):
+            return True
+    return False
+
+
+def _scan_dir(dir_path: str,
+              depth: int,
+              follow_symlinks: SymlinkPolicy) -> Tuple[List[os.DirEntry], List[Tuple[str, int]]]:
+    """扫描单个目录，返回其中的文件和子目录。
+
+    返回的 ``os.DirEntry`` 会缓存类型和stat信息，调用方按需获取，避免额外的系统调用。
+    无权限或已被删除的目录会被静默跳过。
+
+    Args:
+        dir_path: 目录路径
+        depth: 当前目录深度（根目录为0）
+        follow_symlinks: 符号链接处理策略，见 :data:`SymlinkPolicy`
+
+    Returns:
+        Tuple: (文件列表, 子目录列表)
+    """
+    files: List[os.DirEntry] = []
+    subdirs: List[Tuple[str, int]] = []
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    is_link = entry.is_symlink()
+                    if is_link and not follow_symlinks:
+                        continue
+                    if entry.is_dir(follow_symlinks=bool(follow_symlinks)):
+                        if not (is_link and follow_symlinks == 'files'):
+                            subdirs.append((entry.path, depth + 1))
+                    elif entry.is_file(follow_symlinks=bool(follow_symlinks)):
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def _walk_dirs(root: str,
+               max_depth: Optional[int] = None,
+               follow_symlinks: SymlinkPolicy = False,
+               workers: Optional[int] = None,
+               dir_filter: Optional[Callable[[str], bool]] = None,
+               ) -> Iterator[Tuple[str, int, List[os.DirEntry]]]:
+    """基于 ``os.scandir`` 的流式目录遍历器，逐个目录产出其中的文件。
+
+    Args:
+        root: 根目录
+        max_depth: 最大递归深度，0表示只扫描根目录，None表示不限制
+        follow_symlinks: 符号链接处理策略，跟随符号链接目录时会记录已访问目录以避免循环
+        workers: 并行扫描子目录的线程数，None或1表示单线程
+        dir_filter: 子目录过滤函数，返回False时跳过整个子目录
+
+    Yields:
+        Tuple: (目录路径, 目录深度, 目录中的文件目录项列表)
+    """
+    visited = set()
+
+    def should_descend(path: str, depth: int) -> bool:
+        if max_depth is not None and depth > max_depth:
+            return False
+        if depth > 0 and dir_filter is not None and not dir_filter(path):
+            return False
+        if follow_symlinks is True:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            key = (st.st_dev, st.st_ino)
+            if key in visited:
+                return False
+            visited.add(key)
+        return True
+
+    if not should_descend(root, 0):
+        return
+
+    if not workers or workers <= 1:
+        stack = [(root, 0)]
+        while stack:
+            dir_path, depth = stack.pop()
+            files, subdirs = _scan_dir(dir_path, depth, follow_symlinks)
+            yield dir_path, depth, files
+            # 逆序入栈，保持与目录项顺序一致的深度优先遍历
+            for sub in reversed(subdirs):
+                if should_descend(*sub):
+                    stack.append(sub)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_dir, root, 0, follow_symlinks): (root, 0)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dir_path, depth = pending.pop(future)
+                files, subdirs = future.result()
+                for sub in subdirs:
+                    if should_descend(*sub):
+                        pending[executor.submit(_scan_dir, *sub, follow_symlinks)] = sub
+                yield dir_path, depth, files
+
+
+def _walk_tree(root: str,
+               max_depth: Optional[int] = None,
+               follow_symlinks: SymlinkPolicy = False,
+               workers: Optional[int] = None,
+               dir_filter: Optional[Callable[[str], bool]] = None) -> Iterator[os.DirEntry]:
+    """流式产出目录树中的所有文件目录项，参数含义见 :func:`_walk_dirs`。"""
+    for _, _, files in _walk_dirs(root, max_depth, follow_symlinks, workers, dir_filter):
+        yield from files
+
+
+def _iter_file_entries(directory: Union[str, Path],
+                       pattern: Union[str, Sequence[str]] = "*",
+                       recursive: bool = True,
+                       exclude: Optional[Sequence[str]] = None,
+                       max_depth: Optional[int] = None,
+                       min_size: Optional[int] = None,
+                       max_size: Optional[int] = None,
+                       modified_after: Union[None, float, datetime] = None,
+                       modified_before: Union[None, float, datetime] = None,
+                       follow_symlinks: SymlinkPolicy = False,
+                       workers: Optional[int] = None) -> Iterator[Tuple[os.DirEntry, str]]:
+    """按条件流式产出文件目录项及其相对路径，参数含义见 :func:`iter_files`。"""
+    root = os.fspath(directory)
+    includes = [pattern] if isinstance(pattern, str) else list(pattern)
+    excludes = list(exclude or [])
+    depth_limit = max_depth if recursive else 0
+    after = _to_timestamp(modified_after)
+    before = _to_timestamp(modified_before)
+    prefix_len = len(os.path.join(root, ""))
+
+    def relative(path: str) -> Tuple[str, str]:
+        rel_path = path[prefix_len:].replace(os.sep, "/")
+        return rel_path.rsplit("/", 1)[-1], rel_path
+
+    def keep_dir(path: str) -> bool:
+        return not _matches_any(*relative(path), excludes)
+
+    walker = _walk_tree(root, depth_limit, follow_symlinks, workers,
+                        keep_dir if excludes else None)
+    need_stat = any(v is not None for v in (min_size, max_size, after, before))
+    for entry in walker:
+        name, rel_path = relative(entry.path)
+        if not _matches_any(name, rel_path, includes):
+            continue
+        if excludes and _matches_any(name, rel_path, excludes):
+            continue
+        if need_stat:
+            try:
+                st = entry.stat(follow_symlinks=bool(follow_symlinks))
+            except OSError:
+                continue
+            if min_size is not None and st.st_size < min_size:
+                continue
+            if max_size is not None and st.st_size > max_size:
+                continue
+            if after is not None and st.st_mtime <= after:
+                continue
+            if before is not None and st.st_mtime >= before:
+                continue
+        yield entry, rel_path
+
+
+def iter_files(directory: Union[str, Path],
+               pattern: Union[str, Sequence[str]] = "*",
+               recursive: bool = True,
+               exclude: Optional[Sequence[str]] = None,
+               max_depth: Optional[int] = None,
+               min_size: Optional[int] = None,
+               max_size: Optional[int] = None,
+               modified_after: Union[None, float, datetime] = None,
+               modified_before: Union[None, float, datetime] = None,
+               follow_symlinks: SymlinkPolicy = False,
+               workers: Optional[int] = None) -> Iterator[Path]:
+    """流式遍历目录中符合条件的文件。
+
+    使用 ``os.scandir`` 实现，边遍历边产出结果，适合包含海量文件的目录树。
+    大小和修改时间过滤直接复用目录项的stat信息。
+
+    Args:
+        directory: 目录路径
+        pattern: 包含的glob模式，可以是单个模式或模式列表
+        recursive: 是否递归搜索子目录
+        exclude: 排除的glob模式列表，同时作用于文件和目录（匹配的目录整体跳过）
+        max_depth: 最大递归深度，0表示只搜索当前目录
+        min_size: 最小文件大小（字节）
+        max_size: 最大文件大小（字节）
+        modified_after: 只包含在此时间之后修改的文件
+        modified_before: 只包含在此时间之前修改的文件
+        follow_symlinks: 是否跟随符号链接，默认跳过符号链接；``'files'`` 只跟随指向文件的链接，
+            不进入符号链接目录
+        workers: 并行遍历子目录的线程数，None表示单线程遍历
+
+    Yields:
+        Path: 文件路径，并行遍历时不保证顺序
+    """
+    for entry, _ in _iter_file_entries(
+            directory, pattern, recursive, exclude, max_depth, min_size, max_size,
+            modified_after, modified_before, follow_symlinks, workers):
+        yield Path(entry.path)
 
 
 def get_file_size(file_path: Union[str, Path], unit: str = 'bytes') -> float:
@@ -126,14 +381,539 @@ def get_file_size(file_path: Union[str, Path], unit: str = 'bytes') -> float:
         float: 文件大小
     """
     size_bytes = os.path.getsize(file_path)
-
     if unit == 'bytes':
         return size_bytes
-    elif unit == 'KB':
-        return size_bytes / 1024
-    elif unit == 'MB':
-        return size_bytes / (1024 * 1024)
-    elif unit == 'GB':
-        return size_bytes / (1024 * 1024 * 1024)
-    else:
-        raise ValueError(f"不支持的单位: {unit}")
+    return size_bytes / _unit_divisor(unit)
+
+
+_SIZE_UNITS = {'bytes': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def _unit_divisor(unit: str) -> int:
+    """获取大小单位对应的字节数。"""
+    try:
+        return _SIZE_UNITS[unit]
+    except KeyError:
+        raise ValueError(f"不支持的单位: {unit}") from None
+
+
+def get_file_sizes(file_paths: Sequence[Union[str, Path]],
+                   unit: str = 'bytes',
+                   missing: Optional[float] = None) -> array:
+    """批量获取文件大小。
+
+    结果保存在紧凑的 ``array`` 中，避免为每个文件创建Python浮点对象列表。
+
+    Args:
+        file_paths: 文件路径序列
+        unit: 单位('bytes', 'KB', 'MB', 'GB')
+        missing: 文件不存在时使用的值，None表示抛出异常
+
+    Returns:
+        array: 文件大小数组，单位为bytes时类型码为'q'，否则为'd'
+    """
+    divisor = _unit_divisor(unit)
+    integral = divisor == 1 and (missing is None or isinstance(missing, int))
+    # 类型码在运行时决定，元素类型为int或float
+    sizes: array = array('q' if integral else 'd')
+    for file_path in file_paths:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            if missing is None:
+                raise
+            sizes.append(missing)
+            continue
+        sizes.append(size if divisor == 1 else size / divisor)
+    return sizes
+
+
+class DiskUsage:
+    """按目录聚合的磁盘占用统计结果。
+
+    采用列式存储：``paths`` 保存相对于根目录的目录路径（根目录为"."），
+    其余各列为与之对齐的 ``array``，数值均包含全部子目录。
+    """
+
+    def __init__(self, root: Path, paths: List[str], apparent_size: array,
+                 allocated_size: array, file_count: array):
+        self.root = root
+        self.paths = paths
+        self.apparent_size = apparent_size
+        self.allocated_size = allocated_size
+        self.file_count = file_count
+        self._index = {path: i for i, path in enumerate(paths)}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __repr__(self) -> str:
+        return (f"DiskUsage(root={str(self.root)!r}, dirs={len(self)}, "
+                f"apparent={self.total_apparent}, allocated={self.total_allocated})")
+
+    @property
+    def total_apparent(self) -> int:
+        """根目录的表观大小（文件内容字节数）。"""
+        return self.apparent_size[0] if self.paths else 0
+
+    @property
+    def total_allocated(self) -> int:
+        """根目录实际占用的磁盘空间。"""
+        return self.allocated_size[0] if self.paths else 0
+
+    def get(self, rel_dir: str, unit: str = 'bytes', allocated: bool = False) -> float:
+        """获取指定目录（含子目录）的占用大小。
+
+        Args:
+            rel_dir: 相对于根目录的目录路径，根目录为"."
+            unit: 单位('bytes', 'KB', 'MB', 'GB')
+            allocated: 是否返回实际分配的磁盘空间
+
+        Returns:
+            float: 目录大小
+        """
+        column = self.allocated_size if allocated else self.apparent_size
+        size = column[self._index[rel_dir.strip("/") or "."]]
+        return size if unit == 'bytes' else size / _unit_divisor(unit)
+
+    def top(self, n: int = 10, allocated: bool = False) -> List[Tuple[str, int]]:
+        """返回占用空间最大的n个目录。
+
+        Args:
+            n: 返回数量
+            allocated: 是否按实际分配的磁盘空间排序
+
+        Returns:
+            List[Tuple[str, int]]: (目录路径, 字节数) 列表
+        """
+        column = self.allocated_size if allocated else self.apparent_size
+        order = heapq.nlargest(n, range(len(self.paths)), key=column.__getitem__)
+        return [(self.paths[i], column[i]) for i in order]
+
+
+def disk_usage(directory: Union[str, Path],
+               follow_symlinks: bool = False,
+               dedup_hardlinks: bool = True,
+               max_depth: Optional[int] = None,
+               workers: Optional[int] = None) -> DiskUsage:
+    """一次遍历统计目录树中每个目录的磁盘占用。
+
+    Args:
+        directory: 根目录
+        follow_symlinks: 是否跟随符号链接
+        dedup_hardlinks: 是否按 (设备, inode) 对硬链接去重，只统计一次
+        max_depth: 最大递归深度，None表示不限制
+        workers: 并行遍历子目录的线程数，None表示单线程
+
+    Returns:
+        DiskUsage: 按目录聚合的列式统计结果
+    """
+    root = os.fspath(directory)
+    prefix_len = len(os.path.join(root, ""))
+    paths: List[str] = []
+    parents: List[int] = []
+    apparent = array('q')
+    allocated = array('q')
+    counts = array('q')
+    index: Dict[str, int] = {}
+    seen_inodes = set()
+
+    for dir_path, _, files in _walk_dirs(root, max_depth, follow_symlinks, workers):
+        rel_dir = dir_path[prefix_len:].replace(os.sep, "/") or "."
+        parent = rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else "."
+        # 子目录总是在父目录产出之后才会被扫描，因此父目录索引一定已存在
+        parents.append(-1 if rel_dir == "." else index[parent])
+        index[rel_dir] = len(paths)
+        paths.append(rel_dir)
+        dir_apparent = dir_allocated = dir_count = 0
+        for entry in files:
+            try:
+                st = entry.stat(follow_symlinks=follow_symlinks)
+            except OSError:
+                continue
+            if dedup_hardlinks and st.st_nlink > 1:
+                key = (st.st_dev, st.st_ino)
+                if key in seen_inodes:
+                    continue
+                seen_inodes.add(key)
+            dir_apparent += st.st_size
+            # st_blocks以512字节为单位；不支持的平台(Windows)退化为表观大小
+            blocks = getattr(st, "st_blocks", None)
+            dir_allocated += blocks * 512 if blocks is not None else st.st_size
+            dir_count += 1
+        apparent.append(dir_apparent)
+        allocated.append(dir_allocated)
+        counts.append(dir_count)
+
+    # 按深度从深到浅把子目录的统计累加到父目录
+    for i in sorted(range(1, len(paths)), key=lambda i: paths[i].count("/"), reverse=True):
+        p = parents[i]
+        apparent[p] += apparent[i]
+        allocated[p] += allocated[i]
+        counts[p] += counts[i]
+
+    return DiskUsage(Path(root), paths, apparent, allocated, counts)
+
+
+# 快照条目: (大小, 修改时间纳秒, inode)
+SnapshotEntry = Tuple[int, int, int]
+
+
+class DirectorySnapshot:
+    """目录快照索引，记录每个文件的路径、大小、修改时间和inode。
+
+    快照可以持久化为SQLite文件，下次运行时配合 :func:`diff_since`
+    只通过一次stat遍历即可找出新增、修改和删除的文件。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+        "CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER,"
+        " mtime_ns INTEGER, inode INTEGER) WITHOUT ROWID;"
+    )
+
+    def __init__(self, root: Union[str, Path],
+                 entries: Optional[Dict[str, SnapshotEntry]] = None,
+                 created_at: Optional[float] = None):
+        self.root = Path(root)
+        self.entries: Dict[str, SnapshotEntry] = entries if entries is not None else {}
+        self.created_at = created_at if created_at is not None else datetime.now().timestamp()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.entries
+
+    @classmethod
+    def scan(cls,
+             directory: Union[str, Path],
+             pattern: Union[str, Sequence[str]] = "*",
+             exclude: Optional[Sequence[str]] = None,
+             workers: Optional[int] = None) -> "DirectorySnapshot":
+        """遍历目录并生成快照。
+
+        Args:
+            directory: 目录路径
+            pattern: 包含的glob模式
+            exclude: 排除的glob模式列表
+            workers: 并行遍历的线程数
+
+        Returns:
+            DirectorySnapshot: 目录快照
+        """
+        snapshot = cls(directory)
+        entries = snapshot.entries
+        for entry, rel_path in _iter_file_entries(directory, pattern, exclude=exclude,
+                                                  workers=workers):
+            try:
+                st = entry.stat(follow_symlinks=False)
+                # Windows上DirEntry.stat()不填充st_ino，inode()会按需获取
+                entries[rel_path] = (st.st_size, st.st_mtime_ns, entry.inode())
+            except OSError:
+                continue
+        return snapshot
+
+    def save(self, index_file: Union[str, Path]) -> None:
+        """将快照保存为SQLite索引文件。
+
+        先写入同目录下的临时文件再原子替换，避免中断时损坏已有索引。
+
+        Args:
+            index_file: 索引文件路径
+        """
+        index_path = Path(index_file)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=index_path.name, suffix=".tmp",
+                                        dir=index_path.parent)
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(tmp_path)
+            try:
+                conn.executescript(self._SCHEMA)
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("root", str(self.root)),
+                    ("created_at", repr(self.created_at)),
+                ])
+                conn.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?)",
+                    ((path, *entry) for path, entry in self.entries.items()))
+                conn.commit()
+            finally:
+                conn.close()
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, index_file: Union[str, Path]) -> "DirectorySnapshot":
+        """从SQLite索引文件加载快照。
+
+        Args:
+            index_file: 索引文件路径
+
+        Returns:
+            DirectorySnapshot: 目录快照
+        """
+        if not Path(index_file).exists():
+            raise FileNotFoundError(f"快照索引不存在: {index_file}")
+        # as_uri会对路径中的 ?、#、% 等字符做百分号编码
+        conn = sqlite3.connect(f"{Path(index_file).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            entries = {path: (size, mtime_ns, inode) for path, size, mtime_ns, inode
+                       in conn.execute("SELECT path, size, mtime_ns, inode FROM files")}
+        finally:
+            conn.close()
+        return cls(meta["root"], entries, float(meta["created_at"]))
+
+
+class SnapshotDiff(NamedTuple):
+    """两次目录快照之间的差异。"""
+
+    added: List[Path]
+    modified: List[Path]
+    removed: List[Path]
+    current: DirectorySnapshot
+
+    @property
+    def changed(self) -> bool:
+        """是否存在任何变化。"""
+        return bool(self.added or self.modified or self.removed)
+
+
+def diff_since(snapshot: Union[DirectorySnapshot, str, Path],
+               directory: Optional[Union[str, Path]] = None,
+               pattern: Union[str, Sequence[str]] = "*",
+               exclude: Optional[Sequence[str]] = None,
+               workers: Optional[int] = None) -> SnapshotDiff:
+    """找出自某次快照以来新增、修改和删除的文件。
+
+    只进行一次stat遍历，通过比较大小、修改时间和inode判断文件是否修改。
+    返回结果中的 ``current`` 是本次遍历得到的新快照，可直接保存供下次使用。
+
+    Args:
+        snapshot: 旧快照对象或其索引文件路径
+        directory: 要比较的目录，默认为快照记录的根目录
+        pattern: 包含的glob模式
+        exclude: 排除的glob模式列表
+        workers: 并行遍历的线程数
+
+    Returns:
+        SnapshotDiff: (新增文件, 修改文件, 删除文件, 当前快照)
+    """
+    if not isinstance(snapshot, DirectorySnapshot):
+        snapshot = DirectorySnapshot.load(snapshot)
+    root = Path(directory) if directory is not None else snapshot.root
+
+    current = DirectorySnapshot.scan(root, pattern, exclude=exclude, workers=workers)
+    previous = snapshot.entries
+    added = []
+    modified = []
+    for rel_path, entry in current.entries.items():
+        old = previous.get(rel_path)
+        if old is None:
+            added.append(root / rel_path)
+        elif old != entry:
+            modified.append(root / rel_path)
+    removed = [root / rel_path for rel_path in previous
+               if rel_path not in current.entries]
+    return SnapshotDiff(added, modified, removed, current)
+
+
+class HashCache:
+    """持久化的文件哈希缓存，以 (设备, inode, 大小, 修改时间) 为键。
+
+    文件内容变化后修改时间或大小随之改变，缓存自动失效。缓存保存在SQLite中，
+    可在多次运行之间复用；所有方法都是线程安全的。
+    """
+
+    def __init__(self, cache_file: Union[str, Path]):
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes (dev INTEGER, inode INTEGER, size INTEGER,"
+            " mtime_ns INTEGER, kind TEXT, digest TEXT,"
+            " PRIMARY KEY (dev, inode, kind)) WITHOUT ROWID")
+
+    def get(self, st: os.stat_result, kind: str) -> Optional[str]:
+        """获取缓存的哈希值，文件已变化时返回None。
+
+        Args:
+            st: 文件的stat结果
+            kind: 哈希类型，包含算法和范围，例如 'blake2b:full'
+
+        Returns:
+            Optional[str]: 十六进制哈希值
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM hashes WHERE dev=? AND inode=? AND kind=?",
+                (st.st_dev, st.st_ino, kind)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        return None
+
+    def put(self, st: os.stat_result, kind: str, digest: str) -> None:
+        """写入哈希值。"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, kind, digest))
+
+    def close(self) -> None:
+        """提交并关闭缓存。"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DuplicateGroup(NamedTuple):
+    """一组内容完全相同的文件。"""
+
+    size: int
+    digest: str
+    paths: List[Path]
+
+
+def _partial_hash(file_path: str, size: int, block_size: int, algorithm: str) -> str:
+    """只读取文件首尾各一个块计算的廉价哈希。"""
+    hasher = _new_hasher(algorithm)
+    with open(file_path, 'rb') as f:
+        hasher.update(f.read(block_size))
+        if size > block_size:
+            f.seek(max(block_size, size - block_size))
+            hasher.update(f.read(block_size))
+    return hasher.hexdigest()
+
+
+def find_duplicates(directories: Union[str, Path, Sequence[Union[str, Path]]],
+                    pattern: Union[str, Sequence[str]] = "*",
+                    exclude: Optional[Sequence[str]] = None,
+                    min_size: int = 1,
+                    algorithm: str = 'blake2b',
+                    block_size: int = 64 * 1024,
+                    workers: Optional[int] = None,
+                    cache_file: Optional[Union[str, Path]] = None) -> Iterator[DuplicateGroup]:
+    """查找内容重复的文件，按组流式产出结果。
+
+    分三级筛选，尽量少读文件内容：
+
+    1. 按文件大小分组，大小唯一的文件直接排除；
+    2. 对同大小的文件计算首尾块的部分哈希；
+    3. 只对部分哈希仍然相同的文件计算完整哈希。
+
+    哈希计算在线程池中并行执行；指定 ``cache_file`` 时哈希结果会持久化，
+    未变化的文件在下次运行时无需重新读取。硬链接到同一inode的文件只计算一次，
+    并视为同一个文件。
+
+    Args:
+        directories: 一个或多个要扫描的目录
+        pattern: 包含的glob模式
+        exclude: 排除的glob模式列表
+        min_size: 参与比较的最小文件大小（字节），默认忽略空文件
+        algorithm: 哈希算法
+        block_size: 部分哈希读取的首尾块大小（字节）
+        workers: 哈希线程数
+        cache_file: 哈希缓存文件路径，None表示不使用缓存
+
+    Yields:
+        DuplicateGroup: (文件大小, 完整哈希值, 文件路径列表)
+    """
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+
+    # 第一级：按大小分组，同一inode只保留一个路径；stat结果不保留，
+    # 候选文件在计算哈希前重新stat，内存占用只与路径数量有关
+    by_size: Dict[int, Dict[Tuple[int, int], str]] = defaultdict(dict)
+    for directory in directories:
+        for entry, _ in _iter_file_entries(directory, pattern, exclude=exclude,
+                                           min_size=min_size):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            by_size[st.st_size].setdefault((st.st_dev, entry.inode()), entry.path)
+    candidates = {size: list(files.values())
+                  for size, files in by_size.items() if len(files) > 1}
+    del by_size
+
+    cache = HashCache(cache_file) if cache_file else None
+
+    def cached_hash(path: str, size: int, kind: str) -> Optional[str]:
+        """计算哈希，文件无法读取、已删除或大小已变化时返回None。"""
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            if st.st_size != size:
+                return None
+            digest = cache.get(st, f"{algorithm}:{kind}") if cache else None
+            if digest is None:
+                if kind == "full":
+                    digest = hash_file(path, algorithm)
+                else:
+                    digest = _partial_hash(path, size, block_size, algorithm)
+                if cache:
+                    cache.put(st, f"{algorithm}:{kind}", digest)
+            return digest
+        except OSError:
+            return None
+
+    def group_by(paths: List[str],
+                 digests: Iterable[Optional[str]]) -> List[Tuple[str, List[str]]]:
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for path, digest in zip(paths, digests):
+            if digest is not None:
+                groups[digest].append(path)
+        return [(digest, group) for digest, group in groups.items() if len(group) > 1]
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # 第二级：部分哈希；不超过两个块的文件部分哈希已覆盖全部内容，直接计算完整哈希
+        buckets: List[Tuple[int, List[str]]] = []
+        partials = []
+        for size, paths in candidates.items():
+            if size <= 2 * block_size:
+                buckets.append((size, paths))
+            else:
+                partials.append((size, paths, [executor.submit(cached_hash, p, size, "partial")
+                                               for p in paths]))
+        for size, paths, futures in partials:
+            digests = [f.result() for f in futures]
+            buckets.extend((size, group) for _, group in group_by(paths, digests))
+
+        # 第三级：完整哈希，每个分组的全部文件完成后立即产出结果；
+        # 不超过一个块的小文件直接在当前线程计算，省去线程调度开销
+        pending: Dict[Future, Tuple[int, List[str], List[Future]]] = {}
+        for size, paths in buckets:
+            if size <= block_size:
+                digests = [cached_hash(p, size, "full") for p in paths]
+                for digest, group in group_by(paths, digests):
+                    yield DuplicateGroup(size, digest, [Path(p) for p in group])
+                continue
+            futures = [executor.submit(cached_hash, p, size, "full") for p in paths]
+            for future in futures:
+                pending[future] = (size, paths, futures)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                size, paths, futures = pending.pop(future)
+                if any(f in pending for f in futures):
+                    continue
+                digests = [f.result() for f in futures]
+                for digest, group in group_by(paths, digests):
+                    yield DuplicateGroup(size, digest, [Path(p) for p in group])
+    finally:
+        # 提前关闭生成器时取消排队中的哈希任务，但要等正在执行的任务写完缓存后再关闭缓存
+        executor.shutdown(wait=True, cancel_futures=True)
+        if cache:
+            cache.close()
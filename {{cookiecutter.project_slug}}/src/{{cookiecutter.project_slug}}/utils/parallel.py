@@ -0,0 +1,321 @@
+"""并行执行相关工具函数。"""
+
+import asyncio
+import inspect
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from .data_utils import chunked
+
+# 支持的执行后端
+PARALLEL_BACKENDS = ('thread', 'process', 'asyncio')
+# 长度未知时进程后端的默认块大小，用于摊薄进程间通信的开销
+_DEFAULT_PROCESS_CHUNKSIZE = 16
+# 设置超时时轮询任务状态的最长间隔（秒）
+_TIMEOUT_POLL_INTERVAL = 0.05
+
+
+def _default_workers(backend: str) -> int:
+    cpus = os.cpu_count() or 1
+    if backend == 'process':
+        return cpus
+    if backend == 'asyncio':
+        return 64
+    # 与ThreadPoolExecutor的默认值一致
+    return min(32, cpus + 4)
+
+
+def _auto_chunksize(backend: str, total: Optional[int], workers: int) -> int:
+    """计算默认块大小：已知长度时保证每个工作者约分到4个块。"""
+    if backend == 'asyncio':
+        return 1
+    if total is None:
+        return _DEFAULT_PROCESS_CHUNKSIZE if backend == 'process' else 1
+    return max(1, math.ceil(total / (workers * 4)))
+
+
+def _run_chunk(func: Callable[[Any], Any], chunk: Iterable[Any]) -> List[Any]:
+    return [func(item) for item in chunk]
+
+
+async def _run_chunk_async(func: Callable[[Any], Any], chunk: Iterable[Any],
+                           timeout: Optional[float]) -> List[Any]:
+    results = []
+    for item in chunk:
+        result = func(item)
+        if inspect.isawaitable(result):
+            try:
+                result = await asyncio.wait_for(result, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"任务超过 {timeout} 秒未完成") from None
+        results.append(result)
+    return results
+
+
+class _Task:
+    """一个已提交的块及其计时信息。"""
+
+    __slots__ = ('future', 'size', 'started')
+
+    def __init__(self, future: Any, size: int):
+        self.future = future
+        self.size = size
+        self.started: Optional[float] = None
+
+
+def imap(func: Callable[[Any], Any],
+         iterable: Iterable[Any],
+         backend: str = 'thread',
+         workers: Optional[int] = None,
+         chunksize: Optional[int] = None,
+         ordered: bool = True,
+         max_in_flight: Optional[int] = None,
+         timeout: Optional[float] = None,
+         progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[Any]:
+    """并行地对每个元素调用函数，并以迭代器形式惰性返回结果。
+
+    输入按块提交，同时处于执行中的块数不超过 ``max_in_flight``，因此输入迭代器只会被
+    按需读取，结果缓冲也有上限。提前停止迭代时会取消尚未开始的任务。
+
+    Args:
+        func: 要调用的函数；``process`` 后端要求可pickle，``asyncio`` 后端通常为协程函数。
+            在已有运行中事件循环的线程（例如协程）中使用 ``asyncio`` 后端时，协程在辅助线程的
+            独立事件循环中执行，调用方的事件循环会被阻塞到结果返回，协程也不能使用绑定到
+            调用方事件循环的对象；异步代码中应优先直接使用 ``asyncio.gather`` 等接口
+        iterable: 输入的可迭代对象
+        backend: 执行后端，'thread'、'process' 或 'asyncio'
+        workers: 线程数、进程数或asyncio的最大并发协程数，默认按后端自动选择
+        chunksize: 每个任务包含的元素数量；默认在已知长度时取 ``ceil(n / (workers * 4))``，
+            长度未知时线程后端为1、进程后端为16；asyncio后端固定为1
+        ordered: 是否按输入顺序返回结果；为False时按完成顺序返回
+        max_in_flight: 最多同时提交的块数，默认为 ``workers * 2``（asyncio为 ``workers``）
+        timeout: 单个元素的超时秒数，块的超时为 ``timeout × 块大小``，从任务开始运行时计时；
+            线程和进程中已开始运行的任务无法被中断，只会被放弃
+        progress: 进度回调，每完成一个块调用一次，参数为已完成的元素数和总数（未知时为None）
+
+    Returns:
+        Iterator[Any]: 函数返回值的迭代器；任务中的异常和超时在迭代到对应结果时抛出
+
+    Raises:
+        ValueError: 参数无效
+    """
+    if backend not in PARALLEL_BACKENDS:
+        raise ValueError(f"不支持的并行后端: {backend}")
+    workers = workers or _default_workers(backend)
+    total = len(iterable) if isinstance(iterable, Sized) else None
+    if backend == 'asyncio':
+        chunksize = 1
+    elif chunksize is None:
+        chunksize = _auto_chunksize(backend, total, workers)
+    if max_in_flight is None:
+        max_in_flight = workers if backend == 'asyncio' else workers * 2
+    chunks = chunked(iterable, chunksize)
+    if backend == 'asyncio':
+        return _imap_asyncio(func, chunks, ordered, max_in_flight, timeout, progress, total)
+    executor_class = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+    return _imap_executor(executor_class(max_workers=workers), func, chunks, ordered,
+                          max_in_flight, timeout, progress, total)
+
+
+def _imap_executor(executor, func, chunks, ordered, max_in_flight, timeout, progress, total):
+    try:
+        yield from _drive(
+            submit=lambda chunk: executor.submit(_run_chunk, func, chunk),
+            wait_any=lambda futures, poll: wait(futures, poll, FIRST_COMPLETED)[0],
+            chunks=chunks, ordered=ordered, max_in_flight=max_in_flight,
+            timeout=timeout, progress=progress, total=total)
+    finally:
+        # 正常结束时所有任务均已完成；出错或提前停止时不等待仍在运行的任务
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _imap_asyncio(func, chunks, ordered, max_in_flight, timeout, progress, total):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        yield from _imap_asyncio_local(func, chunks, ordered, max_in_flight, timeout, progress, total)
+    else:
+        # 当前线程的事件循环正在运行，无法在其中调用 run_until_complete
+        yield from _imap_asyncio_thread(func, chunks, ordered, max_in_flight, timeout, progress, total)
+
+
+def _imap_asyncio_local(func, chunks, ordered, max_in_flight, timeout, progress, total):
+    """在当前线程中创建事件循环，每次等待时驱动它运行。"""
+    loop = asyncio.new_event_loop()
+    tasks = []
+
+    def submit(chunk):
+        task = loop.create_task(_run_chunk_async(func, chunk, timeout))
+        tasks.append(task)
+        return task
+
+    def wait_any(futures, poll):
+        done, _ = loop.run_until_complete(
+            asyncio.wait(futures, timeout=poll, return_when=asyncio.FIRST_COMPLETED))
+        tasks[:] = [task for task in tasks if not task.done()]
+        return done
+
+    try:
+        # 超时由 asyncio.wait_for 在协程内部处理，无需轮询
+        yield from _drive(submit, wait_any, chunks, ordered, max_in_flight,
+                          None, progress, total)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+
+async def _cancel_pending_tasks() -> None:
+    """取消事件循环中除自身以外的所有任务并等待其结束。"""
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _imap_asyncio_thread(func, chunks, ordered, max_in_flight, timeout, progress, total):
+    """在辅助线程中运行独立的事件循环，通过线程安全的future提交和等待任务。"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="imap-asyncio", daemon=True)
+    thread.start()
+    try:
+        yield from _drive(
+            submit=lambda chunk: asyncio.run_coroutine_threadsafe(
+                _run_chunk_async(func, chunk, timeout), loop),
+            wait_any=lambda futures, poll: wait(futures, poll, FIRST_COMPLETED)[0],
+            chunks=chunks, ordered=ordered, max_in_flight=max_in_flight,
+            timeout=None, progress=progress, total=total)
+    finally:
+        asyncio.run_coroutine_threadsafe(_cancel_pending_tasks(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def _drive(submit: Callable[[Any], Any],
+           wait_any: Callable[[List[Any], Optional[float]], Any],
+           chunks: Iterator[Any],
+           ordered: bool,
+           max_in_flight: int,
+           timeout: Optional[float],
+           progress: Optional[Callable[[int, Optional[int]], None]],
+           total: Optional[int]) -> Iterator[Any]:
+    """提交块、等待完成并产出结果的通用调度循环。"""
+    in_flight: deque = deque()
+    chunks = iter(chunks)
+    exhausted = False
+    completed = 0
+    poll = None if timeout is None else min(timeout, _TIMEOUT_POLL_INTERVAL)
+    try:
+        while True:
+            # 背压：只在执行中的块数低于上限时才继续读取输入
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    in_flight.append(_Task(submit(chunk), len(chunk)))
+            if not in_flight:
+                return
+
+            targets = [in_flight[0].future] if ordered else [t.future for t in in_flight]
+            done = wait_any(targets, poll)
+            if timeout is not None:
+                _check_timeouts(in_flight, timeout)
+            if not done:
+                continue
+
+            if ordered:
+                finished = [in_flight.popleft()]
+            else:
+                finished = [task for task in in_flight if task.future in done]
+                for task in finished:
+                    in_flight.remove(task)
+            for task in finished:
+                results = task.future.result()
+                completed += task.size
+                if progress is not None:
+                    progress(completed, total)
+                yield from results
+    finally:
+        for task in in_flight:
+            task.future.cancel()
+
+
+def _check_timeouts(in_flight: deque, timeout: float) -> None:
+    """记录任务开始运行的时间，并在任务运行超时时抛出TimeoutError。"""
+    now = time.monotonic()
+    for task in in_flight:
+        future = task.future
+        if task.started is None:
+            if future.running() or future.done():
+                task.started = now
+        elif not future.done() and now - task.started > timeout * task.size:
+            raise TimeoutError(f"任务超过 {timeout * task.size:g} 秒未完成")
+
+
+def imap_unordered(func: Callable[[Any], Any],
+                   iterable: Iterable[Any],
+                   backend: str = 'thread',
+                   workers: Optional[int] = None,
+                   chunksize: Optional[int] = None,
+                   max_in_flight: Optional[int] = None,
+                   timeout: Optional[float] = None,
+                   progress: Optional[Callable[[int, Optional[int]], None]] = None
+                   ) -> Iterator[Any]:
+    """与 :func:`imap` 相同，但按完成顺序返回结果。
+
+    Args:
+        func: 要调用的函数
+        iterable: 输入的可迭代对象
+        backend: 执行后端，'thread'、'process' 或 'asyncio'
+        workers: 线程数、进程数或最大并发协程数
+        chunksize: 每个任务包含的元素数量
+        max_in_flight: 最多同时提交的块数
+        timeout: 单个元素的超时秒数
+        progress: 进度回调
+
+    Returns:
+        Iterator[Any]: 按完成顺序产出函数返回值的迭代器
+    """
+    return imap(func, iterable, backend, workers, chunksize, False,
+                max_in_flight, timeout, progress)
+
+
+def pmap(func: Callable[[Any], Any],
+         iterable: Iterable[Any],
+         backend: str = 'thread',
+         workers: Optional[int] = None,
+         chunksize: Optional[int] = None,
+         ordered: bool = True,
+         max_in_flight: Optional[int] = None,
+         timeout: Optional[float] = None,
+         progress: Optional[Callable[[int, Optional[int]], None]] = None) -> List[Any]:
+    """并行地对每个元素调用函数，并返回结果列表。
+
+    参数含义与 :func:`imap` 相同。
+
+    Args:
+        func: 要调用的函数
+        iterable: 输入的可迭代对象
+        backend: 执行后端，'thread'、'process' 或 'asyncio'
+        workers: 线程数、进程数或最大并发协程数
+        chunksize: 每个任务包含的元素数量
+        ordered: 是否按输入顺序返回结果
+        max_in_flight: 最多同时提交的块数
+        timeout: 单个元素的超时秒数
+        progress: 进度回调
+
+    Returns:
+        List[Any]: 结果列表
+    """
+    return list(imap(func, iterable, backend, workers, chunksize, ordered,
+                     max_in_flight, timeout, progress))
@@ -0,0 +1,280 @@
+"""性能分析相关工具函数。"""
+
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union, cast
+
+# 支持的分析模式
+PROFILE_MODES = ('cprofile', 'sampling')
+# 排序字段到 FunctionStats 字段下标的映射
+_SORT_FIELDS = {'cumulative': 4, 'tottime': 3, 'calls': 2}
+# 由调用图展开折叠栈时的最大深度，防止病态调用图导致输出膨胀
+_MAX_COLLAPSED_DEPTH = 256
+
+# pstats中的函数键：(文件名, 行号, 函数名)
+_FuncKey = Tuple[str, int, str]
+# pstats中的统计行：(原始调用次数, 调用次数, 自身耗时, 总耗时, 调用者)
+_StatRow = Tuple[int, int, float, float, Dict[_FuncKey, Tuple[int, int, float, float]]]
+
+
+class FunctionStats(NamedTuple):
+    """单个函数的耗时统计。"""
+
+    name: str
+    location: str
+    calls: int
+    self_time: float
+    total_time: float
+
+
+def _label(key: _FuncKey) -> str:
+    """折叠栈中的帧名称，分号是折叠格式的分隔符，需要替换。"""
+    filename, line, name = key
+    if filename == '~':
+        # 内置函数，例如 <built-in method time.sleep>
+        return name.replace(';', ',')
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ',')
+
+
+def _raw_stats(stats: pstats.Stats) -> Dict[_FuncKey, _StatRow]:
+    """返回 ``pstats.Stats`` 的原始统计表（类型存根中没有声明该属性）。"""
+    return cast(Dict[_FuncKey, _StatRow], vars(stats)['stats'])
+
+
+def _location(key: _FuncKey) -> str:
+    filename, line, _ = key
+    return filename if filename == '~' else f"{filename}:{line}"
+
+
+def top_functions(stats: Union[pstats.Stats, str, Path],
+                  limit: int = 20,
+                  sort: str = 'cumulative') -> List[FunctionStats]:
+    """汇总最耗时的函数。
+
+    Args:
+        stats: ``pstats.Stats`` 对象或pstats文件路径
+        limit: 返回的函数数量
+        sort: 排序字段，'cumulative'（含子调用的总耗时）、'tottime'（自身耗时）或 'calls'
+
+    Returns:
+        List[FunctionStats]: 按排序字段降序排列的函数统计
+
+    Raises:
+        ValueError: 不支持的排序字段
+    """
+    if not isinstance(stats, pstats.Stats):
+        stats = pstats.Stats(str(stats))
+    rows = [FunctionStats(key[2], _location(key), nc, tt, ct)
+            for key, (_, nc, tt, ct, _) in _raw_stats(stats).items()]
+    return _sort_rows(rows, limit, sort)
+
+
+def _sort_rows(rows: List[FunctionStats], limit: int, sort: str) -> List[FunctionStats]:
+    if sort not in _SORT_FIELDS:
+        raise ValueError(f"不支持的排序字段: {sort}")
+    index = _SORT_FIELDS[sort]
+    rows.sort(key=lambda row: row[index], reverse=True)
+    return rows[:limit]
+
+
+def collapse_stats(stats: pstats.Stats) -> Dict[str, int]:
+    """由cProfile的调用图推导折叠栈，值为自身耗时（微秒）。
+
+    cProfile只记录调用者和被调用者之间的边，因此每条边的耗时按比例分摊到完整调用路径上，
+    结果是近似的火焰图，可直接交给 flamegraph.pl 或 speedscope 渲染。
+
+    Args:
+        stats: ``pstats.Stats`` 对象
+
+    Returns:
+        Dict[str, int]: 分号分隔的调用栈到耗时的映射
+    """
+    raw = _raw_stats(stats)
+    callees: Dict[_FuncKey, Dict[_FuncKey, float]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    collapsed: Counter = Counter()
+    # 显式栈：(函数, 分摊到本路径的总耗时, 调用路径上的函数, 路径标签)
+    pending: List[Tuple[_FuncKey, float, Tuple[_FuncKey, ...], str]] = [
+        (func, raw[func][3], (func,), _label(func)) for func in roots]
+    while pending:
+        func, budget, path, label = pending.pop()
+        _, _, tt, ct, _ = raw[func]
+        if ct <= 0:
+            continue
+        scale = budget / ct
+        self_us = int(tt * scale * 1e6)
+        if self_us:
+            collapsed[label] += self_us
+        if len(path) >= _MAX_COLLAPSED_DEPTH:
+            continue
+        for callee, edge_time in callees.get(func, {}).items():
+            child_budget = edge_time * scale
+            # 递归调用已经计入路径上的祖先，小于1微秒的分支直接忽略
+            if callee in path or child_budget < 1e-6:
+                continue
+            pending.append((callee, child_budget, path + (callee,),
+                            f"{label};{_label(callee)}"))
+    return dict(collapsed)
+
+
+class Profiler:
+    """性能分析器，可作为上下文管理器或装饰器使用。
+
+    ``cprofile`` 模式使用确定性的cProfile，写出pstats文件和由调用图推导的折叠栈；
+    ``sampling`` 模式在后台线程中定期读取 ``sys._current_frames()``，开销很低、
+    适合长时间运行的任务，只写出折叠栈。
+
+    Args:
+        output: 输出文件的路径前缀，生成 ``<output>.pstats`` 和 ``<output>.collapsed``；
+            为None时不写文件
+        mode: 分析模式，'cprofile' 或 'sampling'
+        interval: 采样模式的采样间隔（秒）
+        all_threads: 采样模式下是否采集所有线程，默认只采集启动分析的线程
+    """
+
+    def __init__(self,
+                 output: Optional[Union[str, Path]] = None,
+                 mode: str = 'cprofile',
+                 interval: float = 0.005,
+                 all_threads: bool = False):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的分析模式: {mode}")
+        self.output = Path(output) if output is not None else None
+        self.mode = mode
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stats: Optional[pstats.Stats] = None
+        self.samples: Counter = Counter()
+        self.elapsed = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._started = 0.0
+
+    def start(self) -> "Profiler":
+        """开始分析。"""
+        self._started = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self.samples = Counter()
+            self._stop_event.clear()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, args=(threading.get_ident(),),
+                name='profiler-sampler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self) -> "Profiler":
+        """停止分析，并在指定了输出路径时写出结果文件。"""
+        if self._profile is not None:
+            self._profile.disable()
+            self.stats = pstats.Stats(self._profile)
+            self._profile = None
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+        self.elapsed = time.perf_counter() - self._started
+        if self.output is not None:
+            self.save(self.output)
+        return self
+
+    def _sample_loop(self, target: int) -> None:
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, top in sys._current_frames().items():
+                if thread_id == own or (not self.all_threads and thread_id != target):
+                    continue
+                stack = []
+                frame: Optional[FrameType] = top
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_label((code.co_filename, code.co_firstlineno, code.co_name)))
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> Dict[str, int]:
+        """返回折叠栈：采样模式下值为采样次数，cProfile模式下为微秒。"""
+        if self.mode == 'sampling':
+            return dict(self.samples)
+        return collapse_stats(self.stats) if self.stats is not None else {}
+
+    def top(self, limit: int = 20, sort: str = 'cumulative') -> List[FunctionStats]:
+        """汇总最耗时的函数。
+
+        采样模式下的耗时由采样次数乘以采样间隔估算，调用次数为采样次数。
+
+        Args:
+            limit: 返回的函数数量
+            sort: 排序字段，'cumulative'、'tottime' 或 'calls'
+
+        Returns:
+            List[FunctionStats]: 函数统计
+        """
+        if self.mode == 'cprofile':
+            return top_functions(self.stats, limit, sort) if self.stats is not None else []
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        rows = [FunctionStats(frame, '', total, self_counts[frame] * self.interval,
+                              total * self.interval)
+                for frame, total in total_counts.items()]
+        return _sort_rows(rows, limit, sort)
+
+    def save(self, output: Union[str, Path]) -> List[Path]:
+        """写出结果文件。
+
+        Args:
+            output: 输出文件的路径前缀
+
+        Returns:
+            List[Path]: 写出的文件路径
+        """
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self.stats is not None:
+            pstats_path = output.with_name(output.name + '.pstats')
+            self.stats.dump_stats(str(pstats_path))
+            written.append(pstats_path)
+        collapsed_path = output.with_name(output.name + '.collapsed')
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for stack, value in sorted(self.collapsed().items()):
+                f.write(f"{stack} {value}\n")
+        written.append(collapsed_path)
+        return written
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __call__(self, func: Callable) -> Callable:
+        """作为装饰器使用，每次调用都重新分析并覆盖输出文件。"""
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return func(*args, **kwargs)
+
+        return wrapper
@@ -0,0 +1,102 @@
+"""变更日志脚本测试。"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import generate_changelog  # noqa: E402
+
+
+def python_cmd(code):
+    """构造执行一段Python代码的命令，代替git产生输出。"""
+    return [sys.executable, "-c", code]
+
+
+def test_stream_git_records_large_stderr():
+    """测试标准错误超过管道缓冲区时不会阻塞。"""
+    cmd = python_cmd(
+        "import sys\n"
+        "sys.stderr.write('warning\\n' * 100000)\n"
+        "sys.stderr.flush()\n"
+        "sys.stdout.write('a\\x1eb\\x1ec')\n"
+    )
+    assert list(generate_changelog.stream_git_records(cmd, "\x1e")) == ["a", "b", "c"]
+
+
+def test_stream_git_records_chunk_boundaries(monkeypatch):
+    """测试记录和多字符分隔符跨越读取块时仍能正确切分。"""
+    monkeypatch.setattr(generate_changelog, "STREAM_CHUNK_SIZE", 3)
+    cmd = python_cmd("import sys; sys.stdout.write('first<=>second record<=><=>last')")
+    records = list(generate_changelog.stream_git_records(cmd, "<=>"))
+    assert records == ["first", "second record", "", "last"]
+
+    cmd = python_cmd("import sys; sys.stdout.write('x\\ny\\n')")
+    assert list(generate_changelog.stream_git_records(cmd, "\n")) == ["x", "y"]
+
+
+def test_stream_git_records_failure():
+    """测试命令失败时抛出带标准错误内容的CalledProcessError。"""
+    cmd = python_cmd("import sys; sys.stderr.write('bad revision'); sys.exit(128)")
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        list(generate_changelog.stream_git_records(cmd, "\n"))
+    assert exc_info.value.returncode == 128
+    assert exc_info.value.stderr == "bad revision"
+
+
+def test_git_cache_nested_path(temp_dir):
+    """测试缓存文件位于尚不存在的子目录时，首次保存（追加路径）也能成功。"""
+    cache_file = temp_dir / ".cache" / "changelog" / "commits.jsonl"
+    cache = generate_changelog.GitCache(str(cache_file))
+    cache.add_commit("a1", {"hash": "a1", "title": "first"})
+    cache.save_cache()
+    assert cache_file.read_bytes().count(b"\n") == 1
+
+    cache = generate_changelog.GitCache(str(cache_file))
+    assert cache.get_commit("a1")["title"] == "first"
+    cache.add_commit("b2", {"hash": "b2", "title": "second"})
+    cache.set_meta("releases", {"b2": "v1.0"})
+    cache.save_cache()
+    assert cache.get_commit("b2")["title"] == "second"
+
+    cache = generate_changelog.GitCache(str(cache_file))
+    assert len(cache) == 2
+    assert cache.get_commit("a1")["title"] == "first"
+    assert cache.get_commit("b2")["title"] == "second"
+    assert cache.meta["releases"] == {"b2": "v1.0"}
+
+
+def test_git_cache_rewrite(temp_dir):
+    """测试覆盖已有条目并压缩重写后，索引仍指向正确的内容。"""
+    cache_file = temp_dir / "commits.jsonl"
+    cache = generate_changelog.GitCache(str(cache_file))
+    for i in range(5):
+        cache.add_commit(f"c{i}", {"hash": f"c{i}", "title": f"v1 {i}"})
+    cache.save_cache()
+
+    cache = generate_changelog.GitCache(str(cache_file))
+    cache.add_commit("c3", {"hash": "c3", "title": "v2 3"})
+    cache._needs_rewrite = True
+    cache.save_cache()
+    assert cache_file.read_bytes().count(b"\n") == 5
+    assert cache.get_commit("c4")["title"] == "v1 4"
+
+    cache = generate_changelog.GitCache(str(cache_file))
+    assert [cache.get_commit(f"c{i}")["title"] for i in range(5)] == \
+        ["v1 0", "v1 1", "v1 2", "v2 3", "v1 4"]
+
+
+def test_load_template_retries_after_failure(temp_dir):
+    """测试模板加载失败不会被缓存，修复后再次调用即可加载。"""
+    template_file = temp_dir / "changelog.md.j2"
+    assert generate_changelog.load_template(str(template_file)) is None
+
+    pytest.importorskip("jinja2")
+    # 拼接字符串，避免生成项目时被cookiecutter渲染
+    template_file.write_text("## {" + "{ version }" + "}\n", encoding="utf-8")
+    template = generate_changelog.load_template(str(template_file))
+    assert template.render(version="1.0") == "## 1.0\n"
+    assert generate_changelog.load_template(str(template_file)) is template
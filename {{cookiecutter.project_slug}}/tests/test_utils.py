@@ -98,6 +98,69 @@ def test_list_files(temp_dir):
     assert len(files) == 3
     assert set(f.name for f in files) == {"file1.txt", "file2.txt", "file3.txt"}
 
+    # 含路径的模式与 Path.glob/rglob 一致
+    assert list_files(temp_dir, "subdir/*.txt") == [file3]
+    assert set(list_files(temp_dir, "**/*.txt")) == {file1, file2, file3}
+    nested = temp_dir / "a" / "subdir" / "file4.txt"
+    ensure_dir(nested.parent)
+    nested.touch()
+    assert set(list_files(temp_dir, "subdir/*.txt", recursive=True)) == {file3, nested}
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="平台不支持符号链接")
+def test_list_files_symlinks(temp_dir):
+    """测试两种模式都返回指向文件的符号链接，且不进入符号链接目录。"""
+    from {{cookiecutter.project_slug}}.utils.file_utils import ensure_dir, list_files
+
+    target = temp_dir / "x.txt"
+    target.touch()
+    link = temp_dir / "link.txt"
+    try:
+        link.symlink_to(target)
+    except OSError:
+        pytest.skip("无法创建符号链接")
+    ensure_dir(temp_dir / "real")
+    (temp_dir / "real" / "inner.txt").touch()
+    (temp_dir / "linked_dir").symlink_to(temp_dir / "real", target_is_directory=True)
+
+    expected = {target, link, temp_dir / "real" / "inner.txt"}
+    assert set(list_files(temp_dir, "*.txt", recursive=True)) == expected
+    assert set(list_files(temp_dir, "**/*.txt")) == expected
+    assert set(list_files(temp_dir, "*.txt")) == {target, link}
+
+
+def test_iter_files_filters(temp_dir):
+    """测试流式文件遍历及过滤条件。"""
+    from {{cookiecutter.project_slug}}.utils.file_utils import ensure_dir, iter_files
+
+    ensure_dir(temp_dir / "a" / "b")
+    ensure_dir(temp_dir / "build")
+    (temp_dir / "top.txt").write_text("x")
+    (temp_dir / "big.dat").write_bytes(b"0" * 2048)
+    (temp_dir / "a" / "mid.txt").write_text("xx")
+    (temp_dir / "a" / "b" / "deep.txt").write_text("xxx")
+    (temp_dir / "build" / "out.txt").write_text("x")
+
+    names = {p.name for p in iter_files(temp_dir, "*.txt")}
+    assert names == {"top.txt", "mid.txt", "deep.txt", "out.txt"}
+
+    # 深度限制与排除目录
+    names = {p.name for p in iter_files(temp_dir, "*.txt", max_depth=1, exclude=["build"])}
+    assert names == {"top.txt", "mid.txt"}
+
+    # 相对路径模式与多个包含模式
+    names = {p.name for p in iter_files(temp_dir, ["a/*.txt", "*.dat"])}
+    assert names == {"mid.txt", "big.dat"}
+
+    # 大小过滤
+    assert [p.name for p in iter_files(temp_dir, min_size=1024)] == ["big.dat"]
+    assert "big.dat" not in {p.name for p in iter_files(temp_dir, max_size=1024)}
+
+    # 并行遍历结果与单线程一致
+    serial = set(iter_files(temp_dir))
+    assert set(iter_files(temp_dir, workers=4)) == serial
+    assert len(serial) == 5
+
 
 def test_get_file_size(temp_dir):
     """测试获取文件大小。"""
@@ -117,6 +180,188 @@ def test_get_file_size(temp_dir):
         get_file_size(test_file, "invalid_unit")
 
 
+def test_get_file_sizes(temp_dir):
+    """测试批量获取文件大小。"""
+    from {{cookiecutter.project_slug}}.utils.file_utils import get_file_sizes
+
+    a = temp_dir / "a.dat"
+    b = temp_dir / "b.dat"
+    a.write_bytes(b"0" * 1024)
+    b.write_bytes(b"0" * 2048)
+
+    assert list(get_file_sizes([a, b])) == [1024, 2048]
+    assert list(get_file_sizes([a, b], "KB")) == [1.0, 2.0]
+    assert list(get_file_sizes([a, temp_dir / "missing"], missing=0)) == [1024, 0]
+
+    with pytest.raises(FileNotFoundError):
+        get_file_sizes([temp_dir / "missing"])
+
+
+def test_disk_usage(temp_dir):
+    """测试按目录聚合磁盘占用。"""
+    import os
+
+    from {{cookiecutter.project_slug}}.utils.file_utils import disk_usage
+
+    (temp_dir / "a" / "b").mkdir(parents=True)
+    (temp_dir / "root.dat").write_bytes(b"0" * 100)
+    (temp_dir / "a" / "one.dat").write_bytes(b"0" * 200)
+    (temp_dir / "a" / "b" / "two.dat").write_bytes(b"0" * 300)
+    os.link(temp_dir / "a" / "b" / "two.dat", temp_dir / "a" / "link.dat")
+
+    usage = disk_usage(temp_dir)
+    assert sorted(usage.paths) == [".", "a", "a/b"]
+    # 硬链接只统计一次
+    assert usage.total_apparent == 600
+    assert usage.get("a") == 500
+    assert usage.get("a/b", unit="KB") <= 300 / 1024
+    assert usage.file_count[usage.paths.index(".")] == 3
+    assert usage.top(1) == [(".", 600)]
+    assert usage.total_allocated >= 0
+
+    assert disk_usage(temp_dir, dedup_hardlinks=False).total_apparent == 900
+    assert disk_usage(temp_dir, workers=3).get("a") == usage.get("a")
+    assert disk_usage(temp_dir, max_depth=0).total_apparent == 100
+
+
+def test_directory_snapshot_diff(temp_dir):
+    """测试目录快照与增量变更检测。"""
+    import os
+
+    from {{cookiecutter.project_slug}}.utils.file_utils import DirectorySnapshot, diff_since
+
+    data_dir = temp_dir / "data"
+    data_dir.mkdir()
+    (data_dir / "keep.txt").write_text("keep")
+    (data_dir / "change.txt").write_text("old")
+    (data_dir / "remove.txt").write_text("bye")
+
+    index_file = temp_dir / "index" / "snapshot.db"
+    DirectorySnapshot.scan(data_dir).save(index_file)
+
+    snapshot = DirectorySnapshot.load(index_file)
+    assert len(snapshot) == 3
+    assert "keep.txt" in snapshot
+    assert snapshot.root == data_dir
+
+    # 路径中包含URI特殊字符
+    odd_index = temp_dir / "a?b#c%20" / "snapshot.db"
+    DirectorySnapshot.scan(data_dir).save(odd_index)
+    assert len(DirectorySnapshot.load(odd_index)) == 3
+
+    (data_dir / "change.txt").write_text("new content")
+    os.utime(data_dir / "change.txt", ns=(0, 10**9))
+    (data_dir / "remove.txt").unlink()
+    (data_dir / "sub").mkdir()
+    (data_dir / "sub" / "added.txt").write_text("hi")
+
+    diff = diff_since(index_file)
+    assert diff.changed
+    assert diff.added == [data_dir / "sub" / "added.txt"]
+    assert diff.modified == [data_dir / "change.txt"]
+    assert diff.removed == [data_dir / "remove.txt"]
+
+    # 新快照保存后再次比较应无变化
+    diff.current.save(index_file)
+    assert not diff_since(index_file).changed
+
+
+def test_find_duplicates(temp_dir):
+    """测试分级哈希查找重复文件。"""
+    import os
+
+    from {{cookiecutter.project_slug}}.utils.file_utils import find_duplicates
+
+    big = os.urandom(300 * 1024)
+    (temp_dir / "a").mkdir()
+    (temp_dir / "b").mkdir()
+    (temp_dir / "a" / "big1.bin").write_bytes(big)
+    (temp_dir / "b" / "big2.bin").write_bytes(big)
+    # 大小相同、首尾块相同但中间不同的文件
+    (temp_dir / "b" / "big3.bin").write_bytes(big[:100 * 1024] + b"x" * (100 * 1024) + big[200 * 1024:])
+    (temp_dir / "a" / "small1.txt").write_text("same")
+    (temp_dir / "b" / "small2.txt").write_text("same")
+    (temp_dir / "b" / "other.txt").write_text("diff")
+    (temp_dir / "a" / "empty1").touch()
+    (temp_dir / "b" / "empty2").touch()
+    os.link(temp_dir / "b" / "other.txt", temp_dir / "a" / "other_link.txt")
+
+    cache_file = temp_dir / "cache" / "hashes.db"
+    groups = list(find_duplicates([temp_dir / "a", temp_dir / "b"], workers=2,
+                                  cache_file=cache_file))
+    found = sorted(sorted(p.name for p in g.paths) for g in groups)
+    assert found == [["big1.bin", "big2.bin"], ["small1.txt", "small2.txt"]]
+    assert {g.size for g in groups} == {len(big), 4}
+
+    # 再次运行使用缓存，结果不变
+    again = list(find_duplicates(temp_dir, cache_file=cache_file))
+    assert sorted(g.digest for g in again) == sorted(g.digest for g in groups)
+    assert cache_file.exists()
+
+    # 单个文件无法读取时只跳过该文件，不中断其他分组
+    from {{cookiecutter.project_slug}}.utils import file_utils
+
+    real_hash_file = file_utils.hash_file
+
+    def flaky_hash_file(path, algorithm):
+        if path.endswith("small2.txt"):
+            raise PermissionError(path)
+        return real_hash_file(path, algorithm)
+
+    with patch.object(file_utils, "hash_file", flaky_hash_file):
+        groups = list(find_duplicates(temp_dir))
+    assert [sorted(p.name for p in g.paths) for g in groups] == [["big1.bin", "big2.bin"]]
+
+    # 提前关闭生成器
+    stream = find_duplicates(temp_dir, workers=2)
+    next(stream)
+    stream.close()
+
+
+def test_find_duplicates_close_keeps_running_hashes(temp_dir):
+    """测试提前关闭生成器时，正在执行的哈希任务仍写入缓存。"""
+    import os
+    import time
+
+    from {{cookiecutter.project_slug}}.utils import file_utils
+
+    fast = os.urandom(300 * 1024)
+    slow = os.urandom(400 * 1024)
+    for name, data in [("fast1", fast), ("fast2", fast), ("slow1", slow), ("slow2", slow)]:
+        (temp_dir / name).write_bytes(data)
+    cache_file = temp_dir / "cache" / "hashes.db"
+    real_hash_file = file_utils.hash_file
+
+    started = []
+
+    def slow_hash_file(path, algorithm):
+        if "slow" in path:
+            started.append(path)
+            time.sleep(0.3)
+        return real_hash_file(path, algorithm)
+
+    with patch.object(file_utils, "hash_file", slow_hash_file):
+        stream = file_utils.find_duplicates(temp_dir, workers=4, cache_file=cache_file)
+        first = next(stream)
+        assert sorted(p.name for p in first.paths) == ["fast1", "fast2"]
+        # 等两个slow文件的完整哈希都开始执行后再关闭（排队中的任务会被取消）
+        deadline = time.monotonic() + 5
+        while len(started) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stream.close()
+
+    calls = []
+
+    def counting_hash_file(path, algorithm):
+        calls.append(path)
+        return real_hash_file(path, algorithm)
+
+    with patch.object(file_utils, "hash_file", counting_hash_file):
+        groups = list(file_utils.find_duplicates(temp_dir, cache_file=cache_file))
+    assert len(groups) == 2
+    assert calls == []
+
+
 def test_generate_random_string():
     """测试生成随机字符串。"""
     from {{cookiecutter.project_slug}}.utils.data_utils import generate_random_string
@@ -138,6 +383,59 @@ def test_generate_random_string():
     assert s1 != generate_random_string()
 
 
+def test_generate_random_strings():
+    """测试批量生成随机字符串。"""
+    import string
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import generate_random_strings
+
+    ids = generate_random_strings(1000, length=12)
+    assert len(ids) == 1000
+    assert all(len(s) == 12 and s.isalnum() for s in ids)
+    assert len(set(ids)) == 1000
+
+    letters = generate_random_strings(50, include_digits=False, secure=False)
+    assert all(s.isalpha() for s in letters)
+
+    hex_ids = generate_random_strings(20, length=6, alphabet="0123456789abcdef")
+    assert all(set(s) <= set(string.hexdigits.lower()) for s in hex_ids)
+
+    assert generate_random_strings(0) == []
+    with pytest.raises(ValueError):
+        generate_random_strings(1, alphabet="")
+
+
+def test_generate_sortable_ids():
+    """测试按时间排序的ULID和UUIDv7。"""
+    import uuid
+    from datetime import datetime
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import generate_sortable_ids
+
+    ulids = generate_sortable_ids(100)
+    assert all(len(u) == 26 for u in ulids)
+    assert ulids == sorted(ulids)
+    assert len(set(ulids)) == 100
+
+    earlier = generate_sortable_ids(1, timestamp=datetime(2020, 1, 1))[0]
+    assert earlier < ulids[0]
+    # 时间戳部分可以解码还原
+    alphabet = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+    millis = 0
+    for ch in earlier[:10]:
+        millis = millis * 32 + alphabet.index(ch)
+    assert millis == int(datetime(2020, 1, 1).timestamp() * 1000)
+
+    uuids = generate_sortable_ids(50, kind="uuid7")
+    assert uuids == sorted(uuids)
+    parsed = uuid.UUID(uuids[0])
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+
+    with pytest.raises(ValueError):
+        generate_sortable_ids(1, kind="unknown")
+
+
 def test_calculate_md5():
     """测试MD5哈希计算。"""
     from {{cookiecutter.project_slug}}.utils.data_utils import calculate_md5
@@ -149,6 +447,149 @@ def test_calculate_md5():
     assert calculate_md5(b"hello") == "5d41402abc4b2a76b9719d911017c592"
 
 
+def test_calculate_hashes():
+    """测试批量短键哈希。"""
+    import hashlib
+    import io
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import (
+        IncrementalHasher,
+        calculate_hashes,
+    )
+
+    keys = ["user:1", "user:2", b"user:3"]
+    digests = calculate_hashes(keys)
+    assert len(digests) == 3 * 8
+    assert digests[8:16] == hashlib.blake2b(b"user:2", digest_size=8).digest()
+
+    ints = calculate_hashes(keys, output="array")
+    assert ints[0] == int.from_bytes(digests[:8], "big")
+
+    hexes = calculate_hashes(keys, algorithm="md5", digest_size=None, output="hex")
+    assert hexes[0] == hashlib.md5(b"user:1").hexdigest()
+    assert calculate_hashes(keys, algorithm="sha256", digest_size=4)[:4] == \
+        hashlib.sha256(b"user:1").digest()[:4]
+
+    # 没有专用构造函数的算法通过 hashlib.new 计算
+    if "sha512_256" in hashlib.algorithms_available:
+        assert calculate_hashes(["a"], algorithm="sha512_256", digest_size=None) == \
+            hashlib.new("sha512_256", b"a").digest()
+
+    with pytest.raises(ValueError):
+        calculate_hashes(keys, algorithm="md5", digest_size=32)
+    with pytest.raises(ValueError):
+        calculate_hashes(keys, digest_size=16, output="array")
+
+    hasher = IncrementalHasher("sha256").update("hello ").update_many([b"wor", "ld"])
+    prefix = hasher.copy()
+    hasher.update_stream(io.BytesIO(b"!" * 10), chunk_size=3)
+    assert prefix.hexdigest() == hashlib.sha256(b"hello world").hexdigest()
+    assert hasher.hexdigest() == hashlib.sha256(b"hello world" + b"!" * 10).hexdigest()
+    assert hasher.bytes_processed == 21
+
+
+def test_hash_file(temp_dir):
+    """测试流式文件哈希。"""
+    import hashlib
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import hash_file, hash_files
+
+    content = b"hello world" * 10000
+    test_file = temp_dir / "data.bin"
+    test_file.write_bytes(content)
+    empty_file = temp_dir / "empty.bin"
+    empty_file.touch()
+
+    expected = hashlib.sha256(content).hexdigest()
+    assert hash_file(test_file) == expected
+    assert hash_file(test_file, chunk_size=7) == expected
+    assert hash_file(test_file, use_mmap=True) == expected
+    assert hash_file(test_file, "md5") == hashlib.md5(content).hexdigest()
+    assert hash_file(empty_file, "blake2b", use_mmap=True) == hashlib.blake2b(b"").hexdigest()
+
+    digests = hash_files([test_file, empty_file], algorithm="sha256", workers=2)
+    assert digests[str(test_file)] == expected
+    assert digests[str(empty_file)] == hashlib.sha256(b"").hexdigest()
+
+    with pytest.raises(ValueError):
+        hash_file(test_file, "not-an-algorithm")
+
+
+def test_parse_and_format_datetime():
+    """测试日期时间解析和格式化与标准库保持一致。"""
+    from datetime import date, datetime, timezone
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import format_datetime, parse_datetime
+
+    dt = datetime(2024, 3, 5, 12, 34, 56, 789)
+    assert parse_datetime("2024-03-05 12:34:56") == datetime(2024, 3, 5, 12, 34, 56)
+    assert parse_datetime("05/03/2024", "%d/%m/%Y") == datetime(2024, 3, 5)
+    # 非固定宽度输入退回strptime
+    assert parse_datetime("2024-3-5", "%Y-%m-%d") == datetime(2024, 3, 5)
+    assert parse_datetime("Mar 05 2024", "%b %d %Y") == datetime(2024, 3, 5)
+    with pytest.raises(ValueError):
+        parse_datetime("2024-03-05T12:34:56")
+    with pytest.raises(ValueError):
+        parse_datetime("2024-02-30", "%Y-%m-%d")
+
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%d/%m/%Y %H%%", "%Y", "%a %d"]:
+        assert format_datetime(dt, fmt) == dt.strftime(fmt)
+    aware = dt.replace(tzinfo=timezone.utc)
+    assert format_datetime(aware) == aware.strftime("%Y-%m-%d %H:%M:%S")
+    assert len(format_datetime()) == 19
+
+    # date对象退回strftime
+    day = date(2024, 1, 2)
+    assert format_datetime(day) == "2024-01-02 00:00:00"
+    assert format_datetime(day, "%Y-%m-%d") == "2024-01-02"
+
+
+def test_parse_and_format_datetimes():
+    """测试批量日期时间解析和格式化。"""
+    from datetime import datetime
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import format_datetimes, parse_datetimes
+
+    values = ["2024-01-01 00:00:01", "2024-01-01 00:00:01", "2024-01-02 10:00:00"]
+    parsed = parse_datetimes(values)
+    assert parsed == [datetime(2024, 1, 1, 0, 0, 1)] * 2 + [datetime(2024, 1, 2, 10)]
+    assert format_datetimes(parsed) == values
+    assert format_datetimes(parsed, "%d.%m.%Y") == ["01.01.2024", "01.01.2024", "02.01.2024"]
+
+    iso = parse_datetimes(["2024-01-01T08:00:00+08:00"], fmt=None)
+    assert iso[0].utcoffset().total_seconds() == 8 * 3600
+    assert parse_datetimes(iter(["01/02/2024"]), "%d/%m/%Y") == [datetime(2024, 2, 1)]
+
+
+def test_date_range():
+    """测试惰性日期范围。"""
+    from datetime import datetime
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import DateRange, get_date_range
+
+    assert get_date_range("2024-02-27", "2024-03-01") == [
+        "2024-02-27", "2024-02-28", "2024-02-29", "2024-03-01"]
+    assert get_date_range("2024-03-02", "2024-03-01") == []
+
+    days = DateRange("2024-01-01", "2024-12-31")
+    assert len(days) == 366
+    assert days[0] == "2024-01-01" and days[-1] == "2024-12-31"
+    assert "2024-07-04" in days and datetime(2024, 7, 4) in days
+    assert "2025-01-01" not in days and "not a date" not in days
+    assert list(days[10:13]) == ["2024-01-11", "2024-01-12", "2024-01-13"]
+    assert days[::7].index("2024-01-15") == 2
+
+    # 按月步进时，大月月底在小月中取最后一天，之后恢复原日期
+    months = DateRange("2024-01-31", "2024-05-31", unit="month")
+    assert list(months) == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30", "2024-05-31"]
+    assert list(months[1:][1:]) == ["2024-03-31", "2024-04-30", "2024-05-31"]
+    assert "2024-02-29" in months and "2024-02-28" not in months
+
+    hours = DateRange("2024-01-01 00:00", "2024-01-01 05:00", "%Y-%m-%d %H:%M", unit="hour", step=2)
+    assert list(hours) == ["2024-01-01 00:00", "2024-01-01 02:00", "2024-01-01 04:00"]
+    assert list(reversed(hours))[0] == "2024-01-01 04:00"
+
+
 def test_clean_text():
     """测试文本清理。"""
     from {{cookiecutter.project_slug}}.utils.data_utils import clean_text
@@ -158,6 +599,26 @@ def test_clean_text():
     assert clean_text("multiple    spaces    here") == "multiple spaces here"
 
 
+def test_normalize_texts():
+    """测试文本规范化流水线。"""
+    import pickle
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import TextNormalizer, normalize_texts
+
+    normalizer = TextNormalizer()
+    assert normalizer("  Ｈｅｌｌｏ\u200b\x07  WORLD\n\tStraße ") == "hello world strasse"
+    assert TextNormalizer(["collapse_whitespace", "strip"])("  A \n B  ") == "A B"
+    # NEL (U+0085) 与其他空白一样折叠为空格，C1控制字符被删除
+    assert normalizer("foo\x85bar\x9bbaz") == "foo barbaz"
+    assert pickle.loads(pickle.dumps(normalizer))("ＡＢＣ") == "abc"
+
+    texts = [f" Text\t{i} " for i in range(50)]
+    expected = [f"text {i}" for i in range(50)]
+    assert normalize_texts(texts, batch_size=7) == expected
+    assert normalize_texts(iter(texts), processes=2, batch_size=10) == expected
+    assert normalize_texts(texts, ["strip"])[0] == "Text\t0"
+
+
 def test_chunk_list():
     """测试列表分块。"""
     from {{cookiecutter.project_slug}}.utils.data_utils import chunk_list
@@ -175,6 +636,46 @@ def test_chunk_list():
     assert chunk_list([1, 2], 5) == [[1, 2]]
 
 
+def test_chunked():
+    """测试惰性零拷贝分块。"""
+    import pickle
+
+    import pytest
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import chunked
+
+    data = list(range(10))
+    chunks = list(chunked(data, 4))
+    assert [list(c) for c in chunks] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    # 视图反映底层列表，且pickle后为普通列表
+    data[0] = -1
+    assert chunks[0][0] == -1 and chunks[0][1:3] == [1, 2]
+    assert pickle.loads(pickle.dumps(chunks[2])) == [8, 9]
+
+    assert [list(c) for c in chunked(range(7), 4, overlap=2)] == [
+        [0, 1, 2, 3], [2, 3, 4, 5], [4, 5, 6]]
+    assert list(chunked(iter(range(7)), 4, overlap=2)) == [[0, 1, 2, 3], [2, 3, 4, 5], [4, 5, 6]]
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked(iter([]), 3)) == []
+
+    assert [len(c) for c in chunked(list(range(10)), n_chunks=3)] == [4, 3, 3]
+    assert [list(c) for c in chunked(iter(range(2)), n_chunks=4)] == [[0], [1]]
+
+    # 不支持切片的序列按普通可迭代对象处理
+    from collections import deque
+
+    assert list(chunked(deque(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert [list(c) for c in chunked(deque(range(5)), n_chunks=2)] == [[0, 1, 2], [3, 4]]
+
+    views = list(chunked(b"abcdef", 4))
+    assert isinstance(views[0], memoryview) and views[1].tobytes() == b"ef"
+
+    with pytest.raises(ValueError):
+        list(chunked(data, 2, overlap=2))
+    with pytest.raises(ValueError):
+        list(chunked(data))
+
+
 def test_flatten_dict():
     """测试字典扁平化。"""
     from {{cookiecutter.project_slug}}.utils.data_utils import flatten_dict
@@ -209,6 +710,301 @@ def test_flatten_dict():
     }
 
 
+def test_flatten_lists_and_unflatten():
+    """测试列表展开、深层嵌套和字典还原。"""
+    import pytest
+
+    from {{cookiecutter.project_slug}}.utils.data_utils import (
+        flatten_dict,
+        iter_flatten_dict,
+        unflatten_dict,
+    )
+
+    doc = {"a": [{"b": 1}, 2], "c": {"d": (3,)}, "e": {}}
+    flat = flatten_dict(doc, flatten_lists=True)
+    assert flat == {"a.0.b": 1, "a.1": 2, "c.d.0": 3}
+    assert list(iter_flatten_dict(doc))[0] == ("a", [{"b": 1}, 2])
+    assert unflatten_dict(flat, restore_lists=True) == {"a": [{"b": 1}, 2], "c": {"d": [3]}}
+    assert unflatten_dict({"x_y": 1}, separator="_") == {"x": {"y": 1}}
+
+    # 超过递归深度限制的嵌套
+    deep = current = {}
+    for _ in range(5000):
+        current["k"] = current = {}
+    current["leaf"] = 1
+    (key, value), = flatten_dict(deep).items()
+    assert value == 1 and key.count(".") == 5000
+    restored = unflatten_dict({key: 1})
+    for _ in range(5000):
+        restored = restored["k"]
+    assert restored == {"leaf": 1}
+
+    with pytest.raises(ValueError):
+        unflatten_dict({"a": 1, "a.b": 2})
+
+
+
+def test_parallel_map():
+    """测试并行映射的各后端、顺序、进度和背压。"""
+    import asyncio
+    import itertools
+
+    from {{cookiecutter.project_slug}}.utils.parallel import imap, imap_unordered, pmap
+
+    data = list(range(-20, 20))
+    expected = [abs(x) for x in data]
+    assert pmap(abs, data, workers=4) == expected
+    assert pmap(abs, data, backend="process", workers=2) == expected
+    assert sorted(imap_unordered(abs, iter(data), workers=4)) == sorted(expected)
+
+    async def double(x):
+        await asyncio.sleep(0.001 * (x % 3))
+        return 2 * x
+
+    assert pmap(double, range(30), backend="asyncio", workers=8) == [2 * x for x in range(30)]
+
+    # 在运行中的事件循环内调用时改用辅助线程中的事件循环
+    async def inside_loop():
+        results = pmap(double, range(10), backend="asyncio", workers=4)
+        stream = imap(double, itertools.count(), backend="asyncio", workers=2)
+        first = [next(stream) for _ in range(3)]
+        stream.close()
+        return results, first
+
+    assert asyncio.run(inside_loop()) == ([2 * x for x in range(10)], [0, 2, 4])
+
+    calls = []
+    pmap(abs, data, workers=2, chunksize=8, progress=lambda done, total: calls.append(done))
+    assert calls == [8, 16, 24, 32, 40]
+
+    # 无限输入也只按需读取
+    counter = itertools.count()
+    results = imap(abs, counter, workers=2, max_in_flight=2)
+    assert [next(results) for _ in range(5)] == [0, 1, 2, 3, 4]
+    results.close()
+    assert next(counter) < 100
+
+
+def test_parallel_map_errors():
+    """测试并行映射的异常传播和超时。"""
+    import asyncio
+    import time
+
+    import pytest
+
+    from {{cookiecutter.project_slug}}.utils.parallel import pmap
+
+    def fail(x):
+        if x == 3:
+            raise KeyError(x)
+        return x
+
+    with pytest.raises(KeyError):
+        pmap(fail, range(10), workers=2)
+    with pytest.raises(TimeoutError):
+        pmap(time.sleep, [0, 2], workers=2, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        pmap(asyncio.sleep, [0, 2], backend="asyncio", timeout=0.1)
+    with pytest.raises(ValueError):
+        pmap(abs, [1], backend="gpu")
+
+
+def test_lru_cache(temp_dir):
+    """测试LRU+TTL缓存的淘汰、过期、字节上限和持久化。"""
+    import time
+
+    from {{cookiecutter.project_slug}}.utils.cache import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", None)
+    assert cache.get("a") == 1  # a变为最近使用
+    cache.set("c", 3)
+    assert "b" not in cache and "a" in cache
+    assert cache.get("b", "missing") == "missing"
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 1, 1, 2)
+
+    cache = LRUCache(maxsize=None, ttl=0.05)
+    cache.set("x", 1)
+    cache.set("y", 2, ttl=60)
+    time.sleep(0.1)
+    assert cache.get("x") is None and cache.get("y") == 2
+    assert cache.info().expired == 1
+
+    cache = LRUCache(maxsize=None, max_bytes=10, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"123456")
+    assert "a" not in cache and cache.info().currbytes == 6
+
+    db = temp_dir / "cache.db"
+    writer = LRUCache(persist=db)
+    writer.set(("k", 1), {"v": [1, 2]})
+    reader = LRUCache(persist=db)
+    assert reader.get(("k", 1)) == {"v": [1, 2]}
+    writer.close()
+    reader.close()
+
+    # 共享同一持久化文件的缓存按命名空间隔离
+    other = LRUCache(persist=db, namespace="other")
+    assert other.get(("k", 1)) is None
+    other.close()
+
+
+def test_lru_cache_persist_does_not_block_memory_hits(temp_dir):
+    """测试持久化写入进行中时，其他线程的内存命中不必等待SQLite。"""
+    import threading
+    import time
+
+    from {{cookiecutter.project_slug}}.utils.cache import LRUCache
+
+    cache = LRUCache(persist=temp_dir / "cache.db")
+    cache.set("hot", 1)
+    entered = threading.Event()
+    release = threading.Event()
+    real_set = cache._store.set
+
+    def slow_set(key, value, expires_at):
+        entered.set()
+        release.wait(5)
+        real_set(key, value, expires_at)
+
+    cache._store.set = slow_set
+    writer = threading.Thread(target=cache.set, args=("cold", 2))
+    writer.start()
+    try:
+        assert entered.wait(5)
+        # 写入线程正阻塞在SQLite中，内存命中和内存层的新值都立即可见
+        start = time.monotonic()
+        assert cache.get("hot") == 1
+        assert cache.get("cold") == 2
+        assert time.monotonic() - start < 1
+    finally:
+        release.set()
+        writer.join()
+    cache._store.set = real_set
+
+    # 同一个键的连续写入在持久化层保持最终值
+    threads = [threading.Thread(target=cache.set, args=("k", i)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    reader = LRUCache(persist=temp_dir / "cache.db")
+    assert reader.get("k") == cache.get("k")
+    assert reader.get("cold") == 2
+    reader.close()
+    cache.close()
+
+
+def test_memoize(temp_dir):
+    """测试记忆化装饰器的统计、single-flight、异步支持和持久化。"""
+    import asyncio
+    import threading
+    import time
+
+    import pytest
+
+    from {{cookiecutter.project_slug}}.utils.cache import memoize
+
+    calls = []
+
+    @memoize(maxsize=10)
+    def slow_square(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x * x
+
+    # 并发的相同未命中只计算一次
+    threads = [threading.Thread(target=slow_square, args=(3,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [3]
+    assert slow_square(3) == 9 and slow_square(x=4) == 16
+    assert slow_square.cache_info().hits >= 1
+    slow_square.cache_clear()
+    assert slow_square.cache_info().currsize == 0
+
+    attempts = []
+
+    @memoize()
+    def flaky(x):
+        attempts.append(x)
+        raise ValueError(x)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            flaky(1)
+    assert attempts == [1, 1]
+
+    async_calls = []
+
+    @memoize(ttl=60)
+    async def fetch(x):
+        async_calls.append(x)
+        await asyncio.sleep(0.01)
+        return x + 1
+
+    async def main():
+        return await asyncio.gather(*(fetch(1) for _ in range(5)), fetch(2))
+
+    assert asyncio.run(main()) == [2, 2, 2, 2, 2, 3]
+    assert async_calls == [1, 2]
+
+    # 多个函数共享同一个持久化文件时互不干扰
+    db = temp_dir / "memo.db"
+
+    @memoize(persist=db)
+    def square(x):
+        return x * x
+
+    @memoize(persist=db)
+    def double(x):
+        return x * 2
+
+    assert double(5) == 10
+    assert square(5) == 25
+    square.cache.close()
+    double.cache.close()
+
+
+def test_profiler(temp_dir):
+    """测试性能分析器的两种模式和结果汇总。"""
+    import time
+
+    from {{cookiecutter.project_slug}}.utils.profiling import Profiler, top_functions
+
+    def busy_work():
+        return sum(i * i for i in range(200_000))
+
+    with Profiler(temp_dir / "run"):
+        busy_work()
+    assert (temp_dir / "run.pstats").exists()
+    collapsed = (temp_dir / "run.collapsed").read_text(encoding="utf-8")
+    assert "busy_work" in collapsed
+    assert any(row.name == "busy_work" for row in top_functions(temp_dir / "run.pstats"))
+
+    @Profiler(temp_dir / "decorated")
+    def decorated():
+        return busy_work()
+
+    assert decorated() == busy_work()
+    assert (temp_dir / "decorated.collapsed").exists()
+
+    def sleepy():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    sampler = Profiler(mode="sampling", interval=0.001)
+    with sampler:
+        sleepy()
+    assert sampler.samples
+    assert any("sleepy" in stack for stack in sampler.collapsed())
+    assert sampler.top(5, sort="tottime")[0].self_time > 0
+
 def test_setup_logger():
     """测试日志设置函数。"""
     from {{cookiecutter.project_slug}}.utils.logging_utils import setup_logger